@@ -1,6 +1,6 @@
 # Description: API router for the application, including health, user, and email endpoints.
 
-from . import users, health, email, auth, tests, payments, stats
+from . import users, health, email, auth, tests, payments, stats, metrics
 from fastapi import APIRouter
 from app.settings import settings
 
@@ -13,6 +13,9 @@ api_router.include_router(
     payments.router, prefix="/br-general/payment", tags=["payments"]
 )
 api_router.include_router(stats.router, prefix="/br-general/stats", tags=["stats"])
+api_router.include_router(
+    metrics.router, prefix="/br-general/metrics", tags=["metrics"]
+)
 # For production, disable email send and user create endpoints
 if settings.env_type != "prod":
     api_router.include_router(email.router, prefix="/br-general/email", tags=["email"])
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 
 from datetime import datetime, timedelta, timezone
@@ -13,7 +13,7 @@ from app.schemas.user import (
 )
 from app.repositories.user_repository import UserRepository
 from app.services.auth_service import AuthService
-from app.db import db  # prisma client
+from app.db import db, read_router  # prisma client
 
 router = APIRouter()
 
@@ -22,14 +22,14 @@ user_repo = UserRepository()
 
 
 @router.post("/register", response_model=UserWithTokens, summary="Register new user")
-async def register(user_in: UserCreate):
+async def register(user_in: UserCreate, response: Response):
     # check if user exists
     existing = await user_repo.get_by_email(db, user_in.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # hash password
-    hashed_pw = auth_service.get_password_hash(user_in.password)
+    hashed_pw = await auth_service.get_password_hash_async(user_in.password)
 
     # save new user
     user = await user_repo.create_user(
@@ -53,6 +53,9 @@ async def register(user_in: UserCreate):
         }
     )
 
+    # the new user's first reads must find the account and its subscription
+    response.headers.update(read_router.write_headers())
+
     # create tokens for immediate login
     access_token = auth_service.create_access_token({"sub": str(user.id)})
     refresh_token = auth_service.create_refresh_token({"sub": str(user.id)})
@@ -71,17 +74,38 @@ async def register(user_in: UserCreate):
     )
 
 
+async def rehash_password(user_id: str, password: str, old_hash: str) -> None:
+    """Rewrite a hash made with outdated Argon2 costs (after login)."""
+    try:
+        new_hash = await auth_service.get_password_hash_async(password)
+    except HTTPException:
+        # pool saturated; the next login tries again
+        return
+    await user_repo.replace_password_hash(db, user_id, old_hash, new_hash)
+
+
 @router.post("/login", response_model=UserWithTokens)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+):
     # check if user exists
     user = await user_repo.get_by_email(db, form_data.username)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # verify password
-    if not auth_service.verify_password(form_data.password, user.hashed_password):
+    if not await auth_service.verify_password_async(
+        form_data.password, user.hashed_password
+    ):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # costs changed since this hash was made -> rehash off the request path
+    if auth_service.needs_rehash(user.hashed_password):
+        background_tasks.add_task(
+            rehash_password, str(user.id), form_data.password, user.hashed_password
+        )
+
     # create tokens
     access_token = auth_service.create_access_token({"sub": str(user.id)})
     refresh_token = auth_service.create_refresh_token({"sub": str(user.id)})
@@ -1,33 +1,71 @@
 # app/api/email.py
-from fastapi import APIRouter, BackgroundTasks
-from app.schemas.email import EmailSendRequest, EmailSendResponse
-from app.services.email_service import EmailService
+from fastapi import APIRouter, HTTPException
+from jinja2 import TemplateNotFound
+
+from app.schemas.email import (
+    EmailBulkSendRequest,
+    EmailJobProgress,
+    EmailSendRequest,
+    EmailSendResponse,
+)
+from app.services.email_outbox import email_outbox
 
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-email_service = EmailService()
 
 
 @router.post("/send", response_model=EmailSendResponse, status_code=202)
-async def send_email(payload: EmailSendRequest, bg: BackgroundTasks):
-    # Fire-and-forget via background task
-    async def _task():
-        try:
-            await email_service.send(
-                to=payload.to,
-                subject=payload.subject,
-                text=payload.text,
-                html=payload.html,
-                template=payload.template,
-                params=payload.params,
-            )
-        except Exception as e:
-            # Also log to console
-            logger.error(f"Email send failed: {e}")
-            # Do not re-raise to avoid crashing background workers
-
-    bg.add_task(_task)
+async def send_email(payload: EmailSendRequest):
+    # Stored in the outbox; outbox workers deliver it (with retries)
+    try:
+        await email_outbox.enqueue(
+            to=payload.to,
+            subject=payload.subject,
+            text=payload.text,
+            html=payload.html,
+            template=payload.template,
+            params=payload.params,
+        )
+    except TemplateNotFound:
+        raise HTTPException(
+            status_code=422, detail=f"UNKNOWN_TEMPLATE:{payload.template}"
+        )
+    except Exception as e:
+        # Also log to console
+        logger.error(f"Email enqueue failed: {e}")
+        raise HTTPException(status_code=503, detail="Email queue unavailable")
+
     return EmailSendResponse(accepted=True)
+
+
+@router.post("/send-bulk", response_model=EmailJobProgress, status_code=202)
+async def send_email_bulk(payload: EmailBulkSendRequest):
+    """Queue one templated message per recipient; poll /jobs/{job_id} for progress."""
+    try:
+        job_id = await email_outbox.enqueue_bulk(
+            subject=payload.subject,
+            template=payload.template,
+            text=payload.text,
+            recipients=[r.model_dump() for r in payload.recipients],
+        )
+    except TemplateNotFound:
+        raise HTTPException(
+            status_code=422, detail=f"UNKNOWN_TEMPLATE:{payload.template}"
+        )
+    except Exception as e:
+        logger.error(f"Email bulk enqueue failed: {e}")
+        raise HTTPException(status_code=503, detail="Email queue unavailable")
+
+    total = len(payload.recipients)
+    return EmailJobProgress(job_id=job_id, total=total, pending=total, sent=0, failed=0)
+
+
+@router.get("/jobs/{job_id}", response_model=EmailJobProgress)
+async def email_job_progress(job_id: str):
+    progress = await email_outbox.job_progress(job_id)
+    if not progress["total"]:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return EmailJobProgress(job_id=job_id, **progress)
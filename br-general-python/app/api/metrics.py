@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from app.middleware.prometheus import metrics_payload
+
+router = APIRouter()
+
+
+@router.get("", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (all uvicorn workers in multiprocess mode)."""
+    return Response(content=metrics_payload(), media_type=CONTENT_TYPE_LATEST)
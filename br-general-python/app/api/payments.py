@@ -1,18 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Header, Request
 import uuid
-import requests
 
 from app.api.users import get_current_user
 
 from app.services.payment_service import payment_service
+from app.services.payment_events import payment_event_queue
 from app.services.auth_service import AuthService
+from app.services.yookassa_client import YooKassaError, yookassa_client
 
 from app.repositories.user_repository import UserRepository
 from app.repositories.subscription_repository import subscription_repo
+from app.repositories.payment_event_repository import payment_event_repo
 
 from app.schemas.user import SubscriptionOut
 from app.schemas.payment import PaymentCreateResponse
 
+from app.db import db, read_router
 from app.settings import settings
 
 router = APIRouter()
@@ -44,55 +47,69 @@ async def create_payment(current_user=Depends(get_current_user)):
     }
 
     try:
-        response = requests.post(
-            "https://api.yookassa.ru/v3/payments",
-            json=payload,
-            auth=(settings.yookassa_shop_id, settings.yookassa_secret),
-            headers={"Idempotence-Key": payment_id},
-            timeout=15,
+        data = await yookassa_client.create_payment(payload, idempotence_key=payment_id)
+    except YooKassaError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    confirmation = data.get("confirmation", {}).get("confirmation_url")
+    if not confirmation:
+        raise HTTPException(
+            status_code=400, detail="Missing confirmation URL in YooKassa response"
         )
 
-        data = response.json()
-        if response.status_code not in (200, 201):
-            raise HTTPException(status_code=response.status_code, detail=data)
-
-        confirmation = data.get("confirmation", {}).get("confirmation_url")
-        if not confirmation:
-            raise HTTPException(
-                status_code=400, detail="Missing confirmation URL in YooKassa response"
-            )
-
+    try:
         # after successful payment creation:
         payment_record = await payment_service.save_payment(data, user_id)
-
-        return PaymentCreateResponse(
-            confirmation_url=confirmation, payment=payment_record
-        )
-
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return PaymentCreateResponse(confirmation_url=confirmation, payment=payment_record)
+
 
 @router.post("/webhook")
 async def yookassa_webhook(request: Request):
-    """Handle YooKassa payment notifications."""
+    """
+    Handle YooKassa payment notifications.
+
+    The event is stored once per payment and applied by the payment event
+    queue, so the answer is immediate and repeated deliveries are no-ops.
+    """
     try:
         body = await request.json()
-        event = body.get("event")
-        payment = body.get("object", {})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
 
-        if event == "payment.succeeded":
-            await payment_service.handle_payment_succeeded(payment)
-            return {"status": "ok", "message": "subscription created"}
+    event = body.get("event")
+    payment = body.get("object") or {}
 
+    if event != "payment.succeeded":
         return {"status": "ignored"}
 
+    payment_id = payment.get("id")
+    if not payment_id:
+        raise HTTPException(status_code=400, detail="Missing payment id")
+
+    try:
+        created = await payment_event_repo.record(db, payment_id, event, payment)
     except Exception as e:
+        # not stored -> let YooKassa deliver it again
         raise HTTPException(status_code=500, detail=str(e))
 
+    if not created:
+        return {"status": "duplicate"}
+
+    payment_event_queue.enqueue(payment_id)
+    return {"status": "accepted"}
+
 
 @router.get("/subscriptions", response_model=list[SubscriptionOut])
-async def list_subscriptions(current_user=Depends(get_current_user)):
+async def list_subscriptions(
+    current_user=Depends(get_current_user),
+    x_read_after_write: str | None = Header(default=None),
+):
     """Return all subscriptions of the current user."""
-    subs = await subscription_repo.get_by_user(current_user["user_id"])
+    user_id = current_user["user_id"]
+    subs = await subscription_repo.get_by_user(
+        user_id, db_client=read_router.reader_for(x_read_after_write)
+    )
     return subs
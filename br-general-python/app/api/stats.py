@@ -1,6 +1,18 @@
 from datetime import datetime, timezone
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Query
-from app.db import db
+from app.db import db, read_router
+from app.repositories.email_outbox_repository import email_outbox_repo
+from app.middleware.query_timing import route_query_stats
+from app.services.email_outbox import email_outbox
+from app.services.email_templates import email_templates
+from app.services.password_pool import password_hash_pool
+from app.services.payment_events import payment_event_queue
+from app.services.smtp_pool import smtp_pool
+from app.services.tests_service import test_questions_cache
+from app.services.top_sql_sampler import deltas, regressions, top_sql_sampler
+from app.settings import settings
 
 router = APIRouter()
 
@@ -34,7 +46,26 @@ async def top_sql(
     limit: int = Query(20, ge=1, le=100),
     sort_by: str = Query("total", pattern="^(total|mean|io|calls)$"),
     min_calls: int = Query(5, ge=1, le=1000),
+    window_minutes: Optional[int] = Query(None, ge=1, le=1440),
+    baseline_minutes: Optional[int] = Query(None, ge=1, le=1440),
+    min_ratio: float = Query(1.5, gt=1),
 ):
+    """
+    Top statements from pg_stat_statements: cumulative since the last reset,
+    or, with window_minutes, what ran in the last minutes (from the
+    sampler's snapshots). With baseline_minutes too: statements whose mean
+    time in the window is min_ratio times their mean in the baseline
+    minutes right before it.
+    """
+    if baseline_minutes is not None and window_minutes is None:
+        raise HTTPException(
+            status_code=400, detail="baseline_minutes requires window_minutes"
+        )
+    if window_minutes is not None:
+        return await top_sql_window(
+            limit, sort_by, min_calls, window_minutes, baseline_minutes, min_ratio
+        )
+
     order_sql = ORDER_MAP.get(sort_by)
     if not order_sql:
         raise HTTPException(status_code=400, detail="Invalid sort_by")
@@ -42,7 +73,7 @@ async def top_sql(
     sql = BASE_SQL.format(order=order_sql)
 
     try:
-        rows = await db.query_raw(sql, min_calls, limit)
+        rows = await read_router.reader().query_raw(sql, min_calls, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -68,3 +99,203 @@ async def top_sql(
         "min_calls": min_calls,
         "items": items,
     }
+
+
+# sort_by of /top-sql -> key of a sampler delta item
+DELTA_SORT_KEYS = {
+    "total": "total_ms",
+    "mean": "mean_ms",
+    "io": "io_ms",
+    "calls": "calls",
+}
+
+
+def snapshot_time(taken_at: float) -> str:
+    return datetime.fromtimestamp(taken_at, timezone.utc).isoformat()
+
+
+async def top_sql_window(
+    limit: int,
+    sort_by: str,
+    min_calls: int,
+    window_minutes: int,
+    baseline_minutes: Optional[int],
+    min_ratio: float,
+) -> dict:
+    if not top_sql_sampler.enabled:
+        raise HTTPException(status_code=400, detail="TOP_SQL_SAMPLER_DISABLED")
+
+    response = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "limit": limit,
+        "min_calls": min_calls,
+        "window_minutes": window_minutes,
+    }
+    if baseline_minutes is None:
+        window = await top_sql_sampler.window(window_minutes * 60)
+        if window is None:
+            raise HTTPException(status_code=503, detail="NOT_ENOUGH_SNAPSHOTS")
+        start, end = window
+        items = deltas(
+            start, end, min_calls=min_calls, queries=await top_sql_sampler.queries()
+        )
+        items.sort(key=lambda i: i[DELTA_SORT_KEYS[sort_by]], reverse=True)
+        return {
+            **response,
+            "sort_by": sort_by,
+            "from": snapshot_time(start.taken_at),
+            "to": snapshot_time(end.taken_at),
+            "seconds": end.taken_at - start.taken_at,
+            "items": items[:limit],
+        }
+
+    found = await top_sql_sampler.baseline_and_window(
+        window_minutes * 60, baseline_minutes * 60
+    )
+    if found is None:
+        raise HTTPException(status_code=503, detail="NOT_ENOUGH_SNAPSHOTS")
+    baseline_from, window_from, window_to = found
+    items = regressions(
+        (baseline_from, window_from),
+        (window_from, window_to),
+        min_calls=min_calls,
+        min_ratio=min_ratio,
+        queries=await top_sql_sampler.queries(),
+    )
+    return {
+        **response,
+        "baseline_minutes": baseline_minutes,
+        "min_ratio": min_ratio,
+        "baseline_from": snapshot_time(baseline_from.taken_at),
+        "from": snapshot_time(window_from.taken_at),
+        "to": snapshot_time(window_to.taken_at),
+        "items": items[:limit],
+    }
+
+
+@router.get("/top-sql-sampler")
+async def top_sql_sampler_stats():
+    """Stored pg_stat_statements snapshots, and this worker's share of them."""
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        **(await top_sql_sampler.stats()),
+    }
+
+
+@router.get("/tests-cache")
+async def tests_cache_stats():
+    """Hit/miss counters of the in-process test questions cache (this worker)."""
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        **test_questions_cache.stats(),
+    }
+
+
+@router.get("/password-hash")
+async def password_hash_stats():
+    """Queue depth and timings of the Argon2 worker pool (this worker)."""
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        **password_hash_pool.stats(),
+    }
+
+
+@router.get("/payment-events")
+async def payment_events_stats():
+    """Webhook event queue of this worker, plus stored events per status."""
+    rows = await db.query_raw(
+        'SELECT "status", COUNT(*)::int AS count FROM "PaymentEvent" GROUP BY "status"'
+    )
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        **payment_event_queue.stats(),
+        "stored": {r["status"]: r["count"] for r in rows},
+    }
+
+
+@router.get("/smtp-pool")
+async def smtp_pool_stats():
+    """Connection reuse counters of the SMTP pool (this worker)."""
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        **smtp_pool.stats(),
+    }
+
+
+@router.get("/email-outbox")
+async def email_outbox_stats():
+    """Outbox worker counters (this worker) and EmailLog rows per status."""
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        **email_outbox.stats(),
+        "stored": await email_outbox_repo.count_by_status(db),
+    }
+
+
+@router.get("/email-templates")
+async def email_templates_stats():
+    """Compiled email templates and the rendered-output memo (this worker)."""
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        **email_templates.stats(),
+    }
+
+
+# query engine gauges of the connection pool (metrics preview feature)
+POOL_GAUGES = {
+    "prisma_pool_connections_open": "open",
+    "prisma_pool_connections_busy": "busy",
+    "prisma_pool_connections_idle": "idle",
+    "prisma_client_queries_active": "queries_active",
+    "prisma_client_queries_wait": "queries_waiting",
+}
+
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    """Prisma pool configuration and gauges of this worker's query engine."""
+    try:
+        metrics = await db.get_metrics()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    gauges = {
+        POOL_GAUGES[g.key]: g.value for g in metrics.gauges if g.key in POOL_GAUGES
+    }
+    wait = next(
+        (
+            h.value
+            for h in metrics.histograms
+            if h.key == "prisma_client_queries_wait_histogram_ms"
+        ),
+        None,
+    )
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "pool_size": settings.db_pool_size,
+        "pool_timeout_seconds": settings.db_pool_timeout_seconds,
+        "statement_timeout_ms": settings.db_statement_timeout_ms,
+        "pgbouncer": settings.db_pgbouncer,
+        "read_routing": read_router.stats(),
+        **gauges,
+        "pool_wait": {
+            "count": wait.count if wait else 0,
+            "total_ms": wait.sum if wait else 0.0,
+            "buckets": [list(b) for b in wait.buckets] if wait else [],
+        },
+    }
+
+
+@router.get("/routes-db")
+async def routes_db_stats(
+    limit: int = Query(20, ge=1, le=200),
+    sort_by: str = Query(
+        "db_ms", pattern="^(db_ms|queries|queries_per_request|max_queries|requests)$"
+    ),
+):
+    """Prisma queries and DB time per route (this worker, since startup)."""
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "sort_by": sort_by,
+        "items": route_query_stats.snapshot(sort_by)[:limit],
+    }
@@ -1,28 +1,59 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 
-from app.db import db
+from app.db import db, read_router
 from app.api.users import get_current_user
+from app.schemas.tests import TestQuestionsResponse
 from app.services.tests_service import (
-    get_test_questions_service,
+    decode_finished_cursor,
+    etag_matches,
+    get_test_questions_entry_service,
     save_bulk_answers_service,
     get_finished_tests_service,
     get_finished_topics_service,
+    parse_finished_test_fields,
+    stream_finished_tests_service,
 )
 
 
 router = APIRouter()
 
+# page size of GET /finished (default and upper bound)
+FINISHED_TESTS_PAGE_SIZE = 50
+FINISHED_TESTS_MAX_PAGE = 200
+
 
 @router.get(
     "/{test_id}/questions",
     summary="Get test questions with options and topic",
-    description="Returns full test structure including topic, questions, and answer options.",
+    description=(
+        "Returns full test structure including topic, questions, and answer options. "
+        "Responses carry a strong ETag; send it back in If-None-Match to get a 304."
+    ),
+    responses={
+        200: {"model": TestQuestionsResponse},
+        304: {"description": "Not Modified"},
+    },
 )
-async def get_test_questions(test_id: str) -> Dict[str, Any]:
-    return await get_test_questions_service(db, test_id=test_id)
+async def get_test_questions(
+    test_id: str,
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    entry = await get_test_questions_entry_service(
+        read_router.reader(), test_id=test_id
+    )
+    headers = {
+        "ETag": entry.etag,
+        # clients may keep the body but must revalidate it every time
+        "Cache-Control": "no-cache",
+    }
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
 
 
 @router.post(
@@ -32,6 +63,7 @@ async def get_test_questions(test_id: str) -> Dict[str, Any]:
 )
 async def save_bulk_answers(
     payload: Dict[str, Any],
+    response: Response,
     current_user=Depends(get_current_user),
 ) -> Dict[str, Any]:
     user_id: str = current_user["user_id"]
@@ -49,7 +81,7 @@ async def save_bulk_answers(
     stats: Dict[str, int] = payload.get("stats") or {}
     session_id: Optional[str] = payload.get("sessionId")
 
-    return await save_bulk_answers_service(
+    result = await save_bulk_answers_service(
         db=db,
         test_id=test_id,
         answers=answers,
@@ -57,17 +89,31 @@ async def save_bulk_answers(
         user_id=user_id,
         session_id=session_id,
     )
+    # the user's next reads (finished tests, topics) must see this session
+    response.headers.update(read_router.write_headers())
+    return result
 
 
 @router.get(
     "/finished",
     summary="Get finished tests for current user by topic",
-    description="Provide topicId to filter by a single topic.",
+    description=(
+        "Provide topicId to filter by a single topic. Results are paginated newest "
+        "first: pass the X-Next-Cursor response header back as `cursor` to get the "
+        "next page. `fields` limits the returned keys (testTitle,finishedAt,stats). "
+        "With stream=true the whole history is streamed as NDJSON."
+    ),
 )
 async def get_finished_tests(
+    response: Response,
     topic_id: Optional[str] = None,
+    limit: int = Query(FINISHED_TESTS_PAGE_SIZE, ge=1, le=FINISHED_TESTS_MAX_PAGE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
     current_user: Dict[str, Any] = Depends(get_current_user),
-) -> List[Dict[str, Any]]:
+    x_read_after_write: Optional[str] = Header(default=None),
+):
     user_id: str = current_user.get("user_id")
     if not user_id:
         raise HTTPException(
@@ -75,7 +121,36 @@ async def get_finished_tests(
             detail="AUTH_REQUIRED",
         )
 
-    return await get_finished_tests_service(db, user_id=user_id, topic_id=topic_id)
+    selected_fields = parse_finished_test_fields(fields)
+    reader = read_router.reader_for(x_read_after_write)
+
+    if stream:
+        # a bad cursor must be a 422, not an error after the 200 headers
+        if cursor:
+            decode_finished_cursor(cursor)
+        return StreamingResponse(
+            stream_finished_tests_service(
+                reader,
+                user_id=user_id,
+                topic_id=topic_id,
+                page_size=limit,
+                cursor=cursor,
+                fields=selected_fields,
+            ),
+            media_type="application/x-ndjson",
+        )
+
+    items, next_cursor = await get_finished_tests_service(
+        reader,
+        user_id=user_id,
+        topic_id=topic_id,
+        limit=limit,
+        cursor=cursor,
+        fields=selected_fields,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get(
@@ -85,6 +160,7 @@ async def get_finished_tests(
 )
 async def get_finished_topics(
     current_user=Depends(get_current_user),
+    x_read_after_write: Optional[str] = Header(default=None),
 ):
     user_id: str = current_user["user_id"]
     if not user_id:
@@ -93,4 +169,6 @@ async def get_finished_topics(
             detail="AUTH_REQUIRED",
         )
 
-    return await get_finished_topics_service(db, user_id=user_id)
+    return await get_finished_topics_service(
+        read_router.reader_for(x_read_after_write), user_id=user_id
+    )
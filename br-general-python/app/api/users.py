@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 
-from jose import JWTError, ExpiredSignatureError, jwt
+from jose import JWTError, ExpiredSignatureError
 
 from prisma.errors import RecordNotFoundError
 
@@ -13,9 +14,12 @@ from app.schemas.user import (
 )
 from app.services.auth_service import AuthService
 from app.repositories.user_repository import UserRepository
-from app.db import db
-
-from app.settings import settings
+from app.services.tests_service import (
+    get_user_test_results_service,
+    stream_user_history_service,
+)
+from app.db import db, read_router
+from app.middleware.refreshed_token import REFRESHED_TOKEN_STATE
 
 router = APIRouter()
 
@@ -26,17 +30,14 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/br-general/auth/login")
 
 
 async def get_current_user(
+    request: Request,
     access_token: str = Depends(oauth2_scheme),
     x_refresh_token: str | None = Header(default=None),
 ):
     # try access first
     if access_token:
         try:
-            payload = jwt.decode(
-                access_token,
-                settings.jwt_secret_key,
-                algorithms=[settings.jwt_algorithm],
-            )
+            payload = auth_service.decode_access_token_cached(access_token)
             user_id = payload.get("sub")
             # return existing tokens (still valid)
             return {
@@ -60,17 +61,18 @@ async def get_current_user(
 
     # fallback: refresh token
     if x_refresh_token:
-        refresh_payload = auth_service.decode_token(x_refresh_token)
-        if not refresh_payload or refresh_payload.get("type") != "refresh":
+        refreshed = auth_service.refresh_access_token_cached(x_refresh_token)
+        if refreshed is None:
             raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-        user_id = refresh_payload.get("sub")
-        new_access = auth_service.create_access_token({"sub": user_id})
+        # hand the new access token back on every response, not only /me
+        # (RefreshedTokenMiddleware adds the X-Access-Token header)
+        setattr(request.state, REFRESHED_TOKEN_STATE, refreshed["access_token"])
 
         return {
-            "user_id": user_id,
+            "user_id": refreshed["user_id"],
             "tokens": {
-                "access_token": new_access,
+                "access_token": refreshed["access_token"],
                 "refresh_token": x_refresh_token,
                 "token_type": "bearer",
             },
@@ -96,9 +98,14 @@ async def read_users_me(
 
 
 @router.get("/me/personal", response_model=UserPersonalInfo)
-async def get_personal_info(current=Depends(get_current_user)):
+async def get_personal_info(
+    current=Depends(get_current_user),
+    x_read_after_write: str | None = Header(default=None),
+):
     user_id = current["user_id"]
-    user = await user_repo.get_personal_info(db, user_id)
+    user = await user_repo.get_personal_info(
+        read_router.reader_for(x_read_after_write), user_id
+    )
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -132,55 +139,29 @@ async def get_personal_info(current=Depends(get_current_user)):
     }
 
 
-@router.get("/me/tests/{test_id}")
-async def get_user_test_results(test_id: str, current=Depends(get_current_user)):
-    user_id = current["user_id"]
-
-    # Fetch all user sessions for this test
-    sessions = await db.testsession.find_many(
-        where={"userId": user_id, "testId": test_id},
-        include={
-            "answers": {
-                "include": {
-                    "question": True,
-                    "answerOption": True,
-                }
-            },
-            # include test details (title, description)
-            "test": True,
-        },
+# declared before /me/tests/{test_id} so "export" is not taken for a test id
+@router.get(
+    "/me/tests/export",
+    summary="Export the full test history of the current user",
+    description=(
+        "Streams every session with its answers and stats as NDJSON "
+        "(one JSON object per line, oldest session first)."
+    ),
+    response_class=StreamingResponse,
+)
+async def export_user_test_history(current=Depends(get_current_user)):
+    return StreamingResponse(
+        stream_user_history_service(db, user_id=current["user_id"]),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="test-history.ndjson"'},
     )
 
-    if not sessions:
-        raise HTTPException(status_code=404, detail="No sessions found for this test")
-
-    # use the first session’s test info as metadata (same for all sessions)
-    test_info = sessions[0].test
-
-    results = []
-    for session in sessions:
-        results.append(
-            {
-                "session_id": session.id,
-                "created_at": session.createdAt,
-                "finished_at": session.finishedAt,
-                "answers": [
-                    {
-                        "question_id": a.questionId,
-                        "question_text": a.question.text,
-                        "answer": a.answerOption.text,
-                    }
-                    for a in session.answers
-                ],
-            }
-        )
 
-    return {
-        "test_id": test_info.id,
-        "title": test_info.title,
-        "description": test_info.description,
-        "sessions": results,
-    }
+@router.get("/me/tests/{test_id}")
+async def get_user_test_results(test_id: str, current=Depends(get_current_user)):
+    return await get_user_test_results_service(
+        db, user_id=current["user_id"], test_id=test_id
+    )
 
 
 @router.get("/me/profile")
@@ -220,4 +201,7 @@ async def patch_user_profile(
     except RecordNotFoundError:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+    # /me/personal must show the new city, phone and language
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT, headers=read_router.write_headers()
+    )
@@ -1,5 +1,68 @@
-from prisma import Prisma
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-db = Prisma()
+from app.db.instrumentation import InstrumentedPrisma
+from app.db.routing import ReadRouter
+from app.settings import settings
 
-__all__ = ["db"]
+
+def pooled_database_url(
+    url: str,
+    *,
+    pool_size: Optional[int],
+    pool_timeout: int,
+    connect_timeout: int,
+    statement_timeout_ms: int,
+    pgbouncer: bool,
+) -> str:
+    """
+    Add the query engine's pool parameters to a Postgres URL.
+
+    Parameters already present in the URL win, so a hand-tuned DATABASE_URL
+    keeps working. With PgBouncer (transaction mode) prepared statements are
+    off and no startup `options` are sent; set statement_timeout on the role
+    instead.
+    """
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query, keep_blank_values=True))
+    tuned = {
+        "pool_timeout": str(pool_timeout),
+        "connect_timeout": str(connect_timeout),
+    }
+    if pool_size is not None:
+        tuned["connection_limit"] = str(pool_size)
+    if pgbouncer:
+        tuned["pgbouncer"] = "true"
+        tuned["statement_cache_size"] = "0"
+    elif statement_timeout_ms:
+        tuned["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    for key, value in tuned.items():
+        params.setdefault(key, value)
+    return urlunsplit(parts._replace(query=urlencode(params)))
+
+
+def _pooled(url: str) -> str:
+    return pooled_database_url(
+        url,
+        pool_size=settings.db_pool_size,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        connect_timeout=settings.db_connect_timeout_seconds,
+        statement_timeout_ms=settings.db_statement_timeout_ms,
+        pgbouncer=settings.db_pgbouncer,
+    )
+
+
+db = InstrumentedPrisma(datasource={"url": _pooled(settings.database_url)})
+
+# optional read replica, connected by the lifespan; see ReadRouter
+replica_db = (
+    InstrumentedPrisma(datasource={"url": _pooled(settings.database_replica_url)})
+    if settings.database_replica_url
+    else None
+)
+
+read_router = ReadRouter(
+    db, replica_db, sticky_seconds=settings.db_replica_sticky_seconds
+)
+
+__all__ = ["db", "pooled_database_url", "read_router", "replica_db"]
@@ -0,0 +1,54 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from prisma import Prisma
+
+
+class RequestQueries:
+    """Queries run on behalf of one request: count, total and slowest time."""
+
+    __slots__ = ("count", "total_ms", "slowest_ms", "slowest")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest: Optional[str] = None
+
+    def record(self, label: str, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.slowest_ms:
+            self.slowest_ms = ms
+            self.slowest = label
+
+
+# set by QueryTimingMiddleware for the duration of a request
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar(
+    "current_queries", default=None
+)
+
+
+class InstrumentedPrisma(Prisma):
+    """
+    Prisma client that times every query into the current RequestQueries.
+
+    All model actions, query_raw and execute_raw go through `_execute`;
+    transaction clients are copies of this class, so they are timed too.
+    Outside a request (workers, scripts) queries run untouched.
+    """
+
+    async def _execute(self, **kwargs: Any) -> Any:
+        queries = current_queries.get()
+        if queries is None:
+            return await super()._execute(**kwargs)
+
+        started = time.perf_counter()
+        try:
+            return await super()._execute(**kwargs)
+        finally:
+            model = kwargs.get("model")
+            method = kwargs.get("method")
+            label = f"{model.__name__}.{method}" if model is not None else method
+            queries.record(label, (time.perf_counter() - started) * 1000)
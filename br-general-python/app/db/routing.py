@@ -0,0 +1,108 @@
+import logging
+import time
+from typing import Dict, Optional
+
+from prisma import Prisma
+
+logger = logging.getLogger(__name__)
+
+
+# sent with the response to a write, holding the time of that write; the
+# client echoes it on its next requests so those reads see the write
+READ_AFTER_WRITE_HEADER = "X-Read-After-Write"
+
+
+class ReadRouter:
+    """
+    Picks the client for a read: the replica, or the primary when needed.
+
+    A write endpoint returns `write_headers()`, the time of the write, and
+    the client sends it back on later requests; a read made with a stamp
+    younger than `sticky_seconds` goes to the primary, so replication lag
+    never hides the client's own submission. The client carries the state,
+    so any worker or app replica routes the read without a lookup. Without
+    a replica, or when it could not be connected, everything goes to the
+    primary.
+    """
+
+    def __init__(
+        self,
+        primary: Prisma,
+        replica: Optional[Prisma],
+        *,
+        sticky_seconds: float,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.sticky_seconds = sticky_seconds
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self._replica_ready = False
+
+    async def connect(self) -> None:
+        """Connect the replica (app startup); on failure reads stay on the primary."""
+        if self.replica is None:
+            return
+        try:
+            await self.replica.connect()
+        except Exception as e:
+            logger.error(f"Read replica connect failed, using the primary: {e}")
+            return
+        self._replica_ready = True
+
+    async def disconnect(self) -> None:
+        if self._replica_ready:
+            self._replica_ready = False
+            await self.replica.disconnect()
+
+    def replica_available(self) -> bool:
+        return self._replica_ready
+
+    def write_headers(self) -> Dict[str, str]:
+        """Headers for the response to a write the client will want to read."""
+        if self.replica is None or not self.sticky_seconds:
+            return {}
+        return {READ_AFTER_WRITE_HEADER: f"{time.time():.3f}"}
+
+    def _is_sticky(self, written_at: Optional[str]) -> bool:
+        if not written_at or not self.sticky_seconds:
+            return False
+        try:
+            age = time.time() - float(written_at)
+        except ValueError:
+            return False
+        # either side of now: the clocks of app hosts may differ slightly
+        return abs(age) < self.sticky_seconds
+
+    def reader(self) -> Prisma:
+        """Client for a read of shared data (not tied to one user's writes)."""
+        if self.replica_available():
+            self.replica_reads += 1
+            return self.replica
+        self.primary_reads += 1
+        return self.primary
+
+    def reader_for(self, written_at: Optional[str]) -> Prisma:
+        """
+        Client for a read of the caller's own data; `written_at` is the
+        READ_AFTER_WRITE_HEADER value the client sent back, if any.
+        """
+        if not self.replica_available():
+            self.primary_reads += 1
+            return self.primary
+        if self._is_sticky(written_at):
+            self.sticky_reads += 1
+            self.primary_reads += 1
+            return self.primary
+        self.replica_reads += 1
+        return self.replica
+
+    def stats(self) -> dict:
+        return {
+            "replica": self.replica is not None,
+            "replica_connected": self.replica_available(),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+        }
@@ -1,22 +1,57 @@
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from app.db import db
+from app.db import db, read_router
 from app.api import api_router
+from app.middleware.prometheus import PrometheusMiddleware, mark_worker_dead
+from app.middleware.query_timing import QueryTimingMiddleware, route_query_stats
+from app.middleware.refreshed_token import RefreshedTokenMiddleware
+from app.services.auth_service import configure_password_hashing
+from app.services.email_outbox import email_outbox
+from app.services.email_templates import email_templates
+from app.services.password_pool import password_hash_pool
+from app.services.payment_events import payment_event_queue
+from app.services.smtp_pool import smtp_pool
+from app.services.top_sql_sampler import top_sql_sampler
+from app.services.yookassa_client import yookassa_client
 
 
 from fastapi.middleware.cors import CORSMiddleware
 from app.settings import settings
 
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # startup
+    configure_password_hashing()
+    email_templates.preload()
     await db.connect()
+    logger.info(
+        "Prisma pool: connection_limit=%s pool_timeout=%ss statement_timeout=%sms pgbouncer=%s",
+        settings.db_pool_size or "default",
+        settings.db_pool_timeout_seconds,
+        settings.db_statement_timeout_ms,
+        settings.db_pgbouncer,
+    )
+    await read_router.connect()
+    await payment_event_queue.recover()
+    email_outbox.start()
+    top_sql_sampler.start()
     yield
     # shutdown
+    await top_sql_sampler.stop()
+    await email_outbox.stop()
+    await payment_event_queue.stop()
+    password_hash_pool.shutdown()
+    await smtp_pool.close()
+    await yookassa_client.aclose()
+    await read_router.disconnect()
     await db.disconnect()
+    mark_worker_dead()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -30,8 +65,28 @@ app.add_middleware(
         "Authorization",
         "Content-Type",
         "x-refresh-token",  # custom header now allowed
+        "X-Read-After-Write",
         "X-Requested-With",
     ],
+    # pagination cursor of GET /tests/finished,
+    # access token re-issued from x-refresh-token,
+    # time of a write for read-your-writes (sent back by the client)
+    expose_headers=[
+        "X-Next-Cursor",
+        "X-Access-Token",
+        "X-Read-After-Write",
+        "Server-Timing",
+    ],
 )
 
+app.add_middleware(
+    QueryTimingMiddleware,
+    stats=route_query_stats,
+    header=settings.server_timing_header,
+)
+
+app.add_middleware(PrometheusMiddleware)
+
+app.add_middleware(RefreshedTokenMiddleware)
+
 app.include_router(api_router)
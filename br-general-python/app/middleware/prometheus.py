@@ -0,0 +1,115 @@
+import os
+import time
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.query_timing import UNMATCHED_ROUTE
+
+# with several uvicorn workers every process writes its samples to files in
+# this directory and /metrics merges them (see prometheus_client.multiprocess)
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response body was fully sent.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size.",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+# the route is only known once the router matched, so in-flight is per method
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+
+def metrics_payload() -> bytes:
+    """Text exposition of all metrics (merged over workers in multiprocess mode)."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+def mark_worker_dead() -> None:
+    """Drop this worker's live gauges (worker shutdown, multiprocess mode)."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class PrometheusMiddleware:
+    """
+    Records request count, latency, response size and in-flight requests.
+
+    Routes are labelled by their template (scope["route"].path), so
+    /tests/{test_id}/questions is one series however many tests exist;
+    requests no route matched share one label.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        size = 0
+        started = time.perf_counter()
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_PROGRESS.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            IN_PROGRESS.labels(method).dec()
+            route = scope.get("route")
+            path = route.path if route is not None else UNMATCHED_ROUTE
+            REQUESTS.labels(method, path, str(status)).inc()
+            LATENCY.labels(method, path).observe(time.perf_counter() - started)
+            RESPONSE_SIZE.labels(method, path).observe(size)
@@ -0,0 +1,115 @@
+import time
+from typing import Any, Dict, List
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.instrumentation import RequestQueries, current_queries
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RouteQueryStats:
+    """Per-route totals of request DB usage (per process, since startup)."""
+
+    def __init__(self) -> None:
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, route: str, queries: RequestQueries, duration_ms: float) -> None:
+        entry = self._routes.get(route)
+        if entry is None:
+            entry = self._routes[route] = {
+                "requests": 0,
+                "queries": 0,
+                "db_ms": 0.0,
+                "request_ms": 0.0,
+                "max_queries": 0,
+                "slowest_ms": 0.0,
+                "slowest": None,
+            }
+        entry["requests"] += 1
+        entry["queries"] += queries.count
+        entry["db_ms"] += queries.total_ms
+        entry["request_ms"] += duration_ms
+        entry["max_queries"] = max(entry["max_queries"], queries.count)
+        if queries.slowest_ms > entry["slowest_ms"]:
+            entry["slowest_ms"] = queries.slowest_ms
+            entry["slowest"] = queries.slowest
+
+    def snapshot(self, sort_by: str = "db_ms") -> List[Dict[str, Any]]:
+        items = []
+        for route, entry in self._routes.items():
+            requests = entry["requests"]
+            items.append(
+                {
+                    "route": route,
+                    **entry,
+                    "queries_per_request": entry["queries"] / requests,
+                    "db_ms_per_request": entry["db_ms"] / requests,
+                }
+            )
+        items.sort(key=lambda item: item[sort_by], reverse=True)
+        return items
+
+    def reset(self) -> None:
+        self._routes.clear()
+
+
+def server_timing(queries: RequestQueries, elapsed_ms: float) -> str:
+    value = (
+        f'db;dur={queries.total_ms:.1f};desc="{queries.count} queries", '
+        f"app;dur={elapsed_ms:.1f}"
+    )
+    if queries.slowest:
+        value += f', db-slowest;dur={queries.slowest_ms:.1f};desc="{queries.slowest}"'
+    return value
+
+
+class QueryTimingMiddleware:
+    """
+    Counts and times the Prisma queries of each HTTP request.
+
+    The totals go out as a Server-Timing header (db, app and db-slowest
+    entries) and into RouteQueryStats under "METHOD /route/{template}".
+    Queries after the response has started (streaming bodies, background
+    tasks) are not in the header but are counted for the route.
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, stats: RouteQueryStats, header: bool = True
+    ) -> None:
+        self.app = app
+        self.stats = stats
+        self.header = header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = current_queries.set(queries)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.header:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(queries, elapsed_ms))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_queries.reset(token)
+            # set by the router once a route matched
+            route = scope.get("route")
+            key = (
+                f"{scope['method']} {route.path}"
+                if route is not None
+                else UNMATCHED_ROUTE
+            )
+            self.stats.record(key, queries, (time.perf_counter() - started) * 1000)
+
+
+route_query_stats = RouteQueryStats()
@@ -0,0 +1,36 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# request.state key set by get_current_user when it minted a new access token
+REFRESHED_TOKEN_STATE = "refreshed_access_token"
+
+
+class RefreshedTokenMiddleware:
+    """
+    Sends the access token re-issued from x-refresh-token as X-Access-Token.
+
+    Setting the header on the injected Response only reaches endpoints that
+    return plain data; a Response, StreamingResponse or 204 returned by the
+    endpoint replaces it. The token is taken from the request state instead,
+    so every response of the request carries it.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # the same dict backs request.state further down the stack
+        state = scope.setdefault("state", {})
+
+        async def send_with_token(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                token = state.get(REFRESHED_TOKEN_STATE)
+                if token:
+                    MutableHeaders(scope=message)["X-Access-Token"] = token
+            await send(message)
+
+        await self.app(scope, receive, send_with_token)
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# EmailLog timestamps are stored as UTC without a time zone
+_NOW_UTC = "(NOW() AT TIME ZONE 'UTC')"
+
+
+class EmailOutboxRepository:
+    async def enqueue(self, db, rows: List[Dict[str, Any]]) -> int:
+        """Insert PENDING EmailLog rows, due now."""
+        return await db.emaillog.create_many(
+            data=[{**row, "status": "PENDING"} for row in rows]
+        )
+
+    async def claim_due(
+        self, db, *, limit: int, lease_seconds: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Take up to `limit` due PENDING rows for this worker.
+
+        SKIP LOCKED lets concurrent workers (and processes) claim disjoint
+        rows. Claiming counts an attempt and pushes nextAttemptAt out by the
+        lease, so a row whose worker died becomes due again by itself.
+        """
+        return await db.query_raw(
+            f"""
+            UPDATE "EmailLog"
+            SET "attempts" = "attempts" + 1,
+                "nextAttemptAt" = {_NOW_UTC} + make_interval(secs => $2::float8)
+            WHERE "id" IN (
+                SELECT "id" FROM "EmailLog"
+                WHERE "status" = 'PENDING' AND "nextAttemptAt" <= {_NOW_UTC}
+                ORDER BY "nextAttemptAt"
+                LIMIT $1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING "id", "to", "subject", "body", "text", "attempts"
+            """,
+            limit,
+            lease_seconds,
+        )
+
+    async def extend_lease(self, db, ids: List[str], lease_seconds: float) -> None:
+        """Push the lease of claimed rows still waiting in a worker's batch."""
+        if ids:
+            await db.emaillog.update_many(
+                where={"id": {"in": ids}, "status": "PENDING"},
+                data={
+                    "nextAttemptAt": datetime.now(timezone.utc)
+                    + timedelta(seconds=lease_seconds)
+                },
+            )
+
+    async def mark_sent(self, db, ids: List[str]) -> None:
+        if ids:
+            await db.emaillog.update_many(
+                where={"id": {"in": ids}},
+                data={
+                    "status": "SENT",
+                    "sentAt": datetime.now(timezone.utc),
+                    "error": None,
+                },
+            )
+
+    async def mark_failed(
+        self, db, id: str, error: str, *, retry_at: Optional[datetime]
+    ) -> None:
+        """Schedule a retry at `retry_at`, or give up (FAILED) when it is None."""
+        data: Dict[str, Any] = {"error": error[:2000]}
+        if retry_at is None:
+            data["status"] = "FAILED"
+        else:
+            data["nextAttemptAt"] = retry_at
+        await db.emaillog.update(where={"id": id}, data=data)
+
+    async def defer(self, db, id: str, seconds: float) -> None:
+        """Put a claimed row back without counting the attempt (rate limit)."""
+        await db.emaillog.update(
+            where={"id": id},
+            data={
+                "attempts": {"decrement": 1},
+                "nextAttemptAt": datetime.now(timezone.utc)
+                + timedelta(seconds=seconds),
+            },
+        )
+
+    async def job_progress(self, db, job_id: str) -> Dict[str, int]:
+        """Rows of one bulk job per status."""
+        rows = await db.query_raw(
+            'SELECT "status", COUNT(*)::int AS count FROM "EmailLog" '
+            'WHERE "jobId" = $1 GROUP BY "status"',
+            job_id,
+        )
+        return {r["status"]: r["count"] for r in rows}
+
+    async def count_by_status(self, db) -> Dict[str, int]:
+        rows = await db.query_raw(
+            'SELECT "status", COUNT(*)::int AS count FROM "EmailLog" GROUP BY "status"'
+        )
+        return {r["status"]: r["count"] for r in rows}
+
+
+email_outbox_repo = EmailOutboxRepository()
@@ -0,0 +1,57 @@
+import json
+from datetime import datetime, timezone
+
+
+class PaymentEventRepository:
+    async def record(self, db, payment_id: str, event: str, payload: dict) -> bool:
+        """Store a webhook event once per payment; False for a repeated delivery."""
+        inserted = await db.execute_raw(
+            'INSERT INTO "PaymentEvent" ("id", "paymentId", "event", "payload") '
+            "VALUES (gen_random_uuid()::text, $1, $2, $3::jsonb) "
+            'ON CONFLICT ("paymentId") DO NOTHING',
+            payment_id,
+            event,
+            json.dumps(payload),
+        )
+        return inserted > 0
+
+    async def get(self, db, payment_id: str):
+        return await db.paymentevent.find_unique(where={"paymentId": payment_id})
+
+    async def pending_ids(self, db) -> list[str]:
+        rows = await db.paymentevent.find_many(
+            where={"status": "PENDING"}, order={"createdAt": "asc"}
+        )
+        return [row.paymentId for row in rows]
+
+    async def claim(self, db, payment_id: str) -> bool:
+        """
+        Mark a PENDING event PROCESSED; False if another worker already did.
+
+        Meant to run inside the transaction that applies the event, so a
+        rollback puts it back to PENDING.
+        """
+        claimed = await db.paymentevent.update_many(
+            where={"paymentId": payment_id, "status": "PENDING"},
+            data={
+                "status": "PROCESSED",
+                "processedAt": datetime.now(timezone.utc),
+                "attempts": {"increment": 1},
+            },
+        )
+        return claimed > 0
+
+    async def record_failure(
+        self, db, payment_id: str, error: str, *, dead: bool
+    ) -> None:
+        await db.paymentevent.update_many(
+            where={"paymentId": payment_id, "status": "PENDING"},
+            data={
+                "status": "DEAD" if dead else "PENDING",
+                "lastError": error[:2000],
+                "attempts": {"increment": 1},
+            },
+        )
+
+
+payment_event_repo = PaymentEventRepository()
@@ -2,9 +2,9 @@ from app.db import db
 
 
 class SubscriptionRepository:
-    async def get_by_user(self, user_id: str):
+    async def get_by_user(self, user_id: str, db_client=db):
         """Return all subscriptions for a specific user (latest first)."""
-        return await db.subscription.find_many(
+        return await db_client.subscription.find_many(
             where={"userId": user_id}, order={"startedAt": "desc"}
         )
 
@@ -2,7 +2,14 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from prisma import Prisma
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _raw_datetime(value: Any) -> Optional[datetime]:
+    """query_raw returns timestamps as ISO strings; models use datetime."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
 
 
 # Read queries
@@ -35,22 +42,36 @@ async def fetch_finished_tests_repo(
     *,
     user_id: str,
     topic_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, str]] = None,
+    include_test: bool = True,
+    include_stats: bool = True,
 ) -> List[Dict[str, Any]]:
     """
-    Return finished sessions for a user (optionally filter by topic).
+    Return finished sessions for a user (optionally filter by topic),
+    newest first, ordered by (finishedAt, id).
+    `after` is a keyset cursor: only sessions strictly after that
+    (finishedAt, id) position in this order are returned.
     Used by: GET /tests/finished
     """
     where: Dict[str, Any] = {"userId": user_id, "finishedAt": {"not": None}}
     if topic_id:
         # Filter by specific topic through relation to Test
         where["test"] = {"topicId": topic_id}
+    if after:
+        finished_at, session_id = after
+        where["OR"] = [
+            {"finishedAt": {"lt": finished_at}},
+            {"finishedAt": finished_at, "id": {"lt": session_id}},
+        ]
 
     sessions = await db.testsession.find_many(
         where=where,
-        order={"finishedAt": "desc"},
+        order=[{"finishedAt": "desc"}, {"id": "desc"}],
+        take=limit,
         include={
-            "test": True,
-            "stats": True,  # pull SessionStat[] to build {key: value}
+            "test": include_test,
+            "stats": include_stats,  # pull SessionStat[] to build {key: value}
         },
     )
     return sessions
@@ -61,37 +82,106 @@ async def fetch_finished_topics_repo(
 ) -> List[Dict[str, Any]]:
     """
     Topics where the user has at least one finished test, with last finished date.
+    Aggregated in SQL (one row per topic), backed by TestSession(userId, finishedAt).
     Used by: GET /tests/finished/topics
     """
-    sessions = await db.testsession.find_many(
-        where={"userId": user_id, "finishedAt": {"not": None}},
-        order={"finishedAt": "desc"},
+    rows = await db.query_raw(
+        """
+        SELECT tp."id" AS "topicId",
+               tp."title" AS "topicTitle",
+               last."lastFinishedAt"
+        FROM (
+            SELECT t."topicId", MAX(s."finishedAt") AS "lastFinishedAt"
+            FROM "TestSession" s
+            JOIN "Test" t ON t."id" = s."testId"
+            WHERE s."userId" = $1 AND s."finishedAt" IS NOT NULL
+            GROUP BY t."topicId"
+        ) last
+        JOIN "Topic" tp ON tp."id" = last."topicId"
+        ORDER BY last."lastFinishedAt" DESC
+        """,
+        user_id,
+    )
+
+    return [
+        {
+            "topicId": row["topicId"],
+            "topicTitle": row["topicTitle"],
+            "lastFinishedAt": _raw_datetime(row["lastFinishedAt"]),
+        }
+        for row in rows
+    ]
+
+
+async def fetch_user_sessions_chunk_repo(
+    db: Prisma,
+    *,
+    user_id: str,
+    limit: int,
+    after: Optional[Tuple[datetime, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    One chunk of a user's sessions (oldest first, ordered by (createdAt, id))
+    with test, answers and stats. `after` is the keyset cursor of the last
+    session of the previous chunk.
+    Used by: GET /users/me/tests/export
+    """
+    where: Dict[str, Any] = {"userId": user_id}
+    if after:
+        created_at, session_id = after
+        where["OR"] = [
+            {"createdAt": {"gt": created_at}},
+            {"createdAt": created_at, "id": {"gt": session_id}},
+        ]
+
+    return await db.testsession.find_many(
+        where=where,
+        order=[{"createdAt": "asc"}, {"id": "asc"}],
+        take=limit,
         include={
-            "test": {
-                "include": {
-                    "topic": True,
-                }
-            }
+            "test": True,
+            "answers": {"order_by": {"createdAt": "asc"}},
+            "stats": True,
         },
     )
 
-    last_by_topic: Dict[str, Any] = {}
-    for session in sessions:
-        topic = session.test.topic
-        if not topic:
-            continue
-        topic_id = topic.id
-        prev = last_by_topic.get(topic_id)
-        if not prev or (
-            session.finishedAt and session.finishedAt > prev["lastFinishedAt"]
-        ):
-            last_by_topic[topic_id] = {
-                "topicId": topic_id,
-                "topicTitle": topic.title,
-                "lastFinishedAt": session.finishedAt,
-            }
 
-    return list(last_by_topic.values())
+async def fetch_user_test_answers_flat_repo(
+    db: Prisma, *, user_id: str, test_id: str
+) -> List[Dict[str, Any]]:
+    """
+    One flat row per given answer of the user's sessions of a test:
+    (testTitle, testDescription, sessionId, createdAt, finishedAt, questionId,
+    questionText, optionText, freeText).
+    Sessions without answers yield one row with NULL answer columns.
+    Used by: GET /users/me/tests/{test_id}
+    """
+    rows = await db.query_raw(
+        """
+        SELECT t."title" AS "testTitle",
+               t."description" AS "testDescription",
+               s."id" AS "sessionId",
+               s."createdAt",
+               s."finishedAt",
+               a."questionId",
+               q."text" AS "questionText",
+               o."text" AS "optionText",
+               a."freeText"
+        FROM "TestSession" s
+        JOIN "Test" t ON t."id" = s."testId"
+        LEFT JOIN "GivenAnswer" a ON a."sessionId" = s."id"
+        LEFT JOIN "Question" q ON q."id" = a."questionId"
+        LEFT JOIN "AnswerOption" o ON o."id" = a."answerOptionId"
+        WHERE s."userId" = $1 AND s."testId" = $2
+        ORDER BY s."createdAt", s."id", a."createdAt", a."id"
+        """,
+        user_id,
+        test_id,
+    )
+    for row in rows:
+        row["createdAt"] = _raw_datetime(row["createdAt"])
+        row["finishedAt"] = _raw_datetime(row["finishedAt"])
+    return rows
 
 
 # Write queries
@@ -115,15 +205,14 @@ async def create_test_session_repo(
     )
 
 
-async def save_answers_bulk_repo(
-    db: Prisma,
-    *,
-    session_id: str,
-    answers: List[Dict[str, Any]],
-) -> None:
+def _answer_rows(
+    session_id: str, answers: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
     """
-    Save all answers for a session.
+    Flatten submitted answers into GivenAnswer rows.
+    Raises ValueError before anything is written if an answer has no questionId.
     """
+    rows: List[Dict[str, Any]] = []
     for answer in answers:
         question_id: str = answer.get("questionId")
         if not question_id:
@@ -133,8 +222,8 @@ async def save_answers_bulk_repo(
         selected_option_ids = answer.get("selectedOptionIds")
         if isinstance(selected_option_ids, list) and selected_option_ids:
             for option_id in selected_option_ids:
-                await db.givenanswer.create(
-                    data={
+                rows.append(
+                    {
                         "sessionId": session_id,
                         "questionId": question_id,
                         "answerOptionId": option_id,
@@ -145,8 +234,8 @@ async def save_answers_bulk_repo(
         # Single option (RADIO)
         single_option_id = answer.get("answerOptionId")
         if single_option_id:
-            await db.givenanswer.create(
-                data={
+            rows.append(
+                {
                     "sessionId": session_id,
                     "questionId": question_id,
                     "answerOptionId": single_option_id,
@@ -157,8 +246,8 @@ async def save_answers_bulk_repo(
         # TEXT
         free_text = answer.get("textAnswer") or answer.get("freeText")
         if free_text:
-            await db.givenanswer.create(
-                data={
+            rows.append(
+                {
                     "sessionId": session_id,
                     "questionId": question_id,
                     "freeText": free_text,
@@ -166,36 +255,79 @@ async def save_answers_bulk_repo(
             )
             continue
 
+    return rows
+
+
+async def save_answers_bulk_repo(
+    db: Prisma,
+    *,
+    session_id: str,
+    answers: List[Dict[str, Any]],
+) -> int:
+    """
+    Save all answers for a session with a single multi-row INSERT.
+    Returns the number of GivenAnswer rows written.
+    """
+    rows = _answer_rows(session_id, answers)
+    if not rows:
+        return 0
+
+    return await db.givenanswer.create_many(data=rows)
+
+
+# SessionStat.value is a Postgres INTEGER
+_STAT_VALUE_MIN = -(2**31)
+_STAT_VALUE_MAX = 2**31 - 1
+
+
+def _stat_rows(stats: Dict[str, int]) -> Tuple[List[Tuple[str, int]], Dict[str, str]]:
+    """Split submitted metrics into storable (key, value) rows and per-key failures."""
+    rows: List[Tuple[str, int]] = []
+    failed: Dict[str, str] = {}
+    for metric_key, metric_value in (stats or {}).items():
+        key = str(metric_key)
+        if not key.strip():
+            failed[key] = "EMPTY_KEY"
+            continue
+        try:
+            value = int(metric_value)
+        except (TypeError, ValueError):
+            failed[key] = "NOT_AN_INTEGER"
+            continue
+        if not _STAT_VALUE_MIN <= value <= _STAT_VALUE_MAX:
+            failed[key] = "OUT_OF_RANGE"
+            continue
+        rows.append((key, value))
+    return rows, failed
+
 
 async def finish_session_with_stats_repo(
     db: Prisma,
     *,
     session_id: str,
     stats: Dict[str, int],
-) -> None:
+) -> Dict[str, str]:
     """
     Store key/value metrics into SessionStat and mark session as finished.
+    All valid metrics are upserted with one INSERT ... ON CONFLICT statement.
+    Returns {key: reason} for metrics that were rejected and not stored.
     """
-    # Upsert each metric into SessionStat (unique by (sessionId, key))
-    for metric_key, metric_value in (stats or {}).items():
-        try:
-            await db.sessionstat.upsert(
-                where={
-                    "sessionId_key": {"sessionId": session_id, "key": str(metric_key)}
-                },
-                data={
-                    "create": {
-                        "sessionId": session_id,
-                        "key": str(metric_key),
-                        "value": int(metric_value),
-                    },
-                    "update": {
-                        "value": int(metric_value),
-                    },
-                },
-            )
-        except Exception:
-            pass
+    rows, failed = _stat_rows(stats)
+
+    if rows:
+        # $1 is the session id, then one (key, value) pair per metric
+        values_sql = ", ".join(
+            f"(gen_random_uuid()::text, $1, ${2 * i + 2}, ${2 * i + 3}::int)"
+            for i in range(len(rows))
+        )
+        params = [param for row in rows for param in row]
+        await db.execute_raw(
+            'INSERT INTO "SessionStat" ("id", "sessionId", "key", "value") '
+            f"VALUES {values_sql} "
+            'ON CONFLICT ("sessionId", "key") DO UPDATE SET "value" = EXCLUDED."value"',
+            session_id,
+            *params,
+        )
 
     await db.testsession.update(
         where={"id": session_id},
@@ -204,3 +336,4 @@ async def finish_session_with_stats_repo(
             "isFinished": True,
         },
     )
+    return failed
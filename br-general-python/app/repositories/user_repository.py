@@ -17,6 +17,16 @@ class UserRepository:
             }
         )
 
+    async def replace_password_hash(
+        self, db, user_id: str, old_hash: str, new_hash: str
+    ) -> bool:
+        # compare-and-set: a password changed meanwhile is left alone
+        updated = await db.user.update_many(
+            where={"id": user_id, "hashed_password": old_hash},
+            data={"hashed_password": new_hash},
+        )
+        return updated > 0
+
     async def get_personal_info(self, db, user_id: str):
         return await db.user.find_unique(
             where={"id": user_id},
@@ -1,3 +1,6 @@
+import os
+import shutil
+
 import uvicorn
 from app.settings import settings
 
@@ -7,6 +10,12 @@ if __name__ == "__main__":
     port = settings.server_port
     print(f"Starting server on port {port} (reload={settings.flag_reload})...")
 
+    # samples of a previous run must not be merged into the new one
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir)
+
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
@@ -1,6 +1,9 @@
 # app/schemas/email.py
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, EmailStr, field_validator
+from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, EmailStr, Field, field_validator
+
+# upper bound of one bulk request; larger campaigns are split by the caller
+MAX_BULK_RECIPIENTS = 10000
 
 
 class EmailSendRequest(BaseModel):
@@ -31,3 +34,32 @@ class EmailSendRequest(BaseModel):
 class EmailSendResponse(BaseModel):
     accepted: bool
     message: str = "Email scheduled for delivery"
+
+
+class EmailBulkRecipient(BaseModel):
+    to: EmailStr
+    params: Dict[str, Any] = {}  # variables for template
+
+
+class EmailBulkSendRequest(BaseModel):
+    subject: str
+    template: str  # e.g. "email/welcome.html"
+    text: Optional[str] = None  # plain-text part, same for every recipient
+    recipients: List[EmailBulkRecipient] = Field(
+        ..., min_length=1, max_length=MAX_BULK_RECIPIENTS
+    )
+
+    @field_validator("subject")
+    @classmethod
+    def _subject_not_empty(cls, v: str) -> str:
+        if not v.strip():
+            raise ValueError("Subject cannot be empty")
+        return v
+
+
+class EmailJobProgress(BaseModel):
+    job_id: str
+    total: int
+    pending: int
+    sent: int
+    failed: int
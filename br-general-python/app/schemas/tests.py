@@ -75,6 +75,11 @@ class BulkSaveAnswersResponse(BaseModel):
     is_finished: bool = Field(
         ..., alias="isFinished", description="Indicates whether the session was closed."
     )
+    failed_stats: Dict[str, str] = Field(
+        default_factory=dict,
+        alias="failedStats",
+        description="Stats that were not stored, with the reason (e.g. NOT_AN_INTEGER).",
+    )
 
 
 class UserTestResult(BaseModel):
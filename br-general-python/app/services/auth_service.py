@@ -1,12 +1,172 @@
+import hashlib
+import logging
+import statistics
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt, ExpiredSignatureError
 from passlib.context import CryptContext
+from app.services.password_pool import password_hash_pool
 from app.settings import settings
-from typing import Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+# never calibrate memory below the OWASP minimum for argon2id (19 MiB)
+ARGON2_MIN_MEMORY_COST = 19456
+ARGON2_DEFAULT_MEMORY_COST = 65536
+ARGON2_DEFAULT_PARALLELISM = 4
+ARGON2_MAX_TIME_COST = 10
+
+
+def _measure_argon2_verify_ms(
+    time_cost: int, memory_cost: int, parallelism: int, samples: int
+) -> float:
+    handler = pwd_context.handler("argon2").using(
+        rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    hashed = handler.hash("calibration")
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.verify("calibration", hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_argon2(
+    target_ms: float,
+    *,
+    time_cost: Optional[int] = None,
+    memory_cost: Optional[int] = None,
+    parallelism: Optional[int] = None,
+    samples: int = 3,
+) -> Dict[str, Any]:
+    """
+    Pick Argon2 costs whose verify time on this host stays within `target_ms`.
+    Offline only (benchmarks/bench_argon2_calibration.py): the measurement is
+    noisy, so hosts calibrating on their own would settle on different costs.
+
+    Costs passed explicitly are kept as they are. Memory is halved (down to
+    ARGON2_MIN_MEMORY_COST) while a single pass is slower than the target,
+    then time_cost grows while the next step still fits.
+    """
+    params = {
+        "time_cost": time_cost or 1,
+        "memory_cost": memory_cost or ARGON2_DEFAULT_MEMORY_COST,
+        "parallelism": parallelism or ARGON2_DEFAULT_PARALLELISM,
+    }
+    elapsed = _measure_argon2_verify_ms(**params, samples=samples)
+
+    if memory_cost is None:
+        while (
+            elapsed > target_ms and params["memory_cost"] // 2 >= ARGON2_MIN_MEMORY_COST
+        ):
+            params["memory_cost"] //= 2
+            elapsed = _measure_argon2_verify_ms(**params, samples=samples)
+
+    if time_cost is None:
+        while params["time_cost"] < ARGON2_MAX_TIME_COST:
+            candidate = {**params, "time_cost": params["time_cost"] + 1}
+            candidate_ms = _measure_argon2_verify_ms(**candidate, samples=samples)
+            if candidate_ms > target_ms:
+                break
+            params, elapsed = candidate, candidate_ms
+
+    return {**params, "verify_ms": round(elapsed, 1)}
+
+
+def configure_password_hashing() -> Optional[Dict[str, Any]]:
+    """
+    Apply the pinned ARGON2_* costs to pwd_context (called once at startup).
+
+    Hashes made with other costs report needs_update and are rewritten on
+    the next successful login. Without ARGON2_* settings the passlib
+    defaults stay in place.
+    """
+    if settings.argon2_time_cost is None:
+        return None
+
+    params = {
+        "time_cost": settings.argon2_time_cost,
+        "memory_cost": settings.argon2_memory_cost,
+        "parallelism": settings.argon2_parallelism,
+    }
+    pwd_context.update(
+        argon2__rounds=params["time_cost"],
+        argon2__min_desired_rounds=params["time_cost"],
+        argon2__max_desired_rounds=params["time_cost"],
+        argon2__memory_cost=params["memory_cost"],
+        argon2__parallelism=params["parallelism"],
+    )
+
+    logger.info("argon2 parameters: %s", params)
+    return params
+
+
+class VerifiedTokenCache:
+    """
+    Bounded TTL cache of verified JWTs, keyed by the sha256 digest of the token.
+
+    Entries live until the token's own `exp`, so a cached value is never
+    handed out for a token jwt.decode would already reject as expired.
+    Least recently used entries are dropped once `max_entries` is reached.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[float, Any]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Any]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, token: str, value: Any, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        key = self._key(token)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# decoded access-token claims, until the access token's exp
+access_claims_cache = VerifiedTokenCache(settings.auth_token_cache_size)
+# refresh token -> (access token minted from it, user id), until either expires
+refreshed_access_cache = VerifiedTokenCache(settings.auth_token_cache_size)
+
 
 class AuthService:
     """Handles authentication logic: password hashing, JWT creation and decoding."""
@@ -19,6 +179,22 @@ class AuthService:
         """Verify a plain password against its hashed value."""
         return pwd_context.verify(plain_password, hashed_password)
 
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True if the hash was made with other Argon2 costs than configured."""
+        return pwd_context.needs_update(hashed_password)
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """Hash on the Argon2 worker pool; 503 when the pool is saturated."""
+        return await password_hash_pool.run(pwd_context.hash, password)
+
+    async def verify_password_async(
+        self, plain_password: str, hashed_password: str
+    ) -> bool:
+        """Verify on the Argon2 worker pool; 503 when the pool is saturated."""
+        return await password_hash_pool.run(
+            pwd_context.verify, plain_password, hashed_password
+        )
+
     def create_access_token(self, data: dict) -> str:
         """Create a short-lived access JWT."""
         to_encode = data.copy()
@@ -74,3 +250,51 @@ class AuthService:
             return "expired"
         except JWTError:
             return None
+
+    def decode_access_token_cached(self, token: str) -> dict:
+        """
+        Decode an access JWT, reusing the claims of an earlier successful decode.
+
+        Raises the same ExpiredSignatureError / JWTError as jwt.decode.
+        Tokens without `exp` are verified every time.
+        """
+        claims = access_claims_cache.get(token)
+        if claims is not None:
+            return claims
+        claims = jwt.decode(
+            token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
+        )
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            access_claims_cache.put(token, claims, float(exp))
+        return claims
+
+    def refresh_access_token_cached(self, refresh_token: str) -> Optional[dict]:
+        """
+        Mint an access token from a refresh token.
+
+        The minted token is reused for the same refresh token until either of
+        them expires. Returns {"user_id", "access_token"} or None when the
+        refresh token is invalid.
+        """
+        cached = refreshed_access_cache.get(refresh_token)
+        if cached is not None:
+            return cached
+
+        refresh_payload = self.decode_token(refresh_token)
+        if not refresh_payload or refresh_payload.get("type") != "refresh":
+            return None
+
+        user_id = refresh_payload.get("sub")
+        access_token = self.create_access_token({"sub": user_id})
+        result = {"user_id": user_id, "access_token": access_token}
+
+        access_exp = jwt.get_unverified_claims(access_token)["exp"]
+        refresh_exp = refresh_payload.get("exp")
+        expires_at = (
+            min(access_exp, refresh_exp)
+            if isinstance(refresh_exp, (int, float))
+            else access_exp
+        )
+        refreshed_access_cache.put(refresh_token, result, float(expires_at))
+        return result
@@ -0,0 +1,327 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from app.db import db
+from app.repositories.email_outbox_repository import email_outbox_repo
+from app.services.email_service import EmailService, email_service
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# floor for waiting on a booked slot, in case the DB clock is slightly behind
+MIN_SLOT_WAIT_SECONDS = 0.05
+
+
+class DomainRateLimiter:
+    """
+    Hands out send slots per recipient domain, at least 60/rate seconds apart.
+
+    A message that cannot go now is booked the next free slot of its domain,
+    so a backlog for one domain is spread out by its position in the queue
+    instead of being retried all together; when the message comes back at
+    its slot it is sent without queueing again. Bookings are per process,
+    like the rate itself.
+    """
+
+    def __init__(self, per_minute: int):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_free: Dict[str, float] = {}
+        # message id -> booked slot (monotonic time)
+        self._booked: Dict[str, float] = {}
+
+    def reserve(self, domain: str, key: str) -> float:
+        """0 if message `key` may be sent now, else seconds until its slot."""
+        if not self.interval:
+            return 0.0
+        now = time.monotonic()
+        slot = self._booked.pop(key, None)
+        if slot is None:
+            slot = max(self._next_free.get(domain, now), now)
+            self._next_free[domain] = slot + self.interval
+        if slot <= now:
+            return 0.0
+        self._booked[key] = slot
+        return slot - now
+
+    def next_slot_in(self) -> Optional[float]:
+        """Seconds until the earliest booked slot still ahead, None if none."""
+        now = time.monotonic()
+        ahead = [slot for slot in self._booked.values() if slot > now]
+        return min(ahead) - now if ahead else None
+
+    def prune(self, max_age: float) -> None:
+        """Forget bookings whose message never came back (claimed elsewhere)."""
+        cutoff = time.monotonic() - max_age
+        for key in [k for k, slot in self._booked.items() if slot < cutoff]:
+            del self._booked[key]
+
+
+class EmailOutbox:
+    """
+    Durable outbound email queue on top of EmailLog.
+
+    `enqueue` stores a PENDING row. `workers` tasks claim due rows in batches
+    (FOR UPDATE SKIP LOCKED, so several processes can run workers), send them
+    one by one over the shared SMTP pool and mark each SENT as soon as it is
+    out. The lease of the rows still waiting in a batch is renewed while the
+    batch is sent, so slow sends cannot make them due for another worker.
+    A failed send is retried after retry_base_seconds * 2**(attempt - 1);
+    after `max_attempts` the row is FAILED. Rows over their domain's rate are put back until their booked
+    send slot, without using up an attempt.
+    """
+
+    def __init__(
+        self,
+        service: EmailService,
+        *,
+        workers: int,
+        batch_size: int,
+        max_attempts: int,
+        retry_base_seconds: float,
+        lease_seconds: float,
+        poll_seconds: float,
+        domain_rate_per_minute: int,
+        insert_batch_size: int = 500,
+    ):
+        self.service = service
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.limiter = DomainRateLimiter(domain_rate_per_minute)
+        self.insert_batch_size = insert_batch_size
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.deferred = 0
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def _get_wakeup(self) -> asyncio.Event:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        return self._wakeup
+
+    def _build_rows(
+        self, messages: List[Dict[str, Any]], job_id: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        rows = []
+        for m in messages:
+            html = m.get("html")
+            if m.get("template"):
+                html = self.service._render_template(
+                    m["template"], m.get("params") or {}
+                )
+            row = {
+                "to": m["to"],
+                "subject": m["subject"],
+                "template": m.get("template") or "",
+                "body": html,
+                "text": m.get("text"),
+            }
+            if job_id:
+                row["jobId"] = job_id
+            rows.append(row)
+        return rows
+
+    async def enqueue_many(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Store messages (to, subject, text, html, template, params) as PENDING.
+
+        Templates are rendered here, so workers only send stored content.
+        """
+        rows = self._build_rows(messages, None)
+        count = await email_outbox_repo.enqueue(db, rows)
+        self._get_wakeup().set()
+        return count
+
+    async def enqueue_bulk(
+        self,
+        *,
+        subject: str,
+        template: str,
+        recipients: List[Dict[str, Any]],
+        text: Optional[str] = None,
+    ) -> str:
+        """
+        Store one PENDING row per recipient ({"to", "params"}) under a new job id.
+
+        Rendering runs in a worker thread so a large campaign does not stall
+        the event loop; rows are inserted in batches inside one transaction,
+        so a job is either queued completely or not at all.
+        """
+        job_id = uuid4().hex
+        messages = [
+            {
+                "to": r["to"],
+                "subject": subject,
+                "text": text,
+                "template": template,
+                "params": r.get("params") or {},
+            }
+            for r in recipients
+        ]
+        rows = await asyncio.to_thread(self._build_rows, messages, job_id)
+        async with db.tx(timeout=timedelta(seconds=60)) as tx:
+            for start in range(0, len(rows), self.insert_batch_size):
+                await email_outbox_repo.enqueue(
+                    tx, rows[start : start + self.insert_batch_size]
+                )
+        self._get_wakeup().set()
+        return job_id
+
+    async def job_progress(self, job_id: str) -> Dict[str, int]:
+        """Counters of a bulk job; total is 0 for an unknown job id."""
+        counts = await email_outbox_repo.job_progress(db, job_id)
+        return {
+            "total": sum(counts.values()),
+            "pending": counts.get("PENDING", 0),
+            "sent": counts.get("SENT", 0),
+            "failed": counts.get("FAILED", 0),
+        }
+
+    async def enqueue(
+        self,
+        *,
+        to: str,
+        subject: str,
+        text: Optional[str] = None,
+        html: Optional[str] = None,
+        template: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        await self.enqueue_many(
+            [
+                {
+                    "to": to,
+                    "subject": subject,
+                    "text": text,
+                    "html": html,
+                    "template": template,
+                    "params": params,
+                }
+            ]
+        )
+
+    async def _send_row(self, row: Dict[str, Any]) -> None:
+        """Send one claimed row and record the outcome on it right away."""
+        domain = row["to"].rsplit("@", 1)[-1].lower()
+        wait = self.limiter.reserve(domain, row["id"])
+        if wait:
+            self.deferred += 1
+            await email_outbox_repo.defer(db, row["id"], wait)
+            return
+
+        try:
+            await self.service.deliver(
+                to=row["to"], subject=row["subject"], text=row["text"], html=row["body"]
+            )
+        except Exception as e:
+            attempts = row["attempts"]
+            error = f"{type(e).__name__}: {e}"
+            if attempts >= self.max_attempts:
+                self.failed += 1
+                logger.error(f"Email {row['id']} to {row['to']} failed: {error}")
+                await email_outbox_repo.mark_failed(db, row["id"], error, retry_at=None)
+            else:
+                self.retried += 1
+                delay = self.retry_base_seconds * (2 ** (attempts - 1))
+                retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                await email_outbox_repo.mark_failed(
+                    db, row["id"], error, retry_at=retry_at
+                )
+            return
+        # recorded now: a crash later in the batch must not send it again
+        await email_outbox_repo.mark_sent(db, [row["id"]])
+        self.sent += 1
+
+    async def process_batch(self) -> int:
+        """Claim and handle one batch of due rows; returns how many were claimed."""
+        rows = await email_outbox_repo.claim_due(
+            db, limit=self.batch_size, lease_seconds=self.lease_seconds
+        )
+        self.limiter.prune(self.lease_seconds)
+        leased_at = time.monotonic()
+        for n, row in enumerate(rows):
+            # renew at half the lease: one send (SMTP timeout) fits in the rest
+            if time.monotonic() - leased_at > self.lease_seconds / 2:
+                await email_outbox_repo.extend_lease(
+                    db, [r["id"] for r in rows[n:]], self.lease_seconds
+                )
+                leased_at = time.monotonic()
+            await self._send_row(row)
+        return len(rows)
+
+    async def process_due(self) -> None:
+        """Handle every row that is due right now (used by tests and scripts)."""
+        while await self.process_batch():
+            pass
+
+    async def _worker(self) -> None:
+        wakeup = self._get_wakeup()
+        while not self._stopping:
+            try:
+                claimed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Email outbox worker error: {e}")
+                claimed = 0
+            if claimed or self._stopping:
+                continue
+            # deferred rows come due one slot at a time: wake up for the next
+            timeout = self.poll_seconds
+            next_slot = self.limiter.next_slot_in()
+            if next_slot is not None:
+                timeout = min(timeout, max(next_slot, MIN_SLOT_WAIT_SECONDS))
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Start the worker tasks (app startup)."""
+        if not self._tasks:
+            self._stopping = False
+            self._tasks = [
+                asyncio.create_task(self._worker()) for _ in range(self.workers)
+            ]
+
+    async def stop(self) -> None:
+        """
+        Let each worker finish the batch it is sending, then end it (app
+        shutdown). Cancelling mid-batch would leave claimed rows waiting for
+        the lease and could send a message twice.
+        """
+        self._stopping = True
+        self._get_wakeup().set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "deferred": self.deferred,
+        }
+
+
+email_outbox = EmailOutbox(
+    email_service,
+    workers=settings.email_workers,
+    batch_size=settings.email_outbox_batch_size,
+    max_attempts=settings.email_max_attempts,
+    retry_base_seconds=settings.email_retry_base_seconds,
+    lease_seconds=settings.email_outbox_lease_seconds,
+    poll_seconds=settings.email_outbox_poll_seconds,
+    domain_rate_per_minute=settings.email_domain_rate_per_minute,
+    insert_batch_size=settings.email_bulk_insert_batch_size,
+)
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+from app.settings import settings
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+
+class EmailTemplates:
+    """
+    Compiled email templates plus an LRU of rendered output (per process).
+
+    `preload()` compiles every template once (app startup); afterwards a
+    render never touches the filesystem. Rendered HTML is memoized by
+    template name and a hash of the params, so repeated renders (same
+    template, same params) are a dict lookup. Params that are not JSON
+    serializable are rendered without the memo. Safe to call from worker
+    threads (bulk sends render off the event loop).
+
+    With `auto_reload` (dev) templates are looked up through Jinja on every
+    render and nothing is memoized, so edits show up immediately.
+    """
+
+    def __init__(
+        self, directory: Path, *, auto_reload: bool, max_rendered: int
+    ) -> None:
+        self.auto_reload = auto_reload
+        self.max_rendered = max_rendered
+        self.env = Environment(
+            loader=FileSystemLoader(str(directory)),
+            autoescape=select_autoescape(["html", "xml"]),
+            auto_reload=auto_reload,
+            # keep every compiled template, never evict to the loader
+            cache_size=-1,
+        )
+        self.loads = 0
+        self.hits = 0
+        self.misses = 0
+        self._compiled: Dict[str, Template] = {}
+        self._rendered: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def preload(self) -> int:
+        """Compile all templates; returns how many were compiled."""
+        for name in self.env.list_templates():
+            self._load(name)
+        return len(self._compiled)
+
+    def _load(self, name: str) -> Template:
+        template = self.env.get_template(name)
+        self.loads += 1
+        if not self.auto_reload:
+            self._compiled[name] = template
+        return template
+
+    def get(self, name: str) -> Template:
+        template = self._compiled.get(name)
+        return template if template is not None else self._load(name)
+
+    @staticmethod
+    def _params_key(params: Dict[str, Any]) -> Optional[str]:
+        try:
+            encoded = json.dumps(params, sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def render(self, name: str, params: Dict[str, Any]) -> str:
+        if self.auto_reload:
+            return self.get(name).render(**params)
+
+        params_key = self._params_key(params)
+        if params_key is None:
+            return self.get(name).render(**params)
+
+        key = (name, params_key)
+        with self._lock:
+            html = self._rendered.get(key)
+            if html is not None:
+                self._rendered.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+
+        html = self.get(name).render(**params)
+        with self._lock:
+            self._rendered[key] = html
+            while len(self._rendered) > self.max_rendered:
+                self._rendered.popitem(last=False)
+        return html
+
+    def clear(self) -> None:
+        self._compiled.clear()
+        with self._lock:
+            self._rendered.clear()
+
+    def stats(self) -> dict:
+        return {
+            "autoReload": self.auto_reload,
+            "compiled": len(self._compiled),
+            "loads": self.loads,
+            "rendered": len(self._rendered),
+            "maxRendered": self.max_rendered,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+email_templates = EmailTemplates(
+    TEMPLATES_DIR,
+    auto_reload=settings.flag_reload,
+    max_rendered=settings.email_template_cache_size,
+)
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+
+from app.settings import settings
+
+
+class PasswordHashPool:
+    """
+    Bounded thread pool for Argon2 hashing and verification.
+
+    argon2-cffi releases the GIL while hashing, so `workers` threads give real
+    parallelism without blocking the event loop. At most `workers + max_queue`
+    calls are admitted at a time; anything beyond that is rejected with 503
+    instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    def _timed(self, fn: Callable[..., Any], enqueued_at: float, *args: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.total_wait_ms += (started - enqueued_at) * 1000
+                self.total_run_ms += (finished - started) * 1000
+
+    def _release(self, future: Future) -> None:
+        # done-callback of the pool future: a slot is free only once the hash
+        # finished (or was dropped from the queue), not when the caller left
+        with self._lock:
+            self.pending -= 1
+            if not future.cancelled():
+                self.completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn(*args)` on the pool, or raise 503 if it is saturated."""
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="PASSWORD_HASH_BUSY",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+        try:
+            future = self._get_executor().submit(
+                self._timed, fn, time.perf_counter(), *args
+            )
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._release)
+        # cancelling the caller drops a queued call; a running one keeps its slot
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": min(self.pending, self.workers),
+            "queued": max(self.pending - self.workers, 0),
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.total_wait_ms / self.completed
+            if self.completed
+            else 0.0,
+            "avg_run_ms": self.total_run_ms / self.completed if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Wait for running hashes and release the threads (app shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    settings.password_hash_workers, settings.password_hash_max_queue
+)
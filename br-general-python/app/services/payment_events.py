@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from typing import Optional, Set
+
+from app.db import db
+from app.repositories.payment_event_repository import payment_event_repo
+from app.services.payment_service import payment_service
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentEventQueue:
+    """
+    In-process queue applying stored YooKassa webhook events.
+
+    The webhook only records the event and enqueues its payment id. One worker
+    task applies events one by one; a failure is retried with exponential
+    backoff and after `max_attempts` the row is left as DEAD with its last
+    error. Rows still PENDING (crash, shutdown, another worker) are picked up
+    again by `recover()` at startup.
+    """
+
+    def __init__(self, max_attempts: int, retry_backoff: float):
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.processed = 0
+        self.failed = 0
+        self.dead = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._retries: Set[asyncio.Task] = set()
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        return self._queue
+
+    def enqueue(self, payment_id: str) -> None:
+        self._ensure_worker().put_nowait(payment_id)
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            payment_id = await queue.get()
+            try:
+                await self.process(payment_id)
+            except Exception:
+                logger.exception("payment event %s crashed the worker", payment_id)
+            finally:
+                queue.task_done()
+
+    async def process(self, payment_id: str) -> None:
+        event = await payment_event_repo.get(db, payment_id)
+        if event is None or event.status != "PENDING":
+            return
+
+        try:
+            async with db.tx() as tx:
+                if not await payment_event_repo.claim(tx, payment_id):
+                    return
+                await payment_service.handle_payment_succeeded(
+                    event.payload, db_client=tx
+                )
+        except Exception as e:
+            attempts = event.attempts + 1
+            dead = attempts >= self.max_attempts
+            await payment_event_repo.record_failure(
+                db, payment_id, f"{type(e).__name__}: {e}", dead=dead
+            )
+            if dead:
+                self.dead += 1
+                logger.error("payment event %s is DEAD: %s", payment_id, e)
+            else:
+                self.failed += 1
+                self._schedule_retry(payment_id, attempts)
+            return
+
+        self.processed += 1
+
+    def _schedule_retry(self, payment_id: str, attempts: int) -> None:
+        async def retry():
+            await asyncio.sleep(self.retry_backoff * (2 ** (attempts - 1)))
+            self.enqueue(payment_id)
+
+        task = asyncio.create_task(retry())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def recover(self) -> int:
+        """Enqueue events left PENDING by a previous run (app startup)."""
+        pending = await payment_event_repo.pending_ids(db)
+        for payment_id in pending:
+            self.enqueue(payment_id)
+        return len(pending)
+
+    async def drain(self) -> None:
+        """Wait until queued events and scheduled retries are all handled."""
+        while True:
+            if self._queue is not None:
+                await self._queue.join()
+            if not self._retries:
+                break
+            await asyncio.gather(*list(self._retries))
+
+    async def stop(self) -> None:
+        """Cancel the worker and pending retries (app shutdown)."""
+        tasks = list(self._retries)
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+        self._queue = None
+        self._retries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "retrying": len(self._retries),
+            "processed": self.processed,
+            "failed": self.failed,
+            "dead": self.dead,
+        }
+
+
+payment_event_queue = PaymentEventQueue(
+    settings.payment_event_max_attempts, settings.payment_event_retry_seconds
+)
@@ -16,8 +16,12 @@ class PaymentService:
             "createdAt": now,
         }
 
-    async def handle_payment_succeeded(self, payment_data: dict):
-        """Create or extend subscription when YooKassa confirms success."""
+    async def handle_payment_succeeded(self, payment_data: dict, db_client=db):
+        """
+        Create or extend subscription when YooKassa confirms success.
+
+        `db_client` lets the payment event queue run this inside its transaction.
+        """
         payment_id = payment_data.get("id")
         user_id = payment_data.get("metadata", {}).get("user_id")
         # For future use, if needed:
@@ -30,7 +34,7 @@ class PaymentService:
         start = datetime.now(timezone.utc)
         end = start + timedelta(days=30)
 
-        subscription = await db.subscription.create(
+        subscription = await db_client.subscription.create(
             data={
                 "userId": user_id,
                 "plan": "BASIC",
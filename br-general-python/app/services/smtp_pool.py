@@ -0,0 +1,195 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from typing import AsyncIterator, Deque, Optional, Tuple
+
+import aiosmtplib
+
+from app.settings import settings
+
+# errors after which a connection cannot be trusted anymore
+CONNECTION_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    OSError,
+)
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` connected and authenticated SMTP connections.
+
+    Connections are opened on demand (TCP, TLS/STARTTLS and login once) and
+    returned to the pool after each message. A connection idle for longer than
+    `idle_check_seconds` is probed with NOOP before reuse, one idle for longer
+    than `max_idle_seconds` is closed instead (servers drop them anyway).
+    A message that fails on a broken connection is sent once more on a fresh
+    one.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        username: Optional[str],
+        password: Optional[str],
+        use_tls: bool,
+        start_tls: bool,
+        size: int,
+        idle_check_seconds: float,
+        max_idle_seconds: float,
+        timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.size = size
+        self.idle_check_seconds = idle_check_seconds
+        self.max_idle_seconds = max_idle_seconds
+        self.timeout = timeout
+
+        self.created = 0
+        self.reused = 0
+        self.health_checks = 0
+        self.discarded = 0
+        self.sent = 0
+        self.send_errors = 0
+        self.open = 0
+        self._idle: Deque[Tuple[aiosmtplib.SMTP, float]] = deque()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # created lazily so it binds to the running loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        return self._slots
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        login = bool(self.username and self.password)
+        smtp = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            username=self.username if login else None,
+            password=self.password if login else None,
+            use_tls=self.use_tls,
+            start_tls=False if self.use_tls else self.start_tls,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        self.created += 1
+        self.open += 1
+        return smtp
+
+    def _drop(self, smtp: aiosmtplib.SMTP) -> None:
+        """Close a broken connection without QUIT."""
+        self.discarded += 1
+        self.open -= 1
+        smtp.close()
+
+    async def _retire(self, smtp: aiosmtplib.SMTP) -> None:
+        """Close a healthy connection politely."""
+        try:
+            await smtp.quit()
+        except Exception:
+            pass
+        self._drop(smtp)
+
+    async def _take_idle(self) -> Optional[aiosmtplib.SMTP]:
+        while self._idle:
+            smtp, released_at = self._idle.pop()
+            idle_for = time.monotonic() - released_at
+            if not smtp.is_connected:
+                self._drop(smtp)
+                continue
+            if idle_for > self.max_idle_seconds:
+                await self._retire(smtp)
+                continue
+            if idle_for > self.idle_check_seconds:
+                self.health_checks += 1
+                try:
+                    await smtp.noop()
+                except Exception:
+                    self._drop(smtp)
+                    continue
+            self.reused += 1
+            return smtp
+        return None
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Borrow a connection; it is discarded if the block fails on it."""
+        async with self._get_slots():
+            smtp = await self._take_idle() or await self._connect()
+            try:
+                yield smtp
+            except (*CONNECTION_ERRORS, asyncio.CancelledError):
+                self._drop(smtp)
+                raise
+            except Exception:
+                # e.g. a refused recipient: the session itself is still usable,
+                # but reset it before the next message
+                try:
+                    await smtp.rset()
+                except Exception:
+                    self._drop(smtp)
+                    raise
+                self._idle.append((smtp, time.monotonic()))
+                raise
+            else:
+                self._idle.append((smtp, time.monotonic()))
+
+    async def send_message(self, message: EmailMessage) -> None:
+        for attempt in range(2):
+            try:
+                async with self.connection() as smtp:
+                    await smtp.send_message(message)
+                self.sent += 1
+                return
+            except CONNECTION_ERRORS:
+                if attempt == 1:
+                    self.send_errors += 1
+                    raise
+            except Exception:
+                self.send_errors += 1
+                raise
+
+    async def close(self) -> None:
+        """Quit all idle connections (app shutdown)."""
+        while self._idle:
+            smtp, _ = self._idle.pop()
+            await self._retire(smtp)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "open": self.open,
+            "idle": len(self._idle),
+            "in_use": self.open - len(self._idle),
+            "created": self.created,
+            "reused": self.reused,
+            "health_checks": self.health_checks,
+            "discarded": self.discarded,
+            "sent": self.sent,
+            "send_errors": self.send_errors,
+        }
+
+
+smtp_pool = SMTPConnectionPool(
+    host=settings.smtp_host,
+    port=settings.smtp_port,
+    username=settings.smtp_user,
+    password=settings.smtp_password,
+    use_tls=settings.smtp_ssl,
+    start_tls=settings.smtp_starttls,
+    size=settings.smtp_pool_size,
+    idle_check_seconds=settings.smtp_pool_idle_check_seconds,
+    max_idle_seconds=settings.smtp_pool_max_idle_seconds,
+)
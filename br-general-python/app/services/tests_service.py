@@ -1,9 +1,30 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Tuple,
+)
 from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
 from prisma import Prisma
 
+from app.settings import settings
+
 from app.repositories.tests_repo import (
     get_test_with_questions_repo,
     create_test_session_repo,
@@ -11,22 +32,220 @@ from app.repositories.tests_repo import (
     finish_session_with_stats_repo,
     fetch_finished_tests_repo,
     fetch_finished_topics_repo,
+    fetch_user_sessions_chunk_repo,
+    fetch_user_test_answers_flat_repo,
 )
 
-# Read queries
+# Upper bound for the whole save-bulk transaction (Prisma default is 5s)
+SAVE_BULK_TX_TIMEOUT = timedelta(seconds=10)
 
+# Test content cache
 
-async def get_test_questions_service(db: Prisma, *, test_id: str) -> Dict[str, Any]:
-    """Return test with topic and questions."""
-    test = await get_test_with_questions_repo(db, test_id)
-    if not test:
-        raise HTTPException(status_code=404, detail="TEST_NOT_FOUND")
+# a submit with ids the cached test does not know reloads it at most this often
+TESTS_CACHE_RECHECK_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class CachedTestQuestions:
+    """Serialized questions payload of one test, shared between requests."""
+
+    test_id: str
+    payload: Dict[str, Any]
+    # JSON body encoded once, byte-identical to what JSONResponse would render
+    body: bytes
+    # strong validator derived from the body
+    etag: str
+    # validation index for submits: question id -> ids of its answer options
+    option_ids: Dict[str, FrozenSet[str]]
+
+    @classmethod
+    def from_payload(cls, test_id: str, payload: Dict[str, Any]) -> CachedTestQuestions:
+        body = json.dumps(
+            jsonable_encoder(payload),
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        etag = f'"{hashlib.sha256(body).hexdigest()}"'
+        option_ids = {
+            question["id"]: frozenset(option["id"] for option in question["options"])
+            for question in payload["questions"]
+        }
+        return cls(
+            test_id=test_id,
+            payload=payload,
+            body=body,
+            etag=etag,
+            option_ids=option_ids,
+        )
+
+
+class QuestionsPayloadCache:
+    """
+    Read-through LRU cache for GET /tests/{test_id}/questions (per process).
+    Entries expire after ttl_seconds (0 = never), so content edits reach
+    every worker without an explicit invalidation. Every invalidation bumps
+    the cache version, so a payload loaded before the invalidation is never
+    stored afterwards.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float = 0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rechecks = 0
+        # test id -> (entry, loaded_at, expires_at), monotonic times
+        self._entries: OrderedDict[str, Tuple[CachedTestQuestions, float, float]] = (
+            OrderedDict()
+        )
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def get(self, test_id: str) -> Optional[CachedTestQuestions]:
+        item = self._entries.get(test_id)
+        if item is not None and item[2] <= time.monotonic():
+            del self._entries[test_id]
+            self.expirations += 1
+            item = None
+        if item is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(test_id)
+        self.hits += 1
+        return item[0]
+
+    def put(self, entry: CachedTestQuestions, *, version: int) -> CachedTestQuestions:
+        """Store a loaded entry; returns the one now shared for the test."""
+        if version != self.version:
+            # content changed while the entry was loading
+            return entry
+        now = time.monotonic()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else float("inf")
+        current = self._entries.get(entry.test_id)
+        if current is not None and current[0].etag == entry.etag:
+            # unchanged: keep the object readers already share
+            entry = current[0]
+        self._entries[entry.test_id] = (entry, now, expires_at)
+        self._entries.move_to_end(entry.test_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def invalidate(self, test_id: Optional[str] = None) -> None:
+        """Drop one test (or everything when test_id is None)."""
+        self.version += 1
+        if test_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(test_id, None)
+
+    async def _load(
+        self,
+        load: Callable[[], Awaitable[Optional[CachedTestQuestions]]],
+        version: int,
+    ) -> Optional[CachedTestQuestions]:
+        entry = await load()
+        if entry is not None:
+            entry = self.put(entry, version=version)
+        return entry
+
+    async def get_or_load(
+        self,
+        test_id: str,
+        load: Callable[[], Awaitable[Optional[CachedTestQuestions]]],
+    ) -> Optional[CachedTestQuestions]:
+        """
+        Return the cached entry; concurrent misses for one test share one load.
+        The load runs as its own task, so a caller that is cancelled (client
+        disconnect) does not cancel it for the others.
+        """
+        entry = self.get(test_id)
+        if entry is not None:
+            return entry
+        return await asyncio.shield(self._start_load(test_id, load))
+
+    async def recheck(
+        self,
+        test_id: str,
+        load: Callable[[], Awaitable[Optional[CachedTestQuestions]]],
+        *,
+        min_age: float,
+    ) -> Optional[CachedTestQuestions]:
+        """
+        Reload one test whose cached entry may be outdated (a submit named an
+        id it does not know). Entries younger than min_age are returned as
+        they are, so repeated bogus ids cannot keep the test off the cache or
+        send every submit to the DB; other tests are not touched.
+        """
+        item = self._entries.get(test_id)
+        if item is not None and time.monotonic() - item[1] < min_age:
+            return item[0]
+        self.rechecks += 1
+        entry = await asyncio.shield(self._start_load(test_id, load))
+        if entry is None:
+            # the test itself is gone
+            self._entries.pop(test_id, None)
+        return entry
+
+    def _start_load(
+        self,
+        test_id: str,
+        load: Callable[[], Awaitable[Optional[CachedTestQuestions]]],
+    ) -> asyncio.Task:
+        task = self._inflight.get(test_id)
+        if task is not None:
+            return task
+        task = asyncio.ensure_future(self._load(load, self.version))
+        self._inflight[test_id] = task
+
+        def done(t: asyncio.Task) -> None:
+            if self._inflight.get(test_id) is t:
+                del self._inflight[test_id]
+            # mark as retrieved so asyncio does not log it when nobody waits
+            if not t.cancelled():
+                t.exception()
+
+        task.add_done_callback(done)
+        return task
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "maxEntries": self.max_entries,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rechecks": self.rechecks,
+            "ttlSeconds": self.ttl_seconds,
+        }
+
+
+test_questions_cache = QuestionsPayloadCache(
+    settings.tests_cache_max_entries, settings.tests_cache_ttl_seconds
+)
 
-    topic_id = test.topicId
 
+def invalidate_test_questions_cache(test_id: Optional[str] = None) -> None:
+    """
+    Call after a Test, Question or AnswerOption is created, changed or removed
+    to drop it from this worker right away (other workers pick the change up
+    after TESTS_CACHE_TTL_SECONDS). Pass the affected test id, or nothing to
+    drop the whole cache.
+    """
+    test_questions_cache.invalidate(test_id)
+
+
+def _build_test_questions_payload(test: Any) -> Dict[str, Any]:
     return {
         "testId": test.id,
-        "topicId": topic_id,
+        "topicId": test.topicId,
         "questions": [
             {
                 "id": question.id,
@@ -42,9 +261,97 @@ async def get_test_questions_service(db: Prisma, *, test_id: str) -> Dict[str, A
     }
 
 
+def _test_questions_loader(
+    db: Prisma, test_id: str
+) -> Callable[[], Awaitable[Optional[CachedTestQuestions]]]:
+    async def load() -> Optional[CachedTestQuestions]:
+        test = await get_test_with_questions_repo(db, test_id)
+        if not test:
+            return None
+        return CachedTestQuestions.from_payload(
+            test_id, _build_test_questions_payload(test)
+        )
+
+    return load
+
+
+async def _load_test_questions(
+    db: Prisma, test_id: str
+) -> Optional[CachedTestQuestions]:
+    return await test_questions_cache.get_or_load(
+        test_id, _test_questions_loader(db, test_id)
+    )
+
+
+# Read queries
+
+
+async def get_test_questions_service(db: Prisma, *, test_id: str) -> Dict[str, Any]:
+    """
+    Return test with topic and questions.
+    Served from the in-process cache; the returned dict is shared, do not mutate it.
+    """
+    entry = await _load_test_questions(db, test_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="TEST_NOT_FOUND")
+
+    return entry.payload
+
+
+async def get_test_questions_entry_service(
+    db: Prisma, *, test_id: str
+) -> CachedTestQuestions:
+    """Return the cached entry with the pre-encoded JSON body and its ETag."""
+    entry = await _load_test_questions(db, test_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="TEST_NOT_FOUND")
+
+    return entry
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match check (weak comparison, as RFC 9110 requires for this header).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
 # Write queries
 
 
+def _validate_answers(
+    entry: CachedTestQuestions, answers: List[Dict[str, Any]]
+) -> None:
+    """
+    Check submitted questionId / option ids against the cached test structure,
+    so bad ids are rejected before they reach the database as FK errors.
+    """
+    for answer in answers:
+        question_id = answer.get("questionId")
+        if not question_id:
+            raise HTTPException(status_code=422, detail="FIELD_REQUIRED:questionId")
+
+        valid_options = entry.option_ids.get(question_id)
+        if valid_options is None:
+            raise HTTPException(
+                status_code=422, detail=f"UNKNOWN_QUESTION:{question_id}"
+            )
+
+        option_ids = list(answer.get("selectedOptionIds") or [])
+        if answer.get("answerOptionId"):
+            option_ids.append(answer["answerOptionId"])
+        for option_id in option_ids:
+            if option_id not in valid_options:
+                raise HTTPException(
+                    status_code=422, detail=f"UNKNOWN_OPTION:{option_id}"
+                )
+
+
 async def save_bulk_answers_service(
     db: Prisma,
     *,
@@ -57,64 +364,251 @@ async def save_bulk_answers_service(
     """
     Save answers in bulk for an authenticated user and auto-finish the session.
     Anonymous users cannot save, but they can read questions.
+    The session, its answers and stats are written in one transaction:
+    either the whole submission is stored or nothing is.
     """
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="AUTH_REQUIRED"
         )
 
-    # validate test exists
-    test = await get_test_with_questions_repo(db, test_id)
-    if not test:
+    # validate test exists and answers match it (cached, no DB read when warm)
+    entry = await _load_test_questions(db, test_id)
+    if entry is None:
         raise HTTPException(status_code=404, detail="TEST_NOT_FOUND")
+    try:
+        _validate_answers(entry, answers)
+    except HTTPException as e:
+        if not str(e.detail).startswith("UNKNOWN_"):
+            raise
+        # the cached structure may predate a content edit: check the DB
+        # (at most every few seconds per test) before rejecting the ids
+        entry = await test_questions_cache.recheck(
+            test_id,
+            _test_questions_loader(db, test_id),
+            min_age=TESTS_CACHE_RECHECK_SECONDS,
+        )
+        if entry is None:
+            raise HTTPException(status_code=404, detail="TEST_NOT_FOUND")
+        _validate_answers(entry, answers)
 
-    # open a session
-    session = await create_test_session_repo(db, test_id=test_id, user_id=user_id)
+    async with db.tx(timeout=SAVE_BULK_TX_TIMEOUT) as tx:
+        # open a session
+        session = await create_test_session_repo(tx, test_id=test_id, user_id=user_id)
 
-    # save answer
-    saved_count = await save_answers_bulk_repo(
-        db, session_id=session.id, answers=answers
-    )
+        # save answers (single multi-row insert)
+        saved_count = await save_answers_bulk_repo(
+            tx, session_id=session.id, answers=answers
+        )
 
-    # save stats and close session
-    await finish_session_with_stats_repo(
-        db,
-        session_id=session.id,
-        stats=stats,
-    )
+        # save stats (single upsert) and close session
+        failed_stats = await finish_session_with_stats_repo(
+            tx,
+            session_id=session.id,
+            stats=stats,
+        )
 
     return {
         "sessionId": session.id,
         "savedCount": saved_count,
         "isFinished": True,
+        "failedStats": failed_stats,
     }
 
 
 # Reports
 
 
+FINISHED_TEST_FIELDS = ("testTitle", "finishedAt", "stats")
+
+
+def parse_finished_test_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Parse the `fields=` projection (comma-separated); all fields by default."""
+    if not fields:
+        return FINISHED_TEST_FIELDS
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(FINISHED_TEST_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=422, detail=f"UNKNOWN_FIELD:{','.join(sorted(unknown))}"
+        )
+    return tuple(field for field in FINISHED_TEST_FIELDS if field in requested)
+
+
+def encode_finished_cursor(session: Any) -> str:
+    raw = json.dumps([session.finishedAt.isoformat(), session.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_finished_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        finished_at, session_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(finished_at), str(session_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=422, detail="INVALID_CURSOR")
+
+
+def _finished_test_item(session: Any, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    item: Dict[str, Any] = {}
+    if "testTitle" in fields:
+        item["testTitle"] = session.test.title
+    if "finishedAt" in fields:
+        item["finishedAt"] = session.finishedAt
+    if "stats" in fields:
+        item["stats"] = {
+            stat.key: stat.value for stat in (getattr(session, "stats", None) or [])
+        }
+    return item
+
+
 async def get_finished_tests_service(
-    db: Prisma, *, user_id: str, topic_id: Optional[str]
-) -> List[Dict[str, Any]]:
+    db: Prisma,
+    *,
+    user_id: str,
+    topic_id: Optional[str],
+    limit: int,
+    cursor: Optional[str] = None,
+    fields: Tuple[str, ...] = FINISHED_TEST_FIELDS,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
-    All finished test attempts for the current user.
-    Repo already returns dicts: {testTitle, finishedAt, stats}.
+    One page of finished test attempts for the current user, newest first.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    Each item holds the requested subset of {testTitle, finishedAt, stats}.
     """
-    sessions = await fetch_finished_tests_repo(db, user_id=user_id, topic_id=topic_id)
+    sessions = await fetch_finished_tests_repo(
+        db,
+        user_id=user_id,
+        topic_id=topic_id,
+        limit=limit + 1,  # one extra row tells whether another page exists
+        after=decode_finished_cursor(cursor) if cursor else None,
+        include_test="testTitle" in fields,
+        include_stats="stats" in fields,
+    )
 
-    results: List[Dict[str, Any]] = []
-    for session in sessions:
-        stats_dict = {
-            stat.key: stat.value for stat in (getattr(session, "stats", None) or [])
-        }
-        results.append(
+    next_cursor = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        next_cursor = encode_finished_cursor(sessions[-1])
+
+    return [_finished_test_item(session, fields) for session in sessions], next_cursor
+
+
+async def stream_finished_tests_service(
+    db: Prisma,
+    *,
+    user_id: str,
+    topic_id: Optional[str],
+    page_size: int,
+    cursor: Optional[str] = None,
+    fields: Tuple[str, ...] = FINISHED_TEST_FIELDS,
+) -> AsyncIterator[bytes]:
+    """
+    All finished test attempts as NDJSON lines, read page by page, so memory
+    stays bounded by page_size whatever the length of the history.
+    """
+    while True:
+        items, cursor = await get_finished_tests_service(
+            db,
+            user_id=user_id,
+            topic_id=topic_id,
+            limit=page_size,
+            cursor=cursor,
+            fields=fields,
+        )
+        for item in items:
+            yield (
+                json.dumps(jsonable_encoder(item), ensure_ascii=False).encode() + b"\n"
+            )
+        if cursor is None:
+            break
+
+
+async def get_user_test_results_service(
+    db: Prisma, *, user_id: str, test_id: str
+) -> Dict[str, Any]:
+    """
+    All sessions of the user for one test with their answers.
+    Question texts are returned once in a `questions` lookup table
+    ({question_id: text}) instead of being repeated in every answer.
+    """
+    rows = await fetch_user_test_answers_flat_repo(db, user_id=user_id, test_id=test_id)
+    if not rows:
+        raise HTTPException(status_code=404, detail="No sessions found for this test")
+
+    questions: Dict[str, str] = {}
+    sessions: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        session = sessions.get(row["sessionId"])
+        if session is None:
+            session = sessions[row["sessionId"]] = {
+                "session_id": row["sessionId"],
+                "created_at": row["createdAt"],
+                "finished_at": row["finishedAt"],
+                "answers": [],
+            }
+        if row["questionId"] is None:
+            # session without answers
+            continue
+        questions[row["questionId"]] = row["questionText"]
+        session["answers"].append(
             {
-                "testTitle": session.test.title,
-                "finishedAt": session.finishedAt,
-                "stats": stats_dict,
+                "question_id": row["questionId"],
+                # option text for RADIO/CHECKBOX, free text for TEXT answers
+                "answer": row["optionText"]
+                if row["optionText"] is not None
+                else row["freeText"],
             }
         )
-    return results
+
+    return {
+        "test_id": test_id,
+        "title": rows[0]["testTitle"],
+        "description": rows[0]["testDescription"],
+        "questions": questions,
+        "sessions": list(sessions.values()),
+    }
+
+
+def _history_line(session: Any) -> bytes:
+    record = {
+        "sessionId": session.id,
+        "testId": session.testId,
+        "testTitle": session.test.title if session.test else None,
+        "createdAt": session.createdAt,
+        "finishedAt": session.finishedAt,
+        "isFinished": session.isFinished,
+        "answers": [
+            {
+                "questionId": answer.questionId,
+                "answerOptionId": answer.answerOptionId,
+                "freeText": answer.freeText,
+                "createdAt": answer.createdAt,
+            }
+            for answer in (session.answers or [])
+        ],
+        "stats": {stat.key: stat.value for stat in (session.stats or [])},
+    }
+    return json.dumps(jsonable_encoder(record), ensure_ascii=False).encode() + b"\n"
+
+
+async def stream_user_history_service(
+    db: Prisma, *, user_id: str, chunk_size: int = 50
+) -> AsyncIterator[bytes]:
+    """
+    Every session of the user with its answers and stats, one NDJSON line per
+    session, oldest first. Sessions are read in chunks of chunk_size, so only
+    one chunk is held in memory at a time.
+    """
+    after: Optional[Tuple[datetime, str]] = None
+    while True:
+        sessions = await fetch_user_sessions_chunk_repo(
+            db, user_id=user_id, limit=chunk_size, after=after
+        )
+        for session in sessions:
+            yield _history_line(session)
+        if len(sessions) < chunk_size:
+            break
+        after = (sessions[-1].createdAt, sessions[-1].id)
 
 
 async def get_finished_topics_service(
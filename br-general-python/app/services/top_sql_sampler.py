@@ -0,0 +1,317 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.db import db
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_xact_lock key: one snapshot at a time across processes
+SNAPSHOT_LOCK_KEY = 0x746F7073716C
+
+# a process skips its turn when the latest snapshot is younger than this
+# share of the interval, so the first worker due takes it
+SKIP_IF_NEWER = 0.9
+
+_STATEMENT_KEY = "queryid::text || ':' || userid::text || ':' || dbid::text"
+
+# TopSqlSnapshot timestamps are stored as UTC without a time zone
+_NOW_UTC = "(NOW() AT TIME ZONE 'UTC')"
+
+# counters go from the view into the table without leaving the database
+SNAPSHOT_SQL = rf"""
+INSERT INTO "TopSqlSnapshot" ("takenAt", "statements")
+SELECT {_NOW_UTC},
+       jsonb_object_agg(key, jsonb_build_array(calls, total_ms, rows, io_ms))
+FROM (
+  SELECT
+    {_STATEMENT_KEY} AS key,
+    calls,
+    total_exec_time AS total_ms,
+    rows,
+    COALESCE(blk_read_time,0) + COALESCE(blk_write_time,0) AS io_ms
+  FROM public.pg_stat_statements
+  WHERE queryid IS NOT NULL
+) s
+WHERE pg_try_advisory_xact_lock($1::bigint)
+  AND NOT EXISTS (
+    SELECT 1 FROM "TopSqlSnapshot"
+    WHERE "takenAt" > {_NOW_UTC} - make_interval(secs => $2::float8)
+  )
+HAVING COUNT(*) > 0
+"""
+
+PRUNE_SQL = f"""
+DELETE FROM "TopSqlSnapshot"
+WHERE "takenAt" < {_NOW_UTC} - make_interval(secs => $1::float8)
+"""
+
+TIMES_SQL = """
+SELECT "id", EXTRACT(EPOCH FROM "takenAt")::float8 AS "takenAt"
+FROM "TopSqlSnapshot"
+ORDER BY "takenAt"
+"""
+
+QUERIES_SQL = rf"""
+SELECT {_STATEMENT_KEY} AS key, query
+FROM public.pg_stat_statements
+WHERE queryid IS NOT NULL
+"""
+
+
+class StatementCounters(NamedTuple):
+    calls: int
+    total_ms: float
+    rows: int
+    io_ms: float
+
+
+class Snapshot(NamedTuple):
+    taken_at: float
+    statements: Dict[str, StatementCounters]
+
+
+ZERO = StatementCounters(0, 0.0, 0, 0.0)
+
+
+def window_start(
+    times: Sequence[float], seconds: float, interval: float, end: int
+) -> Optional[int]:
+    """
+    Index of the snapshot starting a window of about `seconds` that ends at
+    times[end] (sorted ascending). The span is shorter while history is
+    short; None when there is no earlier snapshot at all.
+    """
+    # half an interval of slack for sampling jitter
+    earliest = times[end] - seconds - interval / 2
+    for i in range(end):
+        if times[i] >= earliest:
+            return i
+    return None
+
+
+def deltas(
+    start: Snapshot,
+    end: Snapshot,
+    *,
+    min_calls: int,
+    queries: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """Per-statement activity between two snapshots."""
+    queries = queries or {}
+    seconds = end.taken_at - start.taken_at
+    items = []
+    for key, after in end.statements.items():
+        before = start.statements.get(key, ZERO)
+        if after.calls < before.calls:
+            before = ZERO
+        calls = after.calls - before.calls
+        if calls < min_calls or calls <= 0:
+            continue
+        total_ms = after.total_ms - before.total_ms
+        items.append(
+            {
+                "key": key,
+                "query": queries.get(key, ""),
+                "calls": calls,
+                "calls_per_sec": calls / seconds,
+                "total_ms": total_ms,
+                "mean_ms": total_ms / calls,
+                "rows": after.rows - before.rows,
+                "io_ms": after.io_ms - before.io_ms,
+            }
+        )
+    return items
+
+
+def regressions(
+    baseline: Tuple[Snapshot, Snapshot],
+    recent: Tuple[Snapshot, Snapshot],
+    *,
+    min_calls: int,
+    min_ratio: float,
+    queries: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Statements whose mean time in the `recent` window is at least
+    `min_ratio` times their mean in the `baseline` window.
+    """
+    before = {item["key"]: item for item in deltas(*baseline, min_calls=min_calls)}
+    items = []
+    for item in deltas(*recent, min_calls=min_calls, queries=queries):
+        old = before.get(item["key"])
+        if old is None or old["mean_ms"] <= 0:
+            continue
+        ratio = item["mean_ms"] / old["mean_ms"]
+        if ratio < min_ratio:
+            continue
+        items.append(
+            {
+                "key": item["key"],
+                "query": item["query"],
+                "calls": item["calls"],
+                "baseline_calls": old["calls"],
+                "mean_ms": item["mean_ms"],
+                "baseline_mean_ms": old["mean_ms"],
+                "ratio": ratio,
+                # extra DB time the slowdown cost in the window
+                "added_ms": (item["mean_ms"] - old["mean_ms"]) * item["calls"],
+            }
+        )
+    items.sort(key=lambda i: i["added_ms"], reverse=True)
+    return items
+
+
+class TopSqlSampler:
+    """
+    Periodic snapshots of pg_stat_statements of the primary, in TopSqlSnapshot.
+
+    Every worker runs the sampler, but a snapshot is taken under an advisory
+    lock and only when the latest one is older than about an interval, so
+    the deployment keeps one series and every worker answers the same.
+
+    The view only has counters since its last reset; the difference between
+    two snapshots gives what ran in between (calls/s, mean time in that
+    window), and comparing two consecutive windows shows statements that got
+    slower. A statement whose counters went down (pg_stat_statements_reset)
+    is counted from zero.
+    """
+
+    def __init__(self, *, interval_seconds: float, max_snapshots: int) -> None:
+        self.interval_seconds = interval_seconds
+        self.max_snapshots = max_snapshots
+        self.samples = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval_seconds > 0
+
+    async def sample(self) -> bool:
+        """Take a snapshot unless another process just did; True if taken."""
+        taken = await db.execute_raw(
+            SNAPSHOT_SQL, SNAPSHOT_LOCK_KEY, self.interval_seconds * SKIP_IF_NEWER
+        )
+        if not taken:
+            self.skipped += 1
+            return False
+        self.samples += 1
+        await db.execute_raw(PRUNE_SQL, self.interval_seconds * self.max_snapshots)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sample()
+                self.last_error = None
+            except Exception as e:
+                self.errors += 1
+                # e.g. the extension is missing: log it once, not every interval
+                if str(e) != self.last_error:
+                    logger.warning(f"pg_stat_statements snapshot failed: {e}")
+                self.last_error = str(e)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start sampling (app startup); no-op when disabled."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _times(self) -> Tuple[List[int], List[float]]:
+        rows = await db.query_raw(TIMES_SQL)
+        return [r["id"] for r in rows], [float(r["takenAt"]) for r in rows]
+
+    async def _load(self, ids: Sequence[int]) -> List[Snapshot]:
+        """Snapshots by id, in the order of `ids`."""
+        placeholders = ", ".join(f"${n}" for n in range(1, len(ids) + 1))
+        rows = await db.query_raw(
+            'SELECT "id", EXTRACT(EPOCH FROM "takenAt")::float8 AS "takenAt", '
+            f'"statements"::text AS "statements" FROM "TopSqlSnapshot" '
+            f'WHERE "id" IN ({placeholders})',
+            *ids,
+        )
+        by_id = {
+            r["id"]: Snapshot(
+                float(r["takenAt"]),
+                {
+                    key: StatementCounters(
+                        int(calls), float(total_ms), int(rows_), float(io_ms)
+                    )
+                    for key, (calls, total_ms, rows_, io_ms) in json.loads(
+                        r["statements"]
+                    ).items()
+                },
+            )
+            for r in rows
+        }
+        return [by_id[i] for i in ids]
+
+    async def queries(self) -> Dict[str, str]:
+        """Statement texts by key, as the primary has them now."""
+        rows = await db.query_raw(QUERIES_SQL)
+        return {r["key"]: r["query"] for r in rows}
+
+    async def window(self, seconds: float) -> Optional[Tuple[Snapshot, Snapshot]]:
+        """(start, end) snapshots spanning about `seconds` up to the latest."""
+        ids, times = await self._times()
+        if not ids:
+            return None
+        end = len(ids) - 1
+        start = window_start(times, seconds, self.interval_seconds, end)
+        if start is None:
+            return None
+        first, last = await self._load([ids[start], ids[end]])
+        return first, last
+
+    async def baseline_and_window(
+        self, window_seconds: float, baseline_seconds: float
+    ) -> Optional[Tuple[Snapshot, Snapshot, Snapshot]]:
+        """
+        (baseline start, window start, latest): a window of about
+        `window_seconds` and the `baseline_seconds` right before it.
+        """
+        ids, times = await self._times()
+        if not ids:
+            return None
+        end = len(ids) - 1
+        start = window_start(times, window_seconds, self.interval_seconds, end)
+        if start is None:
+            return None
+        base = window_start(times, baseline_seconds, self.interval_seconds, start)
+        if base is None:
+            return None
+        baseline_from, window_from, window_to = await self._load(
+            [ids[base], ids[start], ids[end]]
+        )
+        return baseline_from, window_from, window_to
+
+    async def stats(self) -> dict:
+        rows = await db.query_raw('SELECT COUNT(*)::int AS count FROM "TopSqlSnapshot"')
+        return {
+            "enabled": self.enabled,
+            "interval_seconds": self.interval_seconds,
+            "snapshots": rows[0]["count"],
+            "max_snapshots": self.max_snapshots,
+            # taken by this process / left to another one
+            "samples": self.samples,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+top_sql_sampler = TopSqlSampler(
+    interval_seconds=settings.top_sql_sample_seconds,
+    max_snapshots=settings.top_sql_snapshots,
+)
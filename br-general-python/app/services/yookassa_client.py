@@ -0,0 +1,150 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.settings import settings
+
+# statuses worth repeating with the same Idempotence-Key
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_AFTER_MAX_SECONDS = 5.0
+
+
+class YooKassaError(Exception):
+    """YooKassa answered with an error, or could not be reached after retries."""
+
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(f"YooKassa error {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+class YooKassaClient:
+    """
+    Shared async client for the YooKassa API.
+
+    One httpx.AsyncClient (HTTP/2, keep-alive pool) is created on first use
+    and closed in the app lifespan. Transport errors, 429 and 5xx answers are
+    retried with the same Idempotence-Key, so YooKassa never creates a second
+    payment for one request.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        shop_id: str,
+        secret: str,
+        *,
+        timeout: float,
+        max_retries: int,
+        retry_backoff: float = 0.2,
+        max_connections: int = 20,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.auth = (shop_id, secret)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_connections = max_connections
+        self.transport = transport
+        self.retries = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=self.auth,
+                http2=True,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60.0,
+                ),
+                transport=self.transport,
+            )
+        return self._client
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None and response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("Retry-After", ""))
+                return min(retry_after, RETRY_AFTER_MAX_SECONDS)
+            except ValueError:
+                pass
+        return self.retry_backoff * (2**attempt)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        idempotence_key: str,
+        json: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Send one API call, retrying failures; returns the decoded JSON body."""
+        client = self._get_client()
+        request_timeout = httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+        headers = {"Idempotence-Key": idempotence_key}
+
+        for attempt in range(self.max_retries + 1):
+            response: Optional[httpx.Response] = None
+            try:
+                response = await client.request(
+                    method, path, json=json, headers=headers, timeout=request_timeout
+                )
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise YooKassaError(502, f"YooKassa unreachable: {e!r}") from e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                if attempt == self.max_retries:
+                    break
+
+            self.retries += 1
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+        try:
+            data = response.json()
+        except ValueError:
+            data = {"description": response.text}
+
+        if response.status_code in RETRY_STATUSES:
+            raise YooKassaError(502, data)
+        if response.status_code not in (200, 201):
+            raise YooKassaError(response.status_code, data)
+        return data
+
+    async def create_payment(
+        self,
+        payload: Dict[str, Any],
+        idempotence_key: str,
+        *,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        return await self.request(
+            "POST",
+            "/payments",
+            idempotence_key=idempotence_key,
+            json=payload,
+            timeout=timeout,
+        )
+
+    async def aclose(self) -> None:
+        """Close pooled connections (app shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+yookassa_client = YooKassaClient(
+    settings.yookassa_api_url,
+    settings.yookassa_shop_id,
+    settings.yookassa_secret,
+    timeout=settings.yookassa_timeout_seconds,
+    max_retries=settings.yookassa_max_retries,
+)
@@ -17,6 +17,31 @@ class Settings(BaseSettings):
     postgres_user: str = Field(..., alias="POSTGRES_USER")
     postgres_password: str = Field(..., alias="POSTGRES_PASSWORD")
     postgres_db: str = Field(..., alias="POSTGRES_DB")
+    # optional read replica for read-only endpoints (same pool settings)
+    database_replica_url: Optional[str] = Field(
+        default=None, alias="DATABASE_REPLICA_URL"
+    )
+    # after a write, the client's reads stay on the primary this long
+    db_replica_sticky_seconds: float = Field(
+        default=5.0, ge=0, alias="DB_REPLICA_STICKY_SECONDS"
+    )
+    # Prisma connection pool, per worker process: keep
+    # workers * replicas * DB_POOL_SIZE below Postgres max_connections.
+    # Unset = engine default (num_cpus * 2 + 1)
+    db_pool_size: Optional[int] = Field(default=None, ge=1, alias="DB_POOL_SIZE")
+    # how long a query waits for a free pooled connection (0 = forever)
+    db_pool_timeout_seconds: int = Field(
+        default=10, ge=0, alias="DB_POOL_TIMEOUT_SECONDS"
+    )
+    db_connect_timeout_seconds: int = Field(
+        default=5, ge=0, alias="DB_CONNECT_TIMEOUT_SECONDS"
+    )
+    # Postgres statement_timeout, 0 = none (ignored with PgBouncer)
+    db_statement_timeout_ms: int = Field(
+        default=0, ge=0, alias="DB_STATEMENT_TIMEOUT_MS"
+    )
+    # PgBouncer in transaction mode: disables prepared statements
+    db_pgbouncer: bool = Field(default=False, alias="DB_PGBOUNCER")
 
     # --- email config ---
     smtp_host: str = Field(..., alias="SMTP_HOST")
@@ -27,17 +52,113 @@ class Settings(BaseSettings):
     smtp_ssl: bool = Field(..., alias="SMTP_SSL")
     smtp_sender_email: EmailStr = Field(..., alias="SMTP_SENDER_EMAIL")
     smtp_sender_name: str = Field(..., alias="SMTP_SENDER_NAME")
+    # pooled SMTP connections (per process): NOOP before reusing a connection
+    # idle longer than the check interval, close it after max idle
+    smtp_pool_size: int = Field(default=4, ge=1, alias="SMTP_POOL_SIZE")
+    smtp_pool_idle_check_seconds: float = Field(
+        default=30.0, ge=0, alias="SMTP_POOL_IDLE_CHECK_SECONDS"
+    )
+    smtp_pool_max_idle_seconds: float = Field(
+        default=240.0, gt=0, alias="SMTP_POOL_MAX_IDLE_SECONDS"
+    )
+    # rendered email templates memoized per (template, params), per process
+    email_template_cache_size: int = Field(
+        default=1024, ge=1, alias="EMAIL_TEMPLATE_CACHE_SIZE"
+    )
+    # outbox workers (per process); failed sends retry after base * 2**(n-1)
+    email_workers: int = Field(default=2, ge=1, alias="EMAIL_WORKERS")
+    email_outbox_batch_size: int = Field(
+        default=20, ge=1, alias="EMAIL_OUTBOX_BATCH_SIZE"
+    )
+    email_max_attempts: int = Field(default=5, ge=1, alias="EMAIL_MAX_ATTEMPTS")
+    email_retry_base_seconds: float = Field(
+        default=30.0, ge=0, alias="EMAIL_RETRY_BASE_SECONDS"
+    )
+    # a claimed row is due again after this long if its worker died
+    # (renewed while the worker is still sending its batch)
+    email_outbox_lease_seconds: float = Field(
+        default=300.0, gt=0, alias="EMAIL_OUTBOX_LEASE_SECONDS"
+    )
+    email_outbox_poll_seconds: float = Field(
+        default=2.0, gt=0, alias="EMAIL_OUTBOX_POLL_SECONDS"
+    )
+    # bulk sends insert their outbox rows in batches of this size
+    email_bulk_insert_batch_size: int = Field(
+        default=500, ge=1, alias="EMAIL_BULK_INSERT_BATCH_SIZE"
+    )
+    # per recipient domain and process, 0 = unlimited
+    email_domain_rate_per_minute: int = Field(
+        default=60, ge=0, alias="EMAIL_DOMAIN_RATE_PER_MINUTE"
+    )
 
     # user auth / jwt
     jwt_secret_key: str = Field(..., alias="JWT_SECRET_KEY")
     jwt_algorithm: str = Field(..., alias="JWT_ALGORITHM")
     access_token_expire_minutes: int = Field(..., alias="ACCESS_TOKEN_EXPIRE_MINUTES")
     refresh_token_expire_minutes: int = Field(..., alias="REFRESH_TOKEN_EXPIRE_MINUTES")
+    # verified-token cache of get_current_user (per process)
+    auth_token_cache_size: int = Field(
+        default=10000, ge=1, alias="AUTH_TOKEN_CACHE_SIZE"
+    )
+
+    # argon2 worker pool (per process); calls beyond workers + queue get 503
+    password_hash_workers: int = Field(default=2, ge=1, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_queue: int = Field(
+        default=32, ge=0, alias="PASSWORD_HASH_MAX_QUEUE"
+    )
+
+    # argon2 costs (memory in KiB), pinned all three or none (passlib
+    # defaults); pick them with benchmarks/bench_argon2_calibration.py
+    argon2_time_cost: Optional[int] = Field(
+        default=None, ge=1, alias="ARGON2_TIME_COST"
+    )
+    argon2_memory_cost: Optional[int] = Field(
+        default=None, ge=8, alias="ARGON2_MEMORY_COST"
+    )
+    argon2_parallelism: Optional[int] = Field(
+        default=None, ge=1, alias="ARGON2_PARALLELISM", validate_default=True
+    )
 
     # payments settings
     yookassa_shop_id: str = Field(..., alias="YOOKASSA_SHOP_ID")
     yookassa_secret: str = Field(..., alias="YOOKASSA_SECRET")
     frontend_url: str = Field(..., alias="FRONTEND_URL")
+    yookassa_api_url: str = Field(
+        default="https://api.yookassa.ru/v3", alias="YOOKASSA_API_URL"
+    )
+    # per attempt; transport errors, 429 and 5xx are retried
+    yookassa_timeout_seconds: float = Field(
+        default=10.0, gt=0, alias="YOOKASSA_TIMEOUT_SECONDS"
+    )
+    yookassa_max_retries: int = Field(default=2, ge=0, alias="YOOKASSA_MAX_RETRIES")
+    # webhook event queue: attempts before DEAD, first retry delay (doubles)
+    payment_event_max_attempts: int = Field(
+        default=5, ge=1, alias="PAYMENT_EVENT_MAX_ATTEMPTS"
+    )
+    payment_event_retry_seconds: float = Field(
+        default=2.0, ge=0, alias="PAYMENT_EVENT_RETRY_SECONDS"
+    )
+
+    # per-request DB time as a Server-Timing response header; it names
+    # models and query counts, so unset means on in dev and off in prod
+    server_timing_header: Optional[bool] = Field(
+        default=None, alias="SERVER_TIMING_HEADER", validate_default=True
+    )
+    # pg_stat_statements snapshots for /stats/top-sql windows, 0 = off;
+    # history kept = interval * snapshots, one series shared by all workers
+    top_sql_sample_seconds: float = Field(
+        default=60.0, ge=0, alias="TOP_SQL_SAMPLE_SECONDS"
+    )
+    top_sql_snapshots: int = Field(default=120, ge=2, alias="TOP_SQL_SNAPSHOTS")
+
+    # tests content cache (per process)
+    tests_cache_max_entries: int = Field(
+        default=512, ge=1, alias="TESTS_CACHE_MAX_ENTRIES"
+    )
+    # seconds before a cached test is reloaded from the DB, 0 = never
+    tests_cache_ttl_seconds: float = Field(
+        default=60.0, ge=0, alias="TESTS_CACHE_TTL_SECONDS"
+    )
 
     model_config = SettingsConfigDict(
         env_file=ENV_PATH,
@@ -64,6 +185,40 @@ class Settings(BaseSettings):
             )
         return v
 
+    @field_validator("database_replica_url")
+    @classmethod
+    def _replica_url_must_be_pg(cls, v: Optional[str]) -> Optional[str]:
+        if not v:
+            return None
+        if not v.startswith(("postgresql://", "postgres://")):
+            raise ValueError(
+                "DATABASE_REPLICA_URL must start with postgresql:// or postgres://"
+            )
+        return v
+
+    @field_validator("argon2_parallelism")
+    @classmethod
+    def _argon2_costs_pinned_together(cls, v: Optional[int], info):
+        # every node must hash with the same costs, or logins keep rehashing
+        costs = (
+            info.data.get("argon2_time_cost"),
+            info.data.get("argon2_memory_cost"),
+            v,
+        )
+        if any(c is not None for c in costs) and any(c is None for c in costs):
+            raise ValueError(
+                "Set ARGON2_TIME_COST, ARGON2_MEMORY_COST and ARGON2_PARALLELISM "
+                "together, or none of them"
+            )
+        return v
+
+    @field_validator("server_timing_header")
+    @classmethod
+    def _server_timing_dev_only_by_default(cls, v: Optional[bool], info) -> bool:
+        if v is None:
+            return info.data.get("env_type") != "prod"
+        return v
+
     @field_validator("smtp_ssl")
     @classmethod
     def _validate_tls_ssl(cls, v: bool, info):
@@ -0,0 +1,95 @@
+"""
+Local stand-in for the YooKassa payments API (POST /v3/payments).
+
+Used by the payment tests through httpx.ASGITransport and served by uvicorn
+in benchmarks/bench_yookassa_client.py. It remembers payments per
+Idempotence-Key like the real API, and can be told to fail or slow down.
+"""
+
+import asyncio
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+ERROR_CODES = {400: "invalid_request", 429: "too_many_requests"}
+
+
+class FakeYooKassa:
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.payments: Dict[str, dict] = {}
+        self.requests: List[dict] = []
+        self._failures: Deque[int] = deque()
+        self.app = self._build_app()
+
+    def fail_next(self, *statuses: int) -> None:
+        """Answer the next requests with these statuses, in order."""
+        self._failures.extend(statuses)
+
+    def reset(self) -> None:
+        self.payments.clear()
+        self.requests.clear()
+        self._failures.clear()
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/v3/payments")
+        async def create_payment(
+            request: Request,
+            idempotence_key: Optional[str] = Header(default=None),
+            authorization: Optional[str] = Header(default=None),
+        ):
+            body = await request.json()
+            self.requests.append({"idempotence_key": idempotence_key, "body": body})
+            if self.latency_ms:
+                await asyncio.sleep(self.latency_ms / 1000)
+
+            if not authorization or not authorization.startswith("Basic "):
+                raise HTTPException(status_code=401, detail="unauthorized")
+            if not idempotence_key:
+                return JSONResponse(
+                    status_code=400,
+                    content={
+                        "type": "error",
+                        "code": "invalid_request",
+                        "description": "Idempotence-Key header is required",
+                    },
+                )
+            if self._failures:
+                code = self._failures.popleft()
+                return JSONResponse(
+                    status_code=code,
+                    content={
+                        "type": "error",
+                        "code": ERROR_CODES.get(code, "internal_server_error"),
+                    },
+                    headers={"Retry-After": "0"} if code == 429 else None,
+                )
+
+            if idempotence_key not in self.payments:
+                payment_id = f"fake-{uuid.uuid4()}"
+                self.payments[idempotence_key] = {
+                    "id": payment_id,
+                    "status": "pending",
+                    "paid": False,
+                    "test": True,
+                    "amount": body["amount"],
+                    "description": body.get("description", ""),
+                    "metadata": body.get("metadata", {}),
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "confirmation": {
+                        "type": "redirect",
+                        "confirmation_url": (
+                            "https://yoomoney.ru/checkout/payments/v2/contract"
+                            f"?orderId={payment_id}"
+                        ),
+                    },
+                }
+            return self.payments[idempotence_key]
+
+        return app
@@ -7,7 +7,11 @@ from datetime import datetime, timedelta, timezone
 from app.main import app
 from app.db import db
 from app.settings import settings
-from app.services.auth_service import AuthService
+from app.services.auth_service import (
+    AuthService,
+    access_claims_cache,
+    refreshed_access_cache,
+)
 
 auth_service = AuthService()
 
@@ -162,6 +166,73 @@ async def test_auto_refresh_on_expired_token():
         assert body["tokens"]["refresh_token"] == tokens["refresh_token"]
 
 
+@pytest.mark.asyncio
+async def test_verified_token_cache():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        tokens = await perform_user_flow(
+            client, "multi_user_cache@example.com", "CachePass1!", "Cache"
+        )
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        # second call with the same access token is served from the cache
+        await client.get("/br-general/users/me", headers=headers)
+        hits_before = access_claims_cache.hits
+        response = await client.get("/br-general/users/me", headers=headers)
+        assert response.status_code == 200, response.text
+        assert access_claims_cache.hits == hits_before + 1
+        assert "x-access-token" not in response.headers
+
+        # expired access + refresh: one minted token, reused and returned in a header
+        user_id = jwt.get_unverified_claims(tokens["access_token"])["sub"]
+        expired_access = jwt.encode(
+            {
+                "sub": user_id,
+                "exp": datetime.now(timezone.utc) - timedelta(minutes=1),
+                "type": "access",
+            },
+            settings.jwt_secret_key,
+            algorithm=settings.jwt_algorithm,
+        )
+        headers = {
+            "Authorization": f"Bearer {expired_access}",
+            "x-refresh-token": tokens["refresh_token"],
+        }
+        first = await client.get("/br-general/users/me", headers=headers)
+        second = await client.get("/br-general/users/me", headers=headers)
+        assert first.status_code == 200, first.text
+        assert second.status_code == 200, second.text
+
+        issued = first.headers["x-access-token"]
+        assert issued == first.json()["tokens"]["access_token"]
+        assert second.headers["x-access-token"] == issued
+        assert issued != expired_access
+
+        # the re-issued token works on its own
+        response = await client.get(
+            "/br-general/users/me", headers={"Authorization": f"Bearer {issued}"}
+        )
+        assert response.status_code == 200, response.text
+
+        # endpoints returning their own Response (204, NDJSON stream) carry it too
+        response = await client.patch(
+            "/br-general/users/me/profile", headers=headers, json={"city": "Riga"}
+        )
+        assert response.status_code == 204, response.text
+        assert response.headers["x-access-token"] == issued
+        response = await client.get(
+            "/br-general/users/me/tests/export", headers=headers
+        )
+        assert response.status_code == 200, response.text
+        assert response.headers["x-access-token"] == issued
+
+        # an invalid refresh token is never cached
+        headers["x-refresh-token"] = "invalid"
+        response = await client.get("/br-general/users/me", headers=headers)
+        assert response.status_code == 401
+        assert refreshed_access_cache.get("invalid") is None
+
+
 @pytest.fixture(autouse=True)
 async def cleanup_users():
     """Cleans up test users after each test file."""
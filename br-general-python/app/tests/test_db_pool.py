@@ -0,0 +1,68 @@
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.db import pooled_database_url
+from app.main import app
+from app.settings import settings
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+BASE = "postgresql://u:p@localhost:5432/app"
+
+
+def query(url: str) -> dict:
+    return {k: v[0] for k, v in parse_qs(urlsplit(url).query).items()}
+
+
+@pytest.mark.asyncio
+async def test_pool_parameters_added_to_url():
+    url = pooled_database_url(
+        BASE,
+        pool_size=7,
+        pool_timeout=3,
+        connect_timeout=2,
+        statement_timeout_ms=5000,
+        pgbouncer=False,
+    )
+    assert url.startswith(BASE + "?")
+    assert query(url) == {
+        "connection_limit": "7",
+        "pool_timeout": "3",
+        "connect_timeout": "2",
+        "options": "-c statement_timeout=5000",
+    }
+
+
+@pytest.mark.asyncio
+async def test_pgbouncer_mode_and_explicit_url_params():
+    url = pooled_database_url(
+        BASE + "?schema=public&connection_limit=3",
+        pool_size=10,
+        pool_timeout=10,
+        connect_timeout=5,
+        statement_timeout_ms=5000,
+        pgbouncer=True,
+    )
+    params = query(url)
+    # the URL's own value wins
+    assert params["connection_limit"] == "3"
+    assert params["schema"] == "public"
+    assert params["pgbouncer"] == "true"
+    assert params["statement_cache_size"] == "0"
+    # startup options are not passed through PgBouncer
+    assert "options" not in params
+
+
+@pytest.mark.asyncio
+async def test_db_pool_stats_endpoint():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        r = await client.get("/br-general/stats/db-pool")
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["pgbouncer"] == settings.db_pgbouncer
+    # the test session holds a connected engine
+    assert data["open"] >= 1
+    assert {"busy", "idle", "pool_wait"} <= data.keys()
@@ -0,0 +1,92 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.db import db
+from app.main import app
+from app.services.email_outbox import DomainRateLimiter, email_outbox
+from app.settings import settings
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+class FakePool:
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, message) -> None:
+        self.messages.append(message)
+
+
+def bulk_payload(count: int, template: str = "email/welcome.html") -> dict:
+    return {
+        "subject": "Campaign",
+        "template": template,
+        "recipients": [
+            {"to": f"email_bulk_{n}@example.com", "params": {"name": f"User {n}"}}
+            for n in range(count)
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_bulk_send_queues_job_and_reports_progress(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(email_outbox.service, "pool", pool)
+    monkeypatch.setattr(email_outbox, "limiter", DomainRateLimiter(0))
+    monkeypatch.setattr(email_outbox, "insert_batch_size", 2)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url=settings.base_url
+    ) as ac:
+        res = await ac.post("/br-general/email/send-bulk", json=bulk_payload(5))
+        assert res.status_code == 202
+        job = res.json()
+        assert job["total"] == 5
+        assert job["pending"] == 5
+        job_id = job["job_id"]
+
+        rows = await db.emaillog.find_many(where={"jobId": job_id})
+        assert len(rows) == 5
+        assert all(r.status == "PENDING" for r in rows)
+        assert {r.to for r in rows} == {f"email_bulk_{n}@example.com" for n in range(5)}
+        assert any("User 3" in r.body for r in rows)
+
+        await email_outbox.process_due()
+
+        res = await ac.get(f"/br-general/email/jobs/{job_id}")
+        assert res.status_code == 200
+        assert res.json() == {
+            "job_id": job_id,
+            "total": 5,
+            "pending": 0,
+            "sent": 5,
+            "failed": 0,
+        }
+    assert len(pool.messages) == 5
+
+
+@pytest.mark.asyncio
+async def test_bulk_send_rejects_bad_requests():
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url=settings.base_url
+    ) as ac:
+        res = await ac.post(
+            "/br-general/email/send-bulk",
+            json=bulk_payload(2, template="email/missing.html"),
+        )
+        assert res.status_code == 422
+        assert res.json()["detail"] == "UNKNOWN_TEMPLATE:email/missing.html"
+        assert await db.emaillog.count(where={"to": {"startswith": "email_bulk_"}}) == 0
+
+        res = await ac.post("/br-general/email/send-bulk", json=bulk_payload(0))
+        assert res.status_code == 422
+
+        res = await ac.get("/br-general/email/jobs/unknown-job")
+        assert res.status_code == 404
+
+
+@pytest.fixture(autouse=True)
+async def cleanup_bulk():
+    """Cleans up bulk email rows after each test."""
+    yield
+    await db.emaillog.delete_many(where={"to": {"startswith": "email_bulk_"}})
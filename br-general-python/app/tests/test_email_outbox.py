@@ -0,0 +1,209 @@
+import asyncio
+
+import pytest
+
+from app.db import db
+from app.repositories.email_outbox_repository import email_outbox_repo
+from app.services.email_outbox import DomainRateLimiter, EmailOutbox
+from app.services.email_service import EmailService
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+class FakePool:
+    """Stands in for the SMTP pool; fails the first `fail` messages."""
+
+    def __init__(self, fail: int = 0):
+        self.fail = fail
+        self.messages = []
+
+    async def send_message(self, message) -> None:
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("SMTP down")
+        self.messages.append(message)
+
+
+class SlowPool(FakePool):
+    """Takes `delay` seconds per message and notes the SENT rows it saw."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.sent_before = []
+
+    async def send_message(self, message) -> None:
+        stored = await rows("email_outbox_")
+        self.sent_before.append(sum(r.status == "SENT" for r in stored))
+        await asyncio.sleep(self.delay)
+        await super().send_message(message)
+
+
+def make_outbox(pool: FakePool, **overrides) -> EmailOutbox:
+    options = dict(
+        workers=1,
+        batch_size=10,
+        max_attempts=3,
+        retry_base_seconds=0,
+        lease_seconds=60,
+        poll_seconds=1,
+        domain_rate_per_minute=0,
+    )
+    options.update(overrides)
+    return EmailOutbox(EmailService(db, pool), **options)
+
+
+async def rows(prefix: str):
+    return await db.emaillog.find_many(
+        where={"to": {"startswith": prefix}}, order={"to": "asc"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_outbox_sends_stored_message():
+    pool = FakePool()
+    outbox = make_outbox(pool)
+
+    await outbox.enqueue(
+        to="email_outbox_ok@example.com",
+        subject="Welcome",
+        template="email/welcome.html",
+        params={"name": "Ann"},
+    )
+    [row] = await rows("email_outbox_ok")
+    assert row.status == "PENDING"
+    assert "Ann" in row.body
+
+    await outbox.process_due()
+    [row] = await rows("email_outbox_ok")
+    assert row.status == "SENT"
+    assert row.sentAt is not None
+    assert row.attempts == 1
+    assert len(pool.messages) == 1
+    assert pool.messages[0]["To"] == "email_outbox_ok@example.com"
+
+
+@pytest.mark.asyncio
+async def test_outbox_retries_then_fails():
+    outbox = make_outbox(FakePool(fail=10), max_attempts=3)
+    await outbox.enqueue(to="email_outbox_fail@example.com", subject="Hi", text="x")
+
+    await outbox.process_due()
+    [row] = await rows("email_outbox_fail")
+    assert row.status == "FAILED"
+    assert row.attempts == 3
+    assert "SMTP down" in row.error
+    assert outbox.stats()["retried"] == 2
+    assert outbox.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_outbox_recovers_after_transient_failure():
+    pool = FakePool(fail=1)
+    outbox = make_outbox(pool)
+    await outbox.enqueue(to="email_outbox_retry@example.com", subject="Hi", text="x")
+
+    await outbox.process_due()
+    [row] = await rows("email_outbox_retry")
+    assert row.status == "SENT"
+    assert row.attempts == 2
+    assert len(pool.messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_outbox_defers_over_domain_rate():
+    pool = FakePool()
+    outbox = make_outbox(pool, domain_rate_per_minute=1)
+    await outbox.enqueue_many(
+        [
+            {"to": f"email_outbox_rate_{n}@example.com", "subject": "Hi", "text": "x"}
+            for n in range(3)
+        ]
+    )
+
+    await outbox.process_due()
+    stored = await rows("email_outbox_rate_")
+    assert [r.status for r in stored].count("SENT") == 1
+    deferred = [r for r in stored if r.status == "PENDING"]
+    assert len(deferred) == 2
+    # putting a row back does not use up one of its attempts
+    assert all(r.attempts == 0 for r in deferred)
+    assert len(pool.messages) == 1
+    # each waits for its own slot of the domain, a minute apart
+    due = sorted(r.nextAttemptAt for r in deferred)
+    assert (due[1] - due[0]).total_seconds() == pytest.approx(60, abs=1)
+
+
+async def enqueue_three(outbox: EmailOutbox, prefix: str) -> None:
+    await outbox.enqueue_many(
+        [
+            {"to": f"{prefix}{n}@example.com", "subject": "Hi", "text": "x"}
+            for n in range(3)
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_outbox_marks_each_row_as_it_is_sent():
+    pool = SlowPool(delay=0)
+    outbox = make_outbox(pool)
+    await enqueue_three(outbox, "email_outbox_each_")
+
+    assert await outbox.process_batch() == 3
+    # every send already saw the rows before it as SENT
+    assert pool.sent_before == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_outbox_stop_finishes_the_current_batch():
+    pool = SlowPool(delay=0.05)
+    outbox = make_outbox(pool, poll_seconds=0.01)
+    await enqueue_three(outbox, "email_outbox_stop_")
+
+    outbox.start()
+    while not pool.sent_before:
+        await asyncio.sleep(0.01)
+    await outbox.stop()
+
+    assert [r.status for r in await rows("email_outbox_stop_")] == ["SENT"] * 3
+    assert outbox.stats()["workers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_outbox_renews_the_lease_of_waiting_rows():
+    outbox = make_outbox(SlowPool(delay=0.15), lease_seconds=0.2)
+    await enqueue_three(outbox, "email_outbox_lease_")
+
+    batch = asyncio.ensure_future(outbox.process_batch())
+    stolen = []
+    while not batch.done():
+        # another worker must not get rows of a batch still being sent
+        stolen += await email_outbox_repo.claim_due(db, limit=10, lease_seconds=60)
+        await asyncio.sleep(0.02)
+
+    assert await batch == 3
+    assert stolen == []
+    stored = await rows("email_outbox_lease_")
+    assert [(r.status, r.attempts) for r in stored] == [("SENT", 1)] * 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_books_slots_in_queue_order():
+    limiter = DomainRateLimiter(per_minute=60)
+    assert limiter.reserve("example.com", "a") == 0
+    waits = [limiter.reserve("example.com", key) for key in ("b", "c", "d")]
+    assert waits == pytest.approx([1, 2, 3], abs=0.05)
+    # other domains are not held up
+    assert limiter.reserve("example.org", "e") == 0
+    assert limiter.next_slot_in() == pytest.approx(1, abs=0.05)
+
+    # "b" coming back early keeps its slot instead of queueing again
+    assert limiter.reserve("example.com", "b") == pytest.approx(1, abs=0.05)
+    assert limiter.reserve("example.com", "f") == pytest.approx(4, abs=0.05)
+
+
+@pytest.fixture(autouse=True)
+async def cleanup_outbox():
+    """Cleans up outbox rows after each test."""
+    yield
+    await db.emaillog.delete_many(where={"to": {"startswith": "email_outbox_"}})
@@ -0,0 +1,51 @@
+import pytest
+
+from app.services.email_templates import TEMPLATES_DIR, EmailTemplates
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+def no_filesystem(*args, **kwargs):
+    raise AssertionError("template loaded from disk after preload")
+
+
+@pytest.mark.asyncio
+async def test_preloaded_templates_render_without_filesystem(monkeypatch):
+    templates = EmailTemplates(TEMPLATES_DIR, auto_reload=False, max_rendered=10)
+    assert templates.preload() >= 1
+
+    monkeypatch.setattr(templates.env.loader, "get_source", no_filesystem)
+    html = templates.render("email/welcome.html", {"name": "Ann"})
+    assert "Welcome, Ann!" in html
+    assert templates.stats()["loads"] == templates.stats()["compiled"]
+
+
+@pytest.mark.asyncio
+async def test_rendered_output_memoized_by_params():
+    templates = EmailTemplates(TEMPLATES_DIR, auto_reload=False, max_rendered=2)
+
+    first = templates.render("email/welcome.html", {"name": "Ann"})
+    assert templates.render("email/welcome.html", {"name": "Ann"}) is first
+    assert "Bob" in templates.render("email/welcome.html", {"name": "Bob"})
+    assert "<b>" not in templates.render("email/welcome.html", {"name": "<b>"})
+
+    stats = templates.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+    # LRU bound
+    assert stats["rendered"] == 2
+
+    # params that cannot be hashed are rendered, just not memoized
+    html = templates.render("email/welcome.html", {"name": "Eve", "extra": object()})
+    assert "Eve" in html
+    assert templates.stats()["misses"] == 3
+
+
+@pytest.mark.asyncio
+async def test_auto_reload_skips_memo():
+    templates = EmailTemplates(TEMPLATES_DIR, auto_reload=True, max_rendered=10)
+
+    templates.render("email/welcome.html", {"name": "Ann"})
+    templates.render("email/welcome.html", {"name": "Ann"})
+    stats = templates.stats()
+    assert stats["rendered"] == 0
+    assert stats["compiled"] == 0
@@ -0,0 +1,40 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.settings import settings
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+def sample(text: str, prefix: str) -> float:
+    """Value of the first exposition line starting with `prefix`."""
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+@pytest.mark.asyncio
+async def test_metrics_record_requests_by_route_template():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        before = (await client.get("/br-general/metrics")).text
+        await client.get("/br-general/stats/tests-cache")
+        await client.get("/br-general/stats/tests-cache")
+        await client.get("/br-general/no-such-route")
+
+        r = await client.get("/br-general/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+
+    route = 'method="GET",route="/br-general/stats/tests-cache"'
+    counter = f'http_requests_total{{{route},status="200"}}'
+    assert sample(r.text, counter) - sample(before, counter) == 2
+    assert sample(r.text, f"http_request_duration_seconds_count{{{route}}}") >= 2
+    assert sample(r.text, f"http_response_size_bytes_sum{{{route}}}") > 0
+
+    unmatched = 'http_requests_total{method="GET",route="<unmatched>",status="404"}'
+    assert sample(r.text, unmatched) >= 1
+    # the scrape itself is still in flight
+    assert sample(r.text, 'http_requests_in_progress{method="GET"}') >= 1
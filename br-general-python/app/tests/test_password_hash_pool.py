@@ -0,0 +1,75 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.settings import settings
+from app.services.password_pool import PasswordHashPool
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_when_saturated():
+    pool = PasswordHashPool(workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = asyncio.ensure_future(pool.run(release.wait, 5))
+        queued = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        assert pool.stats()["running"] == 1
+        assert pool.stats()["queued"] == 1
+
+        with pytest.raises(HTTPException) as exc:
+            await pool.run(release.wait, 5)
+        assert exc.value.status_code == 503
+        assert pool.rejected == 1
+
+        release.set()
+        assert await running is True
+        assert await queued is True
+        assert pool.pending == 0
+        assert pool.completed == 2
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_slot_until_hash_finishes():
+    pool = PasswordHashPool(workers=1, max_queue=0)
+    release = threading.Event()
+    try:
+        running = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        running.cancel()
+        await asyncio.gather(running, return_exceptions=True)
+
+        # the thread is still hashing, so the pool is still full
+        assert pool.pending == 1
+        with pytest.raises(HTTPException):
+            await pool.run(release.wait, 5)
+
+        release.set()
+        for _ in range(100):
+            if pool.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.pending == 0
+        assert pool.completed == 1
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hash_stats_endpoint():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        r = await client.get("/br-general/stats/password-hash")
+        assert r.status_code == 200, r.text
+        for k in ("workers", "max_queue", "running", "queued", "rejected"):
+            assert k in r.json()
@@ -0,0 +1,80 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.settings import settings
+from app.db import db
+from app.services.auth_service import calibrate_argon2, pwd_context
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+@pytest.mark.asyncio
+async def test_calibrate_argon2_keeps_explicit_costs():
+    params = calibrate_argon2(
+        5, memory_cost=1024, parallelism=1, time_cost=None, samples=1
+    )
+    assert params["memory_cost"] == 1024
+    assert params["parallelism"] == 1
+    assert params["time_cost"] >= 1
+
+    params = calibrate_argon2(1, time_cost=2, memory_cost=1024, samples=1)
+    assert params["time_cost"] == 2
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_hash():
+    email = "rehash_user@example.com"
+    password = "RehashPass1!"
+    original = pwd_context.to_dict()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        r = await client.post(
+            "/br-general/auth/register",
+            json={
+                "email": email,
+                "password": password,
+                "name": "Re",
+                "role": "PATIENT",
+            },
+        )
+        assert r.status_code == 200, r.text
+        old_hash = (await db.user.find_unique(where={"email": email})).hashed_password
+
+        try:
+            # operator changed the costs since registration
+            pwd_context.update(
+                argon2__rounds=1,
+                argon2__min_desired_rounds=1,
+                argon2__max_desired_rounds=1,
+                argon2__memory_cost=1024,
+            )
+            assert pwd_context.needs_update(old_hash)
+
+            r = await client.post(
+                "/br-general/auth/login", data={"username": email, "password": password}
+            )
+            assert r.status_code == 200, r.text
+
+            new_hash = (
+                await db.user.find_unique(where={"email": email})
+            ).hashed_password
+            assert new_hash != old_hash
+            assert "m=1024,t=1" in new_hash
+            assert not pwd_context.needs_update(new_hash)
+        finally:
+            pwd_context.load(original)
+
+        # the rewritten hash still logs in with the default costs restored
+        r = await client.post(
+            "/br-general/auth/login", data={"username": email, "password": password}
+        )
+        assert r.status_code == 200, r.text
+
+
+@pytest.fixture(autouse=True)
+async def cleanup_users():
+    """Cleans up test users after each test."""
+    yield
+    await db.user.delete_many(where={"email": {"contains": "rehash_user@"}})
@@ -1,39 +1,61 @@
+import httpx
 import pytest
 from httpx import AsyncClient, ASGITransport
 from fastapi import status
-from unittest.mock import patch
 
 from app.schemas.user import Plan
 from app.main import app
 from app.db import db
+from app.services.payment_events import payment_event_queue
+from app.services.yookassa_client import YooKassaClient, YooKassaError
+from app.tests.fake_yookassa import FakeYooKassa
 
 pytestmark = pytest.mark.asyncio(loop_scope="session")
 
 
+@pytest.fixture
+async def fake_yookassa(monkeypatch):
+    """Routes the payments API to a local fake YooKassa."""
+    fake = FakeYooKassa()
+    client = YooKassaClient(
+        "http://yookassa.test/v3",
+        "test-shop",
+        "test-secret",
+        timeout=5,
+        max_retries=2,
+        retry_backoff=0,
+        transport=ASGITransport(app=fake.app),
+    )
+    monkeypatch.setattr("app.api.payments.yookassa_client", client)
+    yield fake
+    await client.aclose()
+
+
+async def login(client, email: str) -> dict:
+    password = "StrongPass1!"
+    await client.post(
+        "/br-general/auth/register",
+        json={"email": email, "password": password, "name": "Pay", "role": "PATIENT"},
+    )
+    resp = await client.post(
+        "/br-general/auth/login", data={"username": email, "password": password}
+    )
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['tokens']['access_token']}"}
+
+
 @pytest.mark.asyncio
-@patch("app.api.payments.requests.post")
-async def test_payment_create_with_real_user(mock_post):
+async def test_payment_create_with_real_user(fake_yookassa):
     """
     Integration test:
     1. Register user
     2. Login to get access token
-    3. Create payment (mocked YooKassa API)
+    3. Create payment (fake YooKassa API)
     4. Simulate webhook event to create subscription
     5. Check DB subscription
     """
     transport = ASGITransport(app=app)
 
-    # Mock YooKassa API response
-    mock_post.return_value.status_code = 201
-    mock_post.return_value.json.return_value = {
-        "id": "test_payment_123",
-        "status": "pending",
-        "amount": {"value": "499.00", "currency": "RUB"},
-        "confirmation": {"confirmation_url": "https://test.yookassa.ru/pay/123"},
-        "description": "1-month subscription",
-        "metadata": {"user_id": None},  # will be update latter
-    }
-
     async with AsyncClient(transport=transport, base_url="http://test") as client:
         # 1 Register test user
         user_data = {
@@ -60,6 +82,7 @@ async def test_payment_create_with_real_user(mock_post):
         result = resp.json()
         assert "confirmation_url" in result
         assert "payment" in result
+        assert len(fake_yookassa.payments) == 1
 
         # 4 Simulate webhook event (payment succeeded)
         user = await db.user.find_unique(where={"email": user_data["email"]})
@@ -78,6 +101,10 @@ async def test_payment_create_with_real_user(mock_post):
         )
         assert webhook_resp.status_code == 200, webhook_resp.text
         assert "subscription" not in webhook_resp.text or "ok" in webhook_resp.text
+        assert webhook_resp.json()["status"] == "accepted"
+
+        # processed by the payment event queue, not in the request
+        await payment_event_queue.drain()
 
         # 5 Verify subscription was created
         subscription = await db.subscription.find_first(
@@ -90,11 +117,161 @@ async def test_payment_create_with_real_user(mock_post):
         assert subscription.endsAt > subscription.startedAt
 
 
+@pytest.mark.asyncio
+async def test_webhook_repeated_delivery_creates_one_subscription():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await login(client, "pay_test_user_dup@example.com")
+        user = await db.user.find_unique(
+            where={"email": "pay_test_user_dup@example.com"}
+        )
+        webhook_payload = {
+            "event": "payment.succeeded",
+            "object": {
+                "id": "pay-test-duplicate",
+                "amount": {"value": "1000", "currency": "RUB"},
+                "metadata": {"user_id": user.id},
+            },
+        }
+
+        statuses = []
+        for _ in range(3):
+            resp = await client.post(
+                "/br-general/payment/webhook", json=webhook_payload
+            )
+            assert resp.status_code == 200, resp.text
+            statuses.append(resp.json()["status"])
+        assert statuses == ["accepted", "duplicate", "duplicate"]
+
+        await payment_event_queue.drain()
+        # the FREE plan from registration plus one BASIC from the payment
+        subs = await db.subscription.find_many(where={"userId": user.id})
+        assert [s.plan for s in subs].count(Plan.BASIC) == 1
+
+        event = await db.paymentevent.find_unique(
+            where={"paymentId": "pay-test-duplicate"}
+        )
+        assert event.status == "PROCESSED"
+        assert event.attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_webhook_failures_retry_then_dead(monkeypatch):
+    calls = []
+
+    async def failing(payment_data, db_client=None):
+        calls.append(payment_data["id"])
+        raise RuntimeError("db is down")
+
+    monkeypatch.setattr(
+        "app.services.payment_events.payment_service.handle_payment_succeeded",
+        failing,
+    )
+    monkeypatch.setattr(payment_event_queue, "max_attempts", 3)
+    monkeypatch.setattr(payment_event_queue, "retry_backoff", 0)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            "/br-general/payment/webhook",
+            json={
+                "event": "payment.succeeded",
+                "object": {"id": "pay-test-dead", "metadata": {"user_id": "nobody"}},
+            },
+        )
+        assert resp.status_code == 200, resp.text
+
+        await payment_event_queue.drain()
+        assert calls == ["pay-test-dead"] * 3
+
+        event = await db.paymentevent.find_unique(where={"paymentId": "pay-test-dead"})
+        assert event.status == "DEAD"
+        assert event.attempts == 3
+        assert "db is down" in event.lastError
+
+
+@pytest.mark.asyncio
+async def test_payment_create_retries_with_same_idempotence_key(fake_yookassa):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = await login(client, "pay_test_user_retry@example.com")
+
+        fake_yookassa.fail_next(503, 429)
+        resp = await client.post("/br-general/payment/create", headers=headers)
+        assert resp.status_code == 200, resp.text
+
+        keys = [r["idempotence_key"] for r in fake_yookassa.requests]
+        assert len(keys) == 3
+        assert len(set(keys)) == 1
+        assert len(fake_yookassa.payments) == 1
+
+
+@pytest.mark.asyncio
+async def test_payment_create_yookassa_errors(fake_yookassa):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = await login(client, "pay_test_user_errors@example.com")
+
+        # client errors are passed through, not turned into 500
+        fake_yookassa.fail_next(400)
+        resp = await client.post("/br-general/payment/create", headers=headers)
+        assert resp.status_code == 400, resp.text
+        assert len(fake_yookassa.requests) == 1
+
+        # still failing after all retries
+        fake_yookassa.fail_next(500, 500, 500)
+        resp = await client.post("/br-general/payment/create", headers=headers)
+        assert resp.status_code == 502, resp.text
+        assert len(fake_yookassa.requests) == 4
+        assert fake_yookassa.payments == {}
+
+
+@pytest.mark.asyncio
+async def test_yookassa_client_retries_transport_errors():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.headers["Idempotence-Key"])
+        if len(calls) == 1:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"id": "payment-1", "status": "pending"})
+
+    client = YooKassaClient(
+        "http://yookassa.test/v3",
+        "shop",
+        "secret",
+        timeout=1,
+        max_retries=1,
+        retry_backoff=0,
+        transport=httpx.MockTransport(handler),
+    )
+    try:
+        data = await client.create_payment({}, idempotence_key="key-1")
+        assert data["id"] == "payment-1"
+        assert calls == ["key-1", "key-1"]
+
+        calls.clear()
+        client.max_retries = 0
+        with pytest.raises(YooKassaError) as exc:
+            await client.create_payment({}, idempotence_key="key-2")
+        assert exc.value.status_code == 502
+    finally:
+        await client.aclose()
+
+
 @pytest.fixture(autouse=True)
 async def cleanup_users():
     """Cleans up test users after each test file."""
     yield
-    await db.user.delete_many(where={"email": {"contains": "pay_test_user@"}})
+    await db.user.delete_many(where={"email": {"contains": "pay_test_user"}})
     await db.subscription.delete_many(
-        where={"user": {"email": {"contains": "pay_test_user@"}}}
+        where={"user": {"email": {"contains": "pay_test_user"}}}
+    )
+    await db.paymentevent.delete_many(
+        where={
+            "OR": [
+                {"paymentId": {"startswith": "fake-"}},
+                {"paymentId": {"startswith": "pay-test-"}},
+            ]
+        }
     )
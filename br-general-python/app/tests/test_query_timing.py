@@ -0,0 +1,77 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.db import db
+from app.main import app
+from app.middleware.query_timing import (
+    UNMATCHED_ROUTE,
+    QueryTimingMiddleware,
+    RouteQueryStats,
+    route_query_stats,
+)
+from app.settings import settings
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+def timed_app(stats: RouteQueryStats) -> FastAPI:
+    demo = FastAPI()
+    demo.add_middleware(QueryTimingMiddleware, stats=stats)
+
+    @demo.get("/items/{item_id}")
+    async def item(item_id: int):
+        for _ in range(item_id):
+            await db.query_raw("SELECT 1 AS one")
+        return {"id": item_id}
+
+    return demo
+
+
+@pytest.mark.asyncio
+async def test_queries_counted_per_request_and_route():
+    stats = RouteQueryStats()
+    transport = ASGITransport(app=timed_app(stats))
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        r = await client.get("/items/3")
+        assert r.status_code == 200
+        timing = r.headers["Server-Timing"]
+        assert 'desc="3 queries"' in timing
+        assert "db-slowest;dur=" in timing and 'desc="query_raw"' in timing
+
+        await client.get("/items/1")
+        await client.get("/nope")
+
+    routes = {item["route"]: item for item in stats.snapshot("requests")}
+    route = routes["GET /items/{item_id}"]
+    assert route["requests"] == 2
+    assert route["queries"] == 4
+    assert route["max_queries"] == 3
+    assert route["queries_per_request"] == 2
+    assert route["slowest"] == "query_raw"
+    assert routes[UNMATCHED_ROUTE]["queries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queries_outside_requests_are_not_recorded():
+    stats = RouteQueryStats()
+    timed_app(stats)
+    await db.query_raw("SELECT 1 AS one")
+    assert stats.snapshot() == []
+
+
+@pytest.mark.asyncio
+async def test_app_reports_db_time_per_route():
+    route_query_stats.reset()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        r = await client.get("/br-general/stats/email-outbox")
+        assert r.status_code == 200
+        assert "db;dur=" in r.headers["Server-Timing"]
+
+        r = await client.get("/br-general/stats/routes-db?sort_by=queries")
+        assert r.status_code == 200
+    routes = {item["route"]: item for item in r.json()["items"]}
+    outbox = routes["GET /br-general/stats/email-outbox"]
+    assert outbox["requests"] == 1
+    assert outbox["queries"] >= 1
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from app.db.routing import READ_AFTER_WRITE_HEADER, ReadRouter
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+class FakeClient:
+    """Stands in for a Prisma client; counts the statements sent to it."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.connected = False
+        self.queries = 0
+
+    async def connect(self) -> None:
+        if self.fail:
+            raise ConnectionError("replica down")
+        self.connected = True
+
+    async def disconnect(self) -> None:
+        self.connected = False
+
+    async def query_raw(self, *args):
+        self.queries += 1
+        return []
+
+    async def execute_raw(self, *args) -> int:
+        self.queries += 1
+        return 0
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_except_right_after_a_write():
+    primary, replica = FakeClient(), FakeClient()
+    router = ReadRouter(primary, replica, sticky_seconds=5)
+    # not connected yet
+    assert router.reader_for(None) is primary
+
+    await router.connect()
+    assert router.reader() is replica
+    assert router.reader_for(None) is replica
+
+    written_at = router.write_headers()[READ_AFTER_WRITE_HEADER]
+    assert router.reader_for(written_at) is primary
+    # shared reads are never sticky
+    assert router.reader() is replica
+
+    # old, unreadable or forged stamps do not pin reads to the primary
+    assert router.reader_for(str(time.time() - 6)) is replica
+    assert router.reader_for(str(time.time() + 60)) is replica
+    assert router.reader_for("soon") is replica
+    assert router.stats()["sticky_reads"] == 1
+
+    await router.disconnect()
+    assert not replica.connected
+    assert router.reader() is primary
+
+
+@pytest.mark.asyncio
+async def test_routing_sends_no_statements_to_the_primary():
+    primary, replica = FakeClient(), FakeClient()
+    writer = ReadRouter(primary, FakeClient(), sticky_seconds=5)
+    # another worker (or app replica) sharing the same databases
+    other = ReadRouter(primary, replica, sticky_seconds=5)
+    await writer.connect()
+    await other.connect()
+
+    written_at = writer.write_headers()[READ_AFTER_WRITE_HEADER]
+    assert other.reader_for(written_at) is primary
+    for _ in range(1000):
+        assert other.reader_for(None) is replica
+    assert primary.queries == 0
+
+
+@pytest.mark.asyncio
+async def test_without_or_with_broken_replica_everything_reads_primary():
+    primary = FakeClient()
+    router = ReadRouter(primary, None, sticky_seconds=5)
+    await router.connect()
+    assert router.write_headers() == {}
+    assert router.reader_for(None) is primary
+    assert router.reader() is primary
+
+    router = ReadRouter(primary, FakeClient(fail=True), sticky_seconds=5)
+    await router.connect()
+    assert router.reader() is primary
+    assert router.reader_for(None) is primary
+    assert router.stats()["replica_connected"] is False
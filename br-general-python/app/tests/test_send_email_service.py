@@ -10,13 +10,12 @@ client = TestClient(app)
 
 def test_send_email_ok(monkeypatch):
     """
-    Positive scenario: the endpoint returns 202, and the background task
-    calls email_service.send(...) exactly once with the expected arguments.
-    The TestClient waits for BackgroundTasks to complete.
+    Positive scenario: the endpoint returns 202 after storing the message
+    in the outbox with email_outbox.enqueue(...) exactly once.
     """
 
-    mock_send = AsyncMock(return_value=True)
-    monkeypatch.setattr(email_module.email_service, "send", mock_send)
+    mock_send = AsyncMock(return_value=None)
+    monkeypatch.setattr(email_module.email_outbox, "enqueue", mock_send)
     payload = {
         "to": "user@example.com",
         "subject": "Hello",
@@ -45,16 +44,16 @@ def test_send_email_ok(monkeypatch):
 
 def test_send_email_logs_on_failure(monkeypatch, caplog):
     """
-    Negative scenario: email_service.send raises an exception.
-    The endpoint still responds with 202 (fire-and-forget),
+    Negative scenario: the message cannot be stored in the outbox.
+    The endpoint responds with 503 (nothing was accepted),
     and the error must be written to logs.
     """
 
-    # Define a "failing" async function to replace send(...)
+    # Define a "failing" async function to replace enqueue(...)
     async def boom(**kwargs):
-        raise RuntimeError("SMTP down")
+        raise RuntimeError("DB down")
 
-    monkeypatch.setattr(email_module.email_service, "send", boom)
+    monkeypatch.setattr(email_module.email_outbox, "enqueue", boom)
     caplog.set_level(logging.ERROR)
     payload = {
         "to": "user@example.com",
@@ -66,8 +65,5 @@ def test_send_email_logs_on_failure(monkeypatch, caplog):
     }
 
     res = client.post("/br-general/email/send", json=payload)
-    assert res.status_code == 202
-    body = res.json()
-    assert body["accepted"] is True
-    assert body["message"] == "Email scheduled for delivery"
-    assert any("Email send failed:" in r.message for r in caplog.records)
+    assert res.status_code == 503
+    assert any("Email enqueue failed:" in r.message for r in caplog.records)
@@ -0,0 +1,104 @@
+import socket
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.services.smtp_pool import SMTPConnectionPool
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+class CollectingHandler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = CollectingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def make_pool(controller, size=2, **kwargs) -> SMTPConnectionPool:
+    options = {"idle_check_seconds": 30, "max_idle_seconds": 240, **kwargs}
+    return SMTPConnectionPool(
+        host=controller.hostname,
+        port=controller.port,
+        username=None,
+        password=None,
+        use_tls=False,
+        start_tls=False,
+        size=size,
+        **options,
+    )
+
+
+def message(n: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "no-reply@example.com"
+    msg["To"] = f"user{n}@example.com"
+    msg["Subject"] = f"Pool test {n}"
+    msg.set_content("Hello")
+    return msg
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_connections(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller, size=2)
+    try:
+        for n in range(5):
+            await pool.send_message(message(n))
+
+        assert len(handler.messages) == 5
+        assert len(handler.sessions) == 1
+        stats = pool.stats()
+        assert stats["created"] == 1
+        assert stats["reused"] == 4
+        assert stats["sent"] == 5
+        assert stats["idle"] == 1
+    finally:
+        await pool.close()
+    assert pool.stats()["open"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_reconnects_after_server_restart():
+    handler = CollectingHandler()
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    pool = make_pool(controller, size=1, idle_check_seconds=0)
+    try:
+        await pool.send_message(message(1))
+
+        # server drops every connection; the idle one fails its NOOP check
+        controller.stop()
+        controller = Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+
+        await pool.send_message(message(2))
+        assert len(handler.messages) == 2
+        stats = pool.stats()
+        assert stats["created"] == 2
+        assert stats["discarded"] == 1
+        assert stats["health_checks"] >= 1
+    finally:
+        await pool.close()
+        controller.stop()
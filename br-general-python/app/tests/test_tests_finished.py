@@ -0,0 +1,162 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from jose import jwt
+from datetime import datetime, timedelta, timezone
+
+from app.main import app
+from app.settings import settings
+from app.db import db
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def login(client, email: str):
+    password = "FinishedPass1!"
+    await client.post(
+        "/br-general/auth/register",
+        json={"email": email, "password": password, "name": "Fin", "role": "PATIENT"},
+    )
+    response = await client.post(
+        "/br-general/auth/login", data={"username": email, "password": password}
+    )
+    assert response.status_code == 200, response.text
+    tokens = response.json()["tokens"]
+    user_id = jwt.decode(
+        tokens["access_token"],
+        settings.jwt_secret_key,
+        algorithms=[settings.jwt_algorithm],
+    )["sub"]
+    return user_id, {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+async def create_sessions(user_id: str, topic_title: str, finished_at: list):
+    topic = await db.topic.create(data={"title": topic_title})
+    test = await db.test.create(
+        data={
+            "title": f"{topic_title} test",
+            "description": "Finished",
+            "topicId": topic.id,
+        }
+    )
+    for ts in finished_at:
+        await db.testsession.create(
+            data={
+                "user": {"connect": {"id": user_id}},
+                "test": {"connect": {"id": test.id}},
+                "finishedAt": ts,
+                "isFinished": ts is not None,
+            }
+        )
+    return topic, test
+
+
+@pytest.mark.asyncio
+async def test_finished_topics_last_finished_per_topic():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        user_id, headers = await login(client, "finished_user_1@example.com")
+
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        topic_a, _ = await create_sessions(
+            user_id,
+            "FINISHED-TOPIC-A",
+            [now - timedelta(days=3), now - timedelta(days=1), None],
+        )
+        topic_b, _ = await create_sessions(
+            user_id, "FINISHED-TOPIC-B", [now - timedelta(days=2)]
+        )
+        await create_sessions(user_id, "FINISHED-TOPIC-C", [None])
+
+        response = await client.get(
+            "/br-general/tests/finished/topics", headers=headers
+        )
+        assert response.status_code == 200, response.text
+        data = response.json()
+
+        assert [row["topicId"] for row in data] == [topic_a.id, topic_b.id]
+        assert data[0]["topicTitle"] == "FINISHED-TOPIC-A"
+        assert datetime.fromisoformat(data[0]["lastFinishedAt"]) == now - timedelta(
+            days=1
+        )
+        assert datetime.fromisoformat(data[1]["lastFinishedAt"]) == now - timedelta(
+            days=2
+        )
+
+
+@pytest.mark.asyncio
+async def test_finished_tests_cursor_pagination():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        user_id, headers = await login(client, "finished_user_2@example.com")
+
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        # two sessions share a finishedAt to exercise the (finishedAt, id) tie-break
+        finished = [now - timedelta(hours=h) for h in (1, 2, 2, 3, 4)]
+        await create_sessions(user_id, "FINISHED-TOPIC-D", finished)
+
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get(
+                "/br-general/tests/finished", params=params, headers=headers
+            )
+            assert response.status_code == 200, response.text
+            page = response.json()
+            assert len(page) <= 2
+            seen.extend(page)
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert pages == 3
+        assert len(seen) == len(finished)
+        stamps = [datetime.fromisoformat(item["finishedAt"]) for item in seen]
+        assert stamps == sorted(stamps, reverse=True)
+        assert set(seen[0]) == {"testTitle", "finishedAt", "stats"}
+
+        # projection
+        response = await client.get(
+            "/br-general/tests/finished",
+            params={"fields": "finishedAt"},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+        assert all(set(item) == {"finishedAt"} for item in response.json())
+
+        # streaming returns the whole history as NDJSON
+        response = await client.get(
+            "/br-general/tests/finished",
+            params={"stream": "true", "limit": 2},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert len(response.text.strip().splitlines()) == len(finished)
+
+        response = await client.get(
+            "/br-general/tests/finished",
+            params={"cursor": "not-a-cursor"},
+            headers=headers,
+        )
+        assert response.status_code == 422
+
+        response = await client.get(
+            "/br-general/tests/finished",
+            params={"stream": "true", "cursor": "not-a-cursor"},
+            headers=headers,
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"] == "INVALID_CURSOR"
+
+
+@pytest.fixture(autouse=True)
+async def cleanup_data():
+    """Cleans up test users and content after each test."""
+    yield
+    await db.user.delete_many(where={"email": {"contains": "finished_user_"}})
+    await db.topic.delete_many(where={"title": {"contains": "FINISHED-TOPIC-"}})
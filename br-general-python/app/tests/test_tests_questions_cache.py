@@ -0,0 +1,207 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.settings import settings
+from app.db import db
+from app.services.tests_service import (
+    CachedTestQuestions,
+    QuestionsPayloadCache,
+    test_questions_cache,
+    invalidate_test_questions_cache,
+)
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def create_test_with_question(title: str):
+    topic = await db.topic.create(data={"title": "CACHE-TOPIC"})
+    test = await db.test.create(
+        data={
+            "title": title,
+            "description": f"{title} description",
+            "topicId": topic.id,
+        }
+    )
+    question = await db.question.create(
+        data={
+            "testId": test.id,
+            "text": "How are you?",
+            "type": "RADIO",
+            "options": {
+                "create": [
+                    {"text": "Good", "isCorrect": True},
+                    {"text": "Bad", "isCorrect": False},
+                ]
+            },
+        }
+    )
+    return test, question
+
+
+@pytest.mark.asyncio
+async def test_questions_served_from_cache():
+    test, question = await create_test_with_question("CACHE-TEST-1")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        url = f"/br-general/tests/{test.id}/questions"
+
+        hits_before = test_questions_cache.hits
+        misses_before = test_questions_cache.misses
+
+        first = await client.get(url)
+        assert first.status_code == 200, first.text
+        second = await client.get(url)
+        assert second.status_code == 200, second.text
+
+        assert first.json() == second.json()
+        assert first.json()["questions"][0]["text"] == "How are you?"
+        assert test_questions_cache.misses == misses_before + 1
+        assert test_questions_cache.hits == hits_before + 1
+
+        r = await client.get("/br-general/stats/tests-cache")
+        assert r.status_code == 200, r.text
+        for k in ("size", "hits", "misses", "evictions"):
+            assert k in r.json()
+
+
+@pytest.mark.asyncio
+async def test_questions_cache_invalidation():
+    test, question = await create_test_with_question("CACHE-TEST-2")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        url = f"/br-general/tests/{test.id}/questions"
+        r = await client.get(url)
+        assert r.json()["questions"][0]["text"] == "How are you?"
+
+        await db.question.update(
+            where={"id": question.id}, data={"text": "How do you feel?"}
+        )
+
+        # stale until invalidated
+        r = await client.get(url)
+        assert r.json()["questions"][0]["text"] == "How are you?"
+
+        invalidate_test_questions_cache(test.id)
+        r = await client.get(url)
+        assert r.json()["questions"][0]["text"] == "How do you feel?"
+
+
+@pytest.mark.asyncio
+async def test_questions_etag_not_modified():
+    test, question = await create_test_with_question("CACHE-TEST-3")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        url = f"/br-general/tests/{test.id}/questions"
+        r = await client.get(url)
+        assert r.status_code == 200, r.text
+        assert r.headers["content-type"] == "application/json"
+        etag = r.headers["etag"]
+        assert etag.startswith('"') and etag.endswith('"')
+
+        r = await client.get(url, headers={"If-None-Match": etag})
+        assert r.status_code == 304
+        assert r.headers["etag"] == etag
+        assert r.content == b""
+
+        r = await client.get(url, headers={"If-None-Match": '"other", W/' + etag})
+        assert r.status_code == 304
+
+        # content change -> new ETag and full body
+        await db.question.update(where={"id": question.id}, data={"text": "Changed"})
+        invalidate_test_questions_cache(test.id)
+        r = await client.get(url, headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.headers["etag"] != etag
+        assert r.json()["questions"][0]["text"] == "Changed"
+
+
+@pytest.mark.asyncio
+async def test_questions_unknown_test_not_found():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        r = await client.get("/br-general/tests/does-not-exist/questions")
+        assert r.status_code == 404
+
+
+def cached_entry(test_id: str) -> CachedTestQuestions:
+    return CachedTestQuestions.from_payload(
+        test_id, {"testId": test_id, "topicId": "t", "questions": []}
+    )
+
+
+@pytest.mark.asyncio
+async def test_questions_cache_entries_expire():
+    cache = QuestionsPayloadCache(max_entries=10, ttl_seconds=0.05)
+    cache.put(cached_entry("a"), version=cache.version)
+    assert cache.get("a") is not None
+
+    await asyncio.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_questions_cache_leader_cancel_keeps_waiters():
+    cache = QuestionsPayloadCache(max_entries=10)
+    release = asyncio.Event()
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await release.wait()
+        return cached_entry("a")
+
+    leader = asyncio.create_task(cache.get_or_load("a", load))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load("a", load))
+    await asyncio.sleep(0)
+
+    # client of the first request disconnects
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await waiter).test_id == "a"
+    assert loads == 1
+    assert cache.get("a") is not None
+
+
+@pytest.mark.asyncio
+async def test_questions_cache_recheck_is_rate_limited():
+    cache = QuestionsPayloadCache(max_entries=10)
+    cache.put(cached_entry("a"), version=cache.version)
+    cache.put(cached_entry("b"), version=cache.version)
+    first = cache.get("a")
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        return cached_entry("a")
+
+    # fresh entry: no reload
+    assert await cache.recheck("a", load, min_age=60) is first
+    assert loads == 0
+
+    # old enough: reloaded, but identical content keeps the shared object
+    assert await cache.recheck("a", load, min_age=0) is first
+    assert loads == 1
+    # other tests and the cache version are untouched
+    assert cache.get("b") is not None
+    assert cache.stats()["version"] == 0
+    assert cache.stats()["rechecks"] == 1
+
+
+async def cleanup_tests():
+    """Cleans up test content after each test."""
+    yield
+    await db.test.delete_many(where={"title": {"contains": "CACHE-TEST-"}})
+    await db.topic.delete_many(where={"title": "CACHE-TOPIC"})
+    invalidate_test_questions_cache()
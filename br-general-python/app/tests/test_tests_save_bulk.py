@@ -0,0 +1,323 @@
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.settings import settings
+from app.db import db
+from app.services import tests_service
+from app.services.tests_service import invalidate_test_questions_cache
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def login(client, email: str) -> dict:
+    password = "SaveBulkPass1!"
+    await client.post(
+        "/br-general/auth/register",
+        json={"email": email, "password": password, "name": "Bulk", "role": "PATIENT"},
+    )
+    response = await client.post(
+        "/br-general/auth/login", data={"username": email, "password": password}
+    )
+    assert response.status_code == 200, response.text
+    tokens = response.json()["tokens"]
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+async def create_test(title: str):
+    topic = await db.topic.create(data={"title": "SAVE-BULK-TOPIC"})
+    test = await db.test.create(
+        data={"title": title, "description": "Save bulk", "topicId": topic.id}
+    )
+    radio = await db.question.create(
+        data={
+            "testId": test.id,
+            "text": "Radio question",
+            "type": "RADIO",
+            "options": {
+                "create": [
+                    {"text": "Yes", "isCorrect": True},
+                    {"text": "No", "isCorrect": False},
+                ]
+            },
+        },
+        include={"options": True},
+    )
+    checkbox = await db.question.create(
+        data={
+            "testId": test.id,
+            "text": "Checkbox question",
+            "type": "CHECKBOX",
+            "options": {
+                "create": [
+                    {"text": "A", "isCorrect": True},
+                    {"text": "B", "isCorrect": True},
+                    {"text": "C", "isCorrect": False},
+                ]
+            },
+        },
+        include={"options": True},
+    )
+    text = await db.question.create(
+        data={"testId": test.id, "text": "Text question", "type": "TEXT"}
+    )
+    return test, radio, checkbox, text
+
+
+@pytest.mark.asyncio
+async def test_save_bulk_returns_saved_count():
+    test, radio, checkbox, text = await create_test("SAVE-BULK-TEST-1")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        headers = await login(client, "save_bulk_user_1@example.com")
+
+        payload = {
+            "testId": test.id,
+            "answers": [
+                {"questionId": radio.id, "answerOptionId": radio.options[0].id},
+                {
+                    "questionId": checkbox.id,
+                    "selectedOptionIds": [o.id for o in checkbox.options[:2]],
+                },
+                {"questionId": text.id, "freeText": "Feeling fine"},
+            ],
+            "stats": {"score": 3},
+        }
+        response = await client.post(
+            "/br-general/tests/save-bulk", json=payload, headers=headers
+        )
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["savedCount"] == 4
+        assert body["isFinished"] is True
+
+        saved = await db.givenanswer.count(where={"sessionId": body["sessionId"]})
+        assert saved == 4
+
+        session = await db.testsession.find_unique(
+            where={"id": body["sessionId"]}, include={"stats": True}
+        )
+        assert session.isFinished is True
+        assert {s.key: s.value for s in session.stats} == {"score": 3}
+
+
+@pytest.mark.asyncio
+async def test_save_bulk_without_answers():
+    test, *_ = await create_test("SAVE-BULK-TEST-2")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        headers = await login(client, "save_bulk_user_2@example.com")
+
+        response = await client.post(
+            "/br-general/tests/save-bulk",
+            json={"testId": test.id, "answers": []},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+        assert response.json()["savedCount"] == 0
+
+
+@pytest.mark.asyncio
+async def test_save_bulk_reports_failed_stats():
+    test, radio, *_ = await create_test("SAVE-BULK-TEST-4")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        headers = await login(client, "save_bulk_user_4@example.com")
+
+        stats = {f"scale_{i}": i for i in range(30)}
+        stats.update({"broken": "n/a", "huge": 2**40})
+        payload = {
+            "testId": test.id,
+            "answers": [
+                {"questionId": radio.id, "answerOptionId": radio.options[0].id}
+            ],
+            "stats": stats,
+        }
+        response = await client.post(
+            "/br-general/tests/save-bulk", json=payload, headers=headers
+        )
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["failedStats"] == {
+            "broken": "NOT_AN_INTEGER",
+            "huge": "OUT_OF_RANGE",
+        }
+
+        stored = await db.sessionstat.find_many(where={"sessionId": body["sessionId"]})
+        assert {s.key: s.value for s in stored} == {f"scale_{i}": i for i in range(30)}
+
+
+@pytest.mark.asyncio
+async def test_save_bulk_is_atomic(monkeypatch):
+    test, radio, checkbox, text = await create_test("SAVE-BULK-TEST-3")
+    inside_tx = {}
+
+    async def failing_finish(tx, *, session_id, stats):
+        # the answers are already inserted in this transaction
+        inside_tx["session_id"] = session_id
+        inside_tx["answers"] = await tx.givenanswer.count(
+            where={"sessionId": session_id}
+        )
+        raise HTTPException(status_code=500, detail="STATS_FAILED")
+
+    monkeypatch.setattr(tests_service, "finish_session_with_stats_repo", failing_finish)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        email = "save_bulk_user_3@example.com"
+        headers = await login(client, email)
+
+        payload = {
+            "testId": test.id,
+            "answers": [
+                {"questionId": radio.id, "answerOptionId": radio.options[0].id},
+                {
+                    "questionId": checkbox.id,
+                    "selectedOptionIds": [checkbox.options[0].id],
+                },
+            ],
+            "stats": {"score": 1},
+        }
+        response = await client.post(
+            "/br-general/tests/save-bulk", json=payload, headers=headers
+        )
+        assert response.status_code == 500, response.text
+        assert inside_tx["answers"] == 2
+
+        # the transaction rolled back the session and its answers
+        sessions = await db.testsession.count(
+            where={"testId": test.id, "user": {"email": email}}
+        )
+        assert sessions == 0
+        answers = await db.givenanswer.count(
+            where={"sessionId": inside_tx["session_id"]}
+        )
+        assert answers == 0
+
+
+@pytest.mark.asyncio
+async def test_save_bulk_rejects_missing_question_id():
+    test, radio, checkbox, text = await create_test("SAVE-BULK-TEST-8")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        email = "save_bulk_user_8@example.com"
+        headers = await login(client, email)
+
+        payload = {
+            "testId": test.id,
+            "answers": [
+                {"questionId": radio.id, "answerOptionId": radio.options[0].id},
+                {"answerOptionId": radio.options[1].id},  # no questionId
+            ],
+            "stats": {"score": 1},
+        }
+        response = await client.post(
+            "/br-general/tests/save-bulk", json=payload, headers=headers
+        )
+        assert response.status_code == 422, response.text
+
+        sessions = await db.testsession.count(
+            where={"testId": test.id, "user": {"email": email}}
+        )
+        assert sessions == 0
+
+
+@pytest.mark.asyncio
+async def test_save_bulk_accepts_question_added_after_caching(monkeypatch):
+    test, radio, checkbox, text = await create_test("SAVE-BULK-TEST-7")
+    # the cache is rechecked at most every few seconds; not in this test
+    monkeypatch.setattr(tests_service, "TESTS_CACHE_RECHECK_SECONDS", 0)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        headers = await login(client, "save_bulk_user_7@example.com")
+
+        # warm the cache, then add a question behind its back
+        r = await client.get(f"/br-general/tests/{test.id}/questions")
+        assert r.status_code == 200, r.text
+        added = await db.question.create(
+            data={
+                "testId": test.id,
+                "text": "Added later",
+                "type": "RADIO",
+                "options": {"create": [{"text": "Ok", "isCorrect": True}]},
+            },
+            include={"options": True},
+        )
+
+        payload = {
+            "testId": test.id,
+            "answers": [
+                {"questionId": added.id, "answerOptionId": added.options[0].id}
+            ],
+        }
+        response = await client.post(
+            "/br-general/tests/save-bulk", json=payload, headers=headers
+        )
+        assert response.status_code == 200, response.text
+        assert response.json()["savedCount"] == 1
+
+
+@pytest.mark.asyncio
+async def test_save_bulk_rejects_foreign_ids():
+    test, radio, checkbox, text = await create_test("SAVE-BULK-TEST-5")
+    other_test, other_radio, *_ = await create_test("SAVE-BULK-TEST-6")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        email = "save_bulk_user_5@example.com"
+        headers = await login(client, email)
+
+        # option of another question
+        payload = {
+            "testId": test.id,
+            "answers": [
+                {"questionId": radio.id, "answerOptionId": checkbox.options[0].id}
+            ],
+        }
+        response = await client.post(
+            "/br-general/tests/save-bulk", json=payload, headers=headers
+        )
+        assert response.status_code == 422, response.text
+        assert response.json()["detail"].startswith("UNKNOWN_OPTION:")
+
+        # question of another test
+        payload = {
+            "testId": test.id,
+            "answers": [
+                {
+                    "questionId": other_radio.id,
+                    "answerOptionId": other_radio.options[0].id,
+                }
+            ],
+        }
+        response = await client.post(
+            "/br-general/tests/save-bulk", json=payload, headers=headers
+        )
+        assert response.status_code == 422, response.text
+        assert response.json()["detail"] == f"UNKNOWN_QUESTION:{other_radio.id}"
+
+        response = await client.post(
+            "/br-general/tests/save-bulk",
+            json={"testId": "missing-test", "answers": []},
+            headers=headers,
+        )
+        assert response.status_code == 404
+
+        sessions = await db.testsession.count(where={"user": {"email": email}})
+        assert sessions == 0
+
+
+@pytest.fixture(autouse=True)
+async def cleanup_data():
+    """Cleans up test users and content after each test."""
+    yield
+    await db.user.delete_many(where={"email": {"contains": "save_bulk_user_"}})
+    await db.test.delete_many(where={"title": {"contains": "SAVE-BULK-TEST-"}})
+    await db.topic.delete_many(where={"title": "SAVE-BULK-TOPIC"})
+    invalidate_test_questions_cache()
@@ -0,0 +1,179 @@
+from datetime import datetime, timezone
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from prisma import Json
+
+from app.db import db
+from app.main import app
+from app.services.top_sql_sampler import (
+    Snapshot,
+    StatementCounters,
+    TopSqlSampler,
+    deltas,
+    regressions,
+    window_start,
+)
+from app.settings import settings
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+START = 1_700_000_000
+
+
+def counters(calls, total_ms):
+    return StatementCounters(calls, total_ms, calls, 0.0)
+
+
+def history():
+    """Snapshots a minute apart; "b" gets 4x slower in the last 10 minutes."""
+    snapshots = []
+    for minute in range(31):
+        fast = min(minute, 20)
+        slow = max(minute - 20, 0)
+        snapshots.append(
+            Snapshot(
+                START + 60 * minute,
+                {
+                    "a": counters(100 * minute, 100.0 * minute),
+                    "b": counters(10 * minute, 10.0 * fast + 40.0 * slow),
+                },
+            )
+        )
+    return snapshots
+
+
+async def store(snapshots):
+    await db.topsqlsnapshot.create_many(
+        data=[
+            {
+                "takenAt": datetime.fromtimestamp(s.taken_at, timezone.utc),
+                "statements": Json({k: list(c) for k, c in s.statements.items()}),
+            }
+            for s in snapshots
+        ]
+    )
+
+
+async def _pgss_installed() -> bool:
+    try:
+        rows = await db.query_raw(
+            "SELECT COUNT(*)::int AS n FROM pg_extension "
+            "WHERE extname = 'pg_stat_statements';"
+        )
+        return rows and rows[0]["n"] > 0
+    except Exception:
+        return False
+
+
+@pytest.mark.asyncio
+async def test_window_deltas_are_per_interval():
+    snapshots = history()
+    times = [s.taken_at for s in snapshots]
+    start = window_start(times, 10 * 60, 60, len(times) - 1)
+    assert times[-1] - times[start] == 600
+
+    items = {
+        i["key"]: i
+        for i in deltas(
+            snapshots[start], snapshots[-1], min_calls=1, queries={"a": "A"}
+        )
+    }
+    assert items["a"]["query"] == "A"
+    assert items["a"]["calls"] == 1000
+    assert items["a"]["calls_per_sec"] == pytest.approx(1000 / 600)
+    assert items["a"]["mean_ms"] == pytest.approx(1.0)
+    # cumulative mean of "b" is 2.0 ms, in the window it is 4.0 ms
+    assert items["b"]["mean_ms"] == pytest.approx(4.0)
+
+
+@pytest.mark.asyncio
+async def test_window_shorter_than_history_and_too_short():
+    assert window_start([1000], 600, 60, 0) is None
+    assert window_start([1000, 1060], 600, 60, 1) == 0
+
+
+@pytest.mark.asyncio
+async def test_reset_counters_count_from_zero():
+    before = Snapshot(1000, {"a": counters(500, 500.0), "gone": counters(5, 5.0)})
+    after = Snapshot(1060, {"a": counters(3, 30.0), "new": counters(2, 4.0)})
+
+    items = {i["key"]: i for i in deltas(before, after, min_calls=1)}
+    assert items["a"]["calls"] == 3
+    assert items["a"]["mean_ms"] == pytest.approx(10.0)
+    assert items["new"]["calls"] == 2
+    assert "gone" not in items
+
+
+@pytest.mark.asyncio
+async def test_regressions_against_baseline():
+    s = history()
+    items = regressions((s[10], s[20]), (s[20], s[30]), min_calls=5, min_ratio=1.5)
+    assert [i["key"] for i in items] == ["b"]
+    assert items[0]["ratio"] == pytest.approx(4.0)
+    assert items[0]["added_ms"] == pytest.approx(100 * 3.0)
+
+    assert regressions((s[10], s[20]), (s[20], s[30]), min_calls=5, min_ratio=5) == []
+
+
+@pytest.mark.asyncio
+async def test_snapshots_are_read_back_from_the_table():
+    await store(history())
+    sampler = TopSqlSampler(interval_seconds=60, max_snapshots=100)
+
+    start, end = await sampler.window(10 * 60)
+    assert (start.taken_at, end.taken_at) == (START + 1200, START + 1800)
+    assert end.statements["b"] == counters(300, 600.0)
+
+    baseline_from, window_from, window_to = await sampler.baseline_and_window(600, 600)
+    assert window_from.taken_at - baseline_from.taken_at == 600
+    assert window_to.taken_at == START + 1800
+
+
+@pytest.mark.asyncio
+async def test_one_snapshot_per_interval_across_processes():
+    if not await _pgss_installed():
+        pytest.skip("pg_stat_statements is not installed in this database")
+
+    # two workers sampling the same database
+    first = TopSqlSampler(interval_seconds=60, max_snapshots=10)
+    second = TopSqlSampler(interval_seconds=60, max_snapshots=10)
+    assert await first.sample() is True
+    assert await second.sample() is False
+    assert (await second.stats())["snapshots"] == 1
+    assert second.skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_top_sql_window_endpoint():
+    await store(history())
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        r = await client.get(
+            "/br-general/stats/top-sql?window_minutes=10&sort_by=mean&min_calls=1"
+        )
+        assert r.status_code == 200, r.text
+        data = r.json()
+        assert data["seconds"] == 600
+        assert [i["key"] for i in data["items"]] == ["b", "a"]
+
+        r = await client.get(
+            "/br-general/stats/top-sql?window_minutes=10&baseline_minutes=10"
+        )
+        assert r.status_code == 200, r.text
+        assert [i["key"] for i in r.json()["items"]] == ["b"]
+
+        r = await client.get("/br-general/stats/top-sql?baseline_minutes=10")
+        assert r.status_code == 400
+
+        await db.topsqlsnapshot.delete_many()
+        r = await client.get("/br-general/stats/top-sql?window_minutes=10")
+        assert r.status_code == 503
+        assert r.json()["detail"] == "NOT_ENOUGH_SNAPSHOTS"
+
+
+@pytest.fixture(autouse=True)
+async def cleanup_snapshots():
+    """Removes stored snapshots after each test."""
+    yield
+    await db.topsqlsnapshot.delete_many()
@@ -1,3 +1,4 @@
+import json
 import random
 import pytest
 from httpx import AsyncClient, ASGITransport
@@ -95,6 +96,174 @@ async def test_multiple_users_tests_results(index):
         print(f"User {index}: {email} — {len(data['sessions'])} session(s) OK")
 
 
+@pytest.mark.asyncio
+async def test_tests_results_with_option_and_text_answers():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        email = "test_user_tests_flat@example.com"
+        password = "StrongPassFlat!"
+        await client.post(
+            "/br-general/auth/register",
+            json={
+                "email": email,
+                "password": password,
+                "name": "Flat",
+                "role": "PATIENT",
+            },
+        )
+        response = await client.post(
+            "/br-general/auth/login", data={"username": email, "password": password}
+        )
+        tokens = response.json()["tokens"]
+        user_id = jwt.decode(
+            tokens["access_token"],
+            settings.jwt_secret_key,
+            algorithms=[settings.jwt_algorithm],
+        )["sub"]
+
+        topic = await db.topic.find_first(where={"title": "Focus and Attention"})
+        if not topic:
+            topic = await db.topic.create(data={"title": "Focus and Attention"})
+        test = await db.test.create(
+            data={
+                "title": "TEST-FLAT Results",
+                "description": "TEST-FLAT",
+                "topicId": topic.id,
+            }
+        )
+        radio = await db.question.create(
+            data={
+                "testId": test.id,
+                "text": "Did you sleep well?",
+                "type": "RADIO",
+                "options": {"create": [{"text": "Yes", "isCorrect": True}]},
+            },
+            include={"options": True},
+        )
+        text = await db.question.create(
+            data={"testId": test.id, "text": "Describe your mood", "type": "TEXT"}
+        )
+
+        for i in range(2):
+            session = await db.testsession.create(
+                data={
+                    "user": {"connect": {"id": user_id}},
+                    "test": {"connect": {"id": test.id}},
+                    "finishedAt": datetime.now(timezone.utc),
+                }
+            )
+            await db.givenanswer.create_many(
+                data=[
+                    {
+                        "sessionId": session.id,
+                        "questionId": radio.id,
+                        "answerOptionId": radio.options[0].id,
+                    },
+                    {
+                        "sessionId": session.id,
+                        "questionId": text.id,
+                        "freeText": f"calm {i}",
+                    },
+                ]
+            )
+
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        response = await client.get(
+            f"/br-general/users/me/tests/{test.id}", headers=headers
+        )
+        assert response.status_code == 200, response.text
+        data = response.json()
+
+        # question texts are listed once, not per session
+        assert data["questions"] == {
+            radio.id: "Did you sleep well?",
+            text.id: "Describe your mood",
+        }
+        assert len(data["sessions"]) == 2
+        for s in data["sessions"]:
+            answers = {a["question_id"]: a["answer"] for a in s["answers"]}
+            assert answers[radio.id] == "Yes"
+            assert answers[text.id].startswith("calm ")
+
+
+@pytest.mark.asyncio
+async def test_export_test_history_ndjson():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url=settings.base_url) as client:
+        email = "test_user_tests_export@example.com"
+        password = "StrongPassExport!"
+        await client.post(
+            "/br-general/auth/register",
+            json={
+                "email": email,
+                "password": password,
+                "name": "Exp",
+                "role": "PATIENT",
+            },
+        )
+        response = await client.post(
+            "/br-general/auth/login", data={"username": email, "password": password}
+        )
+        tokens = response.json()["tokens"]
+        user_id = jwt.decode(
+            tokens["access_token"],
+            settings.jwt_secret_key,
+            algorithms=[settings.jwt_algorithm],
+        )["sub"]
+
+        topic = await db.topic.find_first(where={"title": "Focus and Attention"})
+        if not topic:
+            topic = await db.topic.create(data={"title": "Focus and Attention"})
+        test = await db.test.create(
+            data={
+                "title": "TEST-EXPORT History",
+                "description": "TEST-EXPORT",
+                "topicId": topic.id,
+            }
+        )
+        question = await db.question.create(
+            data={"testId": test.id, "text": "How was your day?", "type": "TEXT"}
+        )
+
+        # more sessions than one export chunk
+        num_sessions = 60
+        for i in range(num_sessions):
+            session = await db.testsession.create(
+                data={
+                    "user": {"connect": {"id": user_id}},
+                    "test": {"connect": {"id": test.id}},
+                    "finishedAt": datetime.now(timezone.utc),
+                    "isFinished": True,
+                }
+            )
+            await db.givenanswer.create(
+                data={
+                    "sessionId": session.id,
+                    "questionId": question.id,
+                    "freeText": f"answer {i}",
+                }
+            )
+            await db.sessionstat.create(
+                data={"sessionId": session.id, "key": "score", "value": i}
+            )
+
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        response = await client.get(
+            "/br-general/users/me/tests/export", headers=headers
+        )
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == num_sessions
+        assert len({line["sessionId"] for line in lines}) == num_sessions
+        assert all(line["testId"] == test.id for line in lines)
+        assert {line["answers"][0]["freeText"] for line in lines} == {
+            f"answer {i}" for i in range(num_sessions)
+        }
+        assert {line["stats"]["score"] for line in lines} == set(range(num_sessions))
+
+
 @pytest.fixture(autouse=True)
 async def cleanup_users():
     """Cleans up test users after each test file."""
@@ -0,0 +1,54 @@
+"""
+Benchmark: Argon2 verify latency per cost on this host.
+
+Prints verify time for a grid of time_cost x memory_cost and the costs
+calibrate_argon2 picks for --target-ms, as ARGON2_* lines that can be pinned
+in .env so every node hashes with the same costs. No database is needed.
+
+Run from br-general-python/:
+    python -m benchmarks.bench_argon2_calibration --target-ms 250
+"""
+
+import argparse
+
+from app.services.auth_service import (
+    ARGON2_DEFAULT_PARALLELISM,
+    _measure_argon2_verify_ms,
+    calibrate_argon2,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--time-costs", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument(
+        "--memory-costs", type=int, nargs="+", default=[19456, 32768, 65536]
+    )
+    parser.add_argument("--parallelism", type=int, default=ARGON2_DEFAULT_PARALLELISM)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"verify ms (median of {args.samples}), parallelism {args.parallelism}")
+    print(
+        f"{'memory KiB':>10} "
+        + " ".join(f"{'t=' + str(t):>8}" for t in args.time_costs)
+    )
+    for memory_cost in args.memory_costs:
+        row = [
+            _measure_argon2_verify_ms(t, memory_cost, args.parallelism, args.samples)
+            for t in args.time_costs
+        ]
+        print(f"{memory_cost:>10} " + " ".join(f"{ms:>8.1f}" for ms in row))
+
+    params = calibrate_argon2(
+        args.target_ms, parallelism=args.parallelism, samples=args.samples
+    )
+    print(f"\ncalibrated for {args.target_ms:g} ms: {params['verify_ms']} ms")
+    print(f"ARGON2_TIME_COST={params['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={params['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={params['parallelism']}")
+
+
+if __name__ == "__main__":
+    main()
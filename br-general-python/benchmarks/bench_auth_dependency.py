@@ -0,0 +1,95 @@
+"""
+Benchmark: per-request overhead of the get_current_user auth dependency.
+
+Compares a full jwt.decode of the bearer token with the verified-token cache,
+and minting a new access token from x-refresh-token with reusing the cached
+one. Also times the whole dependency call. No database is needed.
+
+Run from br-general-python/:
+    python -m benchmarks.bench_auth_dependency --number 20000
+"""
+
+import argparse
+import asyncio
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Request
+from jose import jwt
+
+from app.api.users import get_current_user
+from app.services.auth_service import (
+    AuthService,
+    access_claims_cache,
+    refreshed_access_cache,
+)
+from app.settings import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    auth_service = AuthService()
+    access = auth_service.create_access_token({"sub": "bench-user"})
+    refresh = auth_service.create_refresh_token({"sub": "bench-user"})
+    expired = jwt.encode(
+        {
+            "sub": "bench-user",
+            "exp": datetime.now(timezone.utc) - timedelta(minutes=1),
+            "type": "access",
+        },
+        settings.jwt_secret_key,
+        algorithm=settings.jwt_algorithm,
+    )
+
+    def decode_uncached() -> dict:
+        return jwt.decode(
+            access, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
+        )
+
+    def decode_cached() -> dict:
+        return auth_service.decode_access_token_cached(access)
+
+    def refresh_uncached() -> str:
+        payload = auth_service.decode_token(refresh)
+        return auth_service.create_access_token({"sub": payload["sub"]})
+
+    def refresh_cached() -> str:
+        return auth_service.refresh_access_token_cached(refresh)["access_token"]
+
+    loop = asyncio.new_event_loop()
+
+    def request() -> Request:
+        return Request({"type": "http", "headers": []})
+
+    def dependency_access() -> dict:
+        return loop.run_until_complete(
+            get_current_user(request(), access_token=access, x_refresh_token=None)
+        )
+
+    def dependency_refresh() -> dict:
+        return loop.run_until_complete(
+            get_current_user(request(), access_token=expired, x_refresh_token=refresh)
+        )
+
+    print(f"{args.number} iterations, algorithm {settings.jwt_algorithm}")
+    for name, fn in (
+        ("jwt.decode (uncached)", decode_uncached),
+        ("decode (cached)", decode_cached),
+        ("refresh mint (uncached)", refresh_uncached),
+        ("refresh (cached)", refresh_cached),
+        ("dependency, access token", dependency_access),
+        ("dependency, via refresh", dependency_refresh),
+    ):
+        access_claims_cache.clear()
+        refreshed_access_cache.clear()
+        fn()  # warm the cache where one is used
+        seconds = min(timeit.repeat(fn, number=args.number, repeat=5))
+        print(f"{name:<26} {seconds / args.number * 1e6:10.1f} us/request")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: EmailLog outbox enqueue cost and delivery throughput per worker count.
+
+Enqueues --messages rows through EmailOutbox.enqueue_many, then drains them
+with 1..N concurrent workers (the same claim/send/mark loop the app runs)
+against a fake SMTP pool that takes --smtp-ms per message. Shows how the
+SKIP LOCKED claiming scales with workers and what one enqueue costs the
+request path. Needs the database; rows are deleted at the end.
+
+Run from br-general-python/:
+    python -m benchmarks.bench_email_outbox --messages 500 --workers 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.db import db
+from app.services.email_outbox import EmailOutbox
+from app.services.email_service import EmailService
+
+PREFIX = "bench_email_outbox_"
+
+
+class SlowPool:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.sent = 0
+
+    async def send_message(self, message) -> None:
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+
+
+async def drain(outbox: EmailOutbox, workers: int) -> None:
+    async def worker():
+        while await outbox.process_batch():
+            pass
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+
+async def run(total: int, worker_counts: list[int], smtp_ms: float) -> None:
+    await db.connect()
+    try:
+        print(f"{total} messages, fake SMTP {smtp_ms:.0f} ms per message")
+        print(f"{'workers':>7} {'enqueue ms/msg':>15} {'drain s':>8} {'msg/s':>8}")
+        for workers in worker_counts:
+            pool = SlowPool(smtp_ms / 1000)
+            outbox = EmailOutbox(
+                EmailService(db, pool),
+                workers=workers,
+                batch_size=20,
+                max_attempts=3,
+                retry_base_seconds=1,
+                lease_seconds=60,
+                poll_seconds=1,
+                domain_rate_per_minute=0,
+            )
+            messages = [
+                {"to": f"{PREFIX}{n}@example.com", "subject": "Bench", "text": "x"}
+                for n in range(total)
+            ]
+            started = time.perf_counter()
+            for chunk in range(0, total, 100):
+                await outbox.enqueue_many(messages[chunk : chunk + 100])
+            enqueue_ms = (time.perf_counter() - started) * 1000 / total
+
+            started = time.perf_counter()
+            await drain(outbox, workers)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{workers:>7} {enqueue_ms:>15.3f} {elapsed:>8.2f} "
+                f"{pool.sent / elapsed:>8.0f}"
+            )
+            await db.emaillog.delete_many(where={"to": {"startswith": PREFIX}})
+    finally:
+        await db.emaillog.delete_many(where={"to": {"startswith": PREFIX}})
+        await db.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--smtp-ms", type=float, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.workers, args.smtp_ms))
+
+
+if __name__ == "__main__":
+    main()
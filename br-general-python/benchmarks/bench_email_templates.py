@@ -0,0 +1,62 @@
+"""
+Benchmark: rendering email templates for a batch of recipients.
+
+Renders templates/email/welcome.html for --recipients messages whose params
+repeat every --distinct recipients, once the previous way (Environment with
+FileSystemLoader, get_template per message, which stats the file each time)
+and once through EmailTemplates (preloaded, auto_reload off, rendered output
+memoized per params). No database.
+
+Run from br-general-python/:
+    python -m benchmarks.bench_email_templates --recipients 5000 --distinct 500
+"""
+
+import argparse
+import time
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.services.email_templates import TEMPLATES_DIR, EmailTemplates
+
+TEMPLATE = "email/welcome.html"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=5000)
+    parser.add_argument("--distinct", type=int, default=500)
+    args = parser.parse_args()
+
+    params = [{"name": f"User {n % args.distinct}"} for n in range(args.recipients)]
+
+    env = Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=select_autoescape(["html", "xml"]),
+    )
+
+    def per_message():
+        for p in params:
+            env.get_template(TEMPLATE).render(**p)
+
+    templates = EmailTemplates(TEMPLATES_DIR, auto_reload=False, max_rendered=1024)
+    templates.preload()
+
+    def cached():
+        for p in params:
+            templates.render(TEMPLATE, p)
+
+    print(f"{args.recipients} recipients, {args.distinct} distinct param sets")
+    print(f"{'path':<28} {'seconds':>8} {'µs/msg':>8}")
+    for name, fn in (
+        ("get_template per message", per_message),
+        ("EmailTemplates", cached),
+    ):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        print(f"{name:<28} {elapsed:>8.3f} {elapsed * 1e6 / args.recipients:>8.1f}")
+    print(f"templates: {templates.stats()}")
+
+
+if __name__ == "__main__":
+    main()
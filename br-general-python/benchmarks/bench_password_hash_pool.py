@@ -0,0 +1,73 @@
+"""
+Benchmark: event-loop stalls during a login storm.
+
+Fires --logins concurrent Argon2 verifications, once inline on the event loop
+(the previous /auth/login path) and once through the bounded worker pool, while
+a ticker coroutine measures how late it wakes up. The ticker lag is what every
+unrelated request on the same worker would have waited. No database is needed.
+
+Run from br-general-python/:
+    python -m benchmarks.bench_password_hash_pool --logins 20 --workers 2
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.auth_service import pwd_context
+from app.services.password_pool import PasswordHashPool
+
+
+async def ticker(stop: asyncio.Event, interval: float, lags: list) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - expected) * 1000)
+
+
+async def storm(verify, logins: int, interval: float) -> tuple:
+    stop = asyncio.Event()
+    lags: list = []
+    tick = asyncio.create_task(ticker(stop, interval, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick
+    return elapsed, lags
+
+
+async def run(logins: int, workers: int, interval: float) -> None:
+    hashed = pwd_context.hash("benchmark-password")
+    pool = PasswordHashPool(workers=workers, max_queue=logins)
+
+    async def inline():
+        return pwd_context.verify("benchmark-password", hashed)
+
+    async def pooled():
+        return await pool.run(pwd_context.verify, "benchmark-password", hashed)
+
+    print(f"{logins} concurrent logins, pool of {workers} workers")
+    print(f"{'path':<8} {'total s':>8} {'max lag ms':>11} {'p50 lag ms':>11}")
+    for name, verify in (("inline", inline), ("pool", pooled)):
+        elapsed, lags = await storm(verify, logins, interval)
+        lags = lags or [0.0]
+        print(
+            f"{name:<8} {elapsed:>8.2f} {max(lags):>11.1f} "
+            f"{statistics.median(lags):>11.1f}"
+        )
+    pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.workers, args.interval_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: statements a user-scoped read costs the primary with a replica.
+
+Replays --events random requests of --users clients spread over --minutes;
+--write-ratio of them are writes, whose X-Read-After-Write stamp the client
+sends back on its later reads. Counts what reaches the primary through
+ReadRouter.reader_for, next to the previous routing (a ReadAfterWrite lookup
+on the primary for every read the process had no mark for), and times one
+routing decision. No database is needed.
+
+Run from br-general-python/:
+    python -m benchmarks.bench_read_routing --users 2000 --events 200000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import timeit
+
+from app.db.routing import READ_AFTER_WRITE_HEADER, ReadRouter
+
+
+class CountingClient:
+    """Stands in for a Prisma client; counts how often it is picked."""
+
+    def __init__(self) -> None:
+        self.picked = 0
+
+    async def connect(self) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--minutes", type=float, default=60)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    parser.add_argument("--sticky-seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    primary, replica = CountingClient(), CountingClient()
+    router = ReadRouter(primary, replica, sticky_seconds=args.sticky_seconds)
+    asyncio.run(router.connect())
+
+    rng = random.Random(1)
+    span = args.minutes * 60
+    moments = sorted(rng.uniform(0, span) for _ in range(args.events))
+    last_write = {}
+    reads = writes = 0
+    for at in moments:
+        user = rng.randrange(args.users)
+        if rng.random() < args.write_ratio:
+            writes += 1
+            last_write[user] = at
+            continue
+        reads += 1
+        stamp = None
+        if user in last_write:
+            # the stamp as the client got it, aged by the simulated time since
+            stamp = f"{time.time() - (at - last_write[user]):.3f}"
+        router.reader_for(stamp).picked += 1
+
+    # before: a read not known to be sticky cost a lookup on the primary and
+    # a sticky one the read itself, so at least one statement per read
+    previous = reads
+    print(
+        f"{args.users} users, {reads} reads, {writes} writes over "
+        f"{args.minutes:g} min, sticky {args.sticky_seconds:g}s"
+    )
+    print(f"{'routing':<28}{'primary stmts':>14}{'per 1000 reads':>16}")
+    for name, count in (
+        ("ReadAfterWrite lookup", previous),
+        ("client stamp (now)", primary.picked),
+    ):
+        print(f"{name:<28}{count:>14}{count * 1000 / reads:>16.1f}")
+    print(f"replica reads: {replica.picked}")
+
+    fresh = router.write_headers()[READ_AFTER_WRITE_HEADER]
+    for name, stamp in (("no stamp", None), ("fresh stamp", fresh)):
+        seconds = timeit.timeit(lambda: router.reader_for(stamp), number=100000)
+        print(f"reader_for, {name:<12}{seconds * 1e6 / 100000:>8.2f} us/read")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: POST /tests/save-bulk submit latency against a local Postgres.
+
+Creates a throw-away topic, test (RADIO questions with two options) and user,
+then submits --iterations sessions for every answer count in --sizes through
+save_bulk_answers_service and prints p50/p99. Everything it created is removed
+at the end (sessions, answers and stats cascade from the user and the test).
+
+Run from br-general-python/ with the database up (see README):
+    python -m benchmarks.bench_save_bulk --sizes 10 50 200 --iterations 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from app.db import db
+from app.services.tests_service import save_bulk_answers_service
+
+
+async def create_fixture(max_questions: int, stats_keys: int):
+    marker = uuid.uuid4().hex[:8]
+    topic = await db.topic.create(data={"title": f"BENCH-{marker}"})
+    test = await db.test.create(
+        data={
+            "title": f"BENCH-{marker}",
+            "description": "save-bulk benchmark",
+            "topicId": topic.id,
+        }
+    )
+    questions = []
+    for q in range(max_questions):
+        question = await db.question.create(
+            data={
+                "testId": test.id,
+                "text": f"Benchmark question {q}",
+                "type": "RADIO",
+                "options": {
+                    "create": [
+                        {"text": "Yes", "isCorrect": True},
+                        {"text": "No", "isCorrect": False},
+                    ]
+                },
+            },
+            include={"options": True},
+        )
+        questions.append(question)
+
+    user = await db.user.create(
+        data={
+            "email": f"bench_{marker}@example.com",
+            "hashed_password": "-",
+            "name": "Benchmark",
+        }
+    )
+    stats = {f"scale_{i}": i for i in range(stats_keys)}
+    return topic, test, questions, user, stats
+
+
+async def run(sizes: list[int], iterations: int, warmup: int, stats_keys: int):
+    await db.connect()
+    topic, test, questions, user, stats = await create_fixture(max(sizes), stats_keys)
+    try:
+        print(f"{'answers':>8} {'runs':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for size in sizes:
+            answers = [
+                {"questionId": q.id, "answerOptionId": q.options[0].id}
+                for q in questions[:size]
+            ]
+            samples = []
+            for i in range(warmup + iterations):
+                started = time.perf_counter()
+                await save_bulk_answers_service(
+                    db,
+                    test_id=test.id,
+                    answers=answers,
+                    stats=stats,
+                    user_id=user.id,
+                )
+                if i >= warmup:
+                    samples.append((time.perf_counter() - started) * 1000)
+
+            cuts = statistics.quantiles(samples, n=100)
+            print(
+                f"{size:>8} {len(samples):>6} {cuts[49]:>9.2f} "
+                f"{cuts[98]:>9.2f} {max(samples):>9.2f}"
+            )
+    finally:
+        await db.user.delete(where={"id": user.id})
+        await db.topic.delete(where={"id": topic.id})
+        await db.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument(
+        "--stats-keys", type=int, default=10, help="SessionStat keys per submission"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.iterations, args.warmup, args.stats_keys))
+
+
+if __name__ == "__main__":
+    main()
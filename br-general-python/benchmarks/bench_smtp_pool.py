@@ -0,0 +1,130 @@
+"""
+Benchmark: SMTP throughput with a connection per message vs the pool.
+
+Starts a local aiosmtpd server (AUTH LOGIN/PLAIN enabled, no TLS) and sends
+--messages mails with --concurrency concurrent senders, once the previous way
+(connect + EHLO + login + QUIT per message) and once through
+SMTPConnectionPool. Needs `aiosmtpd` (requirements/local.txt); no database.
+
+Run from br-general-python/:
+    python -m benchmarks.bench_smtp_pool --messages 500 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import logging
+import socket
+import time
+from email.message import EmailMessage
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+from app.services.smtp_pool import SMTPConnectionPool
+
+
+class CountingHandler:
+    def __init__(self):
+        self.count = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.count += 1
+        return "250 OK"
+
+
+def accept_all(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=True)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def message(n: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "no-reply@example.com"
+    msg["To"] = f"user{n}@example.com"
+    msg["Subject"] = f"Benchmark {n}"
+    msg.set_content("Hello from the SMTP pool benchmark.")
+    return msg
+
+
+async def run_senders(send, total: int, concurrency: int) -> float:
+    queue = asyncio.Queue()
+    for n in range(total):
+        queue.put_nowait(n)
+
+    async def sender():
+        while not queue.empty():
+            await send(message(queue.get_nowait()))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(sender() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def run(total: int, concurrency: int, host: str, port: int) -> None:
+    async def per_message(msg):
+        await aiosmtplib.send(
+            msg,
+            hostname=host,
+            port=port,
+            username="bench",
+            password="bench",
+            start_tls=False,
+            timeout=30,
+        )
+
+    pool = SMTPConnectionPool(
+        host=host,
+        port=port,
+        username="bench",
+        password="bench",
+        use_tls=False,
+        start_tls=False,
+        size=concurrency,
+        idle_check_seconds=30,
+        max_idle_seconds=240,
+    )
+
+    print(f"{total} messages, {concurrency} concurrent senders")
+    print(f"{'path':<22} {'seconds':>8} {'msg/s':>8}")
+    for name, send in (
+        ("connection per message", per_message),
+        ("SMTPConnectionPool", pool.send_message),
+    ):
+        elapsed = await run_senders(send, total, concurrency)
+        print(f"{name:<22} {elapsed:>8.2f} {total / elapsed:>8.0f}")
+    print(f"pool: {pool.stats()}")
+    await pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    # aiosmtpd warns about its legacy login_data on every AUTH
+    logging.getLogger("mail.log").setLevel(logging.ERROR)
+
+    handler = CountingHandler()
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=free_port(),
+        authenticator=accept_all,
+        auth_require_tls=False,
+    )
+    controller.start()
+    try:
+        asyncio.run(run(args.messages, args.concurrency, "127.0.0.1", controller.port))
+    finally:
+        controller.stop()
+    print(f"server received {handler.count} messages")
+
+
+if __name__ == "__main__":
+    main()
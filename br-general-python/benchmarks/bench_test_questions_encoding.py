@@ -0,0 +1,86 @@
+"""
+Benchmark: GET /tests/{test_id}/questions response rendering.
+
+Compares the previous path (build dict -> jsonable_encoder -> JSONResponse)
+with serving the pre-encoded body kept in the questions cache, and with a 304
+answer for a matching If-None-Match. No database is needed.
+
+Run from br-general-python/:
+    python -m benchmarks.bench_test_questions_encoding --questions 40 --options 5
+"""
+
+import argparse
+import timeit
+from types import SimpleNamespace
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.services.tests_service import (
+    CachedTestQuestions,
+    _build_test_questions_payload,
+    etag_matches,
+)
+
+
+def make_test(questions: int, options: int) -> SimpleNamespace:
+    """Fake Prisma Test object shaped like get_test_with_questions_repo output."""
+    return SimpleNamespace(
+        id="bench-test",
+        topicId="bench-topic",
+        questions=[
+            SimpleNamespace(
+                id=f"question-{q}",
+                text=f"Question {q}: how often did you feel this way last week?",
+                type="RADIO",
+                options=[
+                    SimpleNamespace(id=f"option-{q}-{o}", text=f"Answer option {o}")
+                    for o in range(options)
+                ],
+            )
+            for q in range(questions)
+        ],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--options", type=int, default=5)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    test = make_test(args.questions, args.options)
+    entry = CachedTestQuestions.from_payload(
+        test.id, _build_test_questions_payload(test)
+    )
+
+    def current_path() -> bytes:
+        payload = _build_test_questions_payload(test)
+        return JSONResponse(content=jsonable_encoder(payload)).body
+
+    def encoded_path() -> bytes:
+        return Response(content=entry.body, media_type="application/json").body
+
+    def not_modified_path() -> bytes:
+        assert etag_matches(entry.etag, entry.etag)
+        return Response(status_code=304, headers={"ETag": entry.etag}).body
+
+    assert current_path() == encoded_path(), "encoded body differs from JSONResponse"
+
+    print(
+        f"payload: {args.questions} questions x {args.options} options, "
+        f"{len(entry.body)} bytes, {args.number} iterations"
+    )
+    for name, fn in (
+        ("dict + jsonable_encoder", current_path),
+        ("pre-encoded bytes", encoded_path),
+        ("304 not modified", not_modified_path),
+    ):
+        seconds = min(timeit.repeat(fn, number=args.number, repeat=5))
+        print(f"{name:<26} {seconds / args.number * 1e6:10.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
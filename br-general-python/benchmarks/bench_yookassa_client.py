@@ -0,0 +1,106 @@
+"""
+Benchmark: YooKassa payment creation under concurrency.
+
+Serves the fake YooKassa (app/tests/fake_yookassa.py) with uvicorn on
+localhost with --latency-ms of simulated API time, then fires --requests
+concurrent payment creations from the event loop:
+
+* requests.post inside the coroutine (the previous code; blocks the loop,
+  so calls run one after another),
+* the shared pooled YooKassaClient.
+
+Run from br-general-python/:
+    python -m benchmarks.bench_yookassa_client --requests 50 --latency-ms 80
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+import uuid
+
+import requests
+import uvicorn
+
+from app.services.yookassa_client import YooKassaClient
+from app.tests.fake_yookassa import FakeYooKassa
+
+PAYLOAD = {
+    "amount": {"value": "1000", "currency": "RUB"},
+    "confirmation": {"type": "redirect", "return_url": "http://localhost/success"},
+    "capture": True,
+    "description": "benchmark",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake(latency_ms: float) -> tuple:
+    fake = FakeYooKassa(latency_ms=latency_ms)
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(fake.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, f"http://127.0.0.1:{port}/v3"
+
+
+async def timed(coro_fn, samples: list) -> None:
+    started = time.perf_counter()
+    await coro_fn()
+    samples.append((time.perf_counter() - started) * 1000)
+
+
+async def run(total: int, base_url: str) -> None:
+    async def blocking_call():
+        response = requests.post(
+            f"{base_url}/payments",
+            json=PAYLOAD,
+            auth=("shop", "secret"),
+            headers={"Idempotence-Key": str(uuid.uuid4())},
+            timeout=15,
+        )
+        response.raise_for_status()
+
+    client = YooKassaClient(base_url, "shop", "secret", timeout=15, max_retries=0)
+
+    async def pooled_call():
+        await client.create_payment(PAYLOAD, idempotence_key=str(uuid.uuid4()))
+
+    print(f"{'path':<16} {'total s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, call in (("requests.post", blocking_call), ("pooled httpx", pooled_call)):
+        await call()  # warm up (connection setup)
+        samples: list = []
+        started = time.perf_counter()
+        await asyncio.gather(*(timed(call, samples) for _ in range(total)))
+        elapsed = time.perf_counter() - started
+        cuts = statistics.quantiles(samples, n=100)
+        print(f"{name:<16} {elapsed:>8.2f} {cuts[49]:>8.1f} {cuts[98]:>8.1f}")
+    await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    args = parser.parse_args()
+
+    server, thread, base_url = start_fake(args.latency_ms)
+    try:
+        asyncio.run(run(args.requests, base_url))
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
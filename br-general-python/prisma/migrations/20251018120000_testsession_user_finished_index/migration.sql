@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "TestSession_userId_finishedAt_idx" ON "TestSession"("userId", "finishedAt");
@@ -0,0 +1,8 @@
+-- AlterTable
+ALTER TABLE "EmailLog" ADD COLUMN     "attempts" INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN     "nextAttemptAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+ADD COLUMN     "sentAt" TIMESTAMP(3),
+ADD COLUMN     "text" TEXT;
+
+-- CreateIndex
+CREATE INDEX "EmailLog_status_nextAttemptAt_idx" ON "EmailLog"("status", "nextAttemptAt");
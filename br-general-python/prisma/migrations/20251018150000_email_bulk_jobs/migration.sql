@@ -0,0 +1,5 @@
+-- AlterTable
+ALTER TABLE "EmailLog" ADD COLUMN     "jobId" TEXT;
+
+-- CreateIndex
+CREATE INDEX "EmailLog_jobId_idx" ON "EmailLog"("jobId");
@@ -0,0 +1,7 @@
+-- CreateTable
+CREATE TABLE "ReadAfterWrite" (
+    "userId" TEXT NOT NULL,
+    "until" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "ReadAfterWrite_pkey" PRIMARY KEY ("userId")
+);
@@ -0,0 +1,11 @@
+-- CreateTable
+CREATE TABLE "TopSqlSnapshot" (
+    "id" SERIAL NOT NULL,
+    "takenAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "statements" JSONB NOT NULL,
+
+    CONSTRAINT "TopSqlSnapshot_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "TopSqlSnapshot_takenAt_idx" ON "TopSqlSnapshot"("takenAt");
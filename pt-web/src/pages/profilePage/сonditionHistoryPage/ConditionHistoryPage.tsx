@@ -239,7 +239,7 @@ export function ConditionHistoryPage() {
                       {session.answers.map((answer) => (
                         <tr key={answer.question_id}>
                           <td data-label={dict.history.question}>
-                            {answer.question_text}
+                            {results.questions[answer.question_id]}
                           </td>
                           <td data-label={dict.history.answer}>
                             {answer.answer}
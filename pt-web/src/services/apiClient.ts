@@ -1,5 +1,6 @@
 import {localStorageWorker, Token as LSToken} from "src/globalServices/localStorageWorker";
 import {env} from "src/utils/env/env";
+import {rememberWrite, setReadAfterWriteHeader} from "src/services/readAfterWrite";
 
 const DEFAULT_TIMEOUT_MS = 10_000;
 
@@ -73,6 +74,7 @@ class ApiClient {
     Object.entries(this.getAuthHeaders()).forEach(([key, value]) => {
       headers.set(key, value);
     });
+    setReadAfterWriteHeader(headers);
 
     if (body !== undefined && !isFormData && !headers.has(HEADER.CONTENT_TYPE)) {
       headers.set(HEADER.CONTENT_TYPE, MIME.JSON);
@@ -151,6 +153,7 @@ class ApiClient {
       });
 
       await this.ensureOkOrThrow(response);
+      rememberWrite(response);
 
       return this.parseJsonSafe<T>(response);
     } finally {
@@ -1,5 +1,6 @@
 import {localStorageWorker, Token as LSToken} from "src/globalServices/localStorageWorker";
 import {env} from "src/utils/env/env";
+import {rememberWrite, setReadAfterWriteHeader} from "src/services/readAfterWrite";
 
 export type Role = "PATIENT" | "DOCTOR";
 export type Token = { access_token: string; refresh_token: string; token_type: string };
@@ -31,6 +32,7 @@ async function apiFetch(path: string, init: RequestInit = {}): Promise<Response>
   if (refresh) {
     headers.set("x-refresh-token", refresh);
   }
+  setReadAfterWriteHeader(headers);
 
   return fetch(`${env.API_BASE_PATH}${path}`, {...init, headers});
 }
@@ -52,6 +54,7 @@ export async function registerByEmail(email: string, password: string, fullName:
     headers: {"Content-Type": "application/json"},
     body: JSON.stringify({email, password, name: fullName, role: "PATIENT"}),
   });
+  rememberWrite(res);
   const data = (await res.json()) as UserWithTokens;
   saveTokens({access_token: data.tokens.access_token, refresh_token: data.tokens.refresh_token});
 }
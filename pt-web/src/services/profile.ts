@@ -22,7 +22,6 @@ export type TestSession = {
   finished_at: string | null;
   answers: Array<{
     question_id: string;
-    question_text: string;
     answer: string;
   }>;
 };
@@ -31,6 +30,7 @@ export type UserTestResults = {
   test_id: string;
   title: string;
   description: string | null;
+  questions: Record<string, string>;
   sessions: TestSession[];
 };
 
@@ -0,0 +1,21 @@
+const READ_AFTER_WRITE_HEADER = "X-Read-After-Write";
+
+/**
+ * Time of this client's last write, as returned by the API.
+ * It is sent back on every request, so reads right after a write see it
+ * even when the API serves them from a read replica.
+ */
+let lastWrite: string | null = null;
+
+export function rememberWrite(res: Response): void {
+  const value = res.headers.get(READ_AFTER_WRITE_HEADER);
+  if (value) {
+    lastWrite = value;
+  }
+}
+
+export function setReadAfterWriteHeader(headers: Headers): void {
+  if (lastWrite) {
+    headers.set(READ_AFTER_WRITE_HEADER, lastWrite);
+  }
+}